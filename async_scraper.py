@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于asyncio的票房数据抓取引擎
+
+与 BoxOfficeScraper 提供相同的 scrape_monthly_data / search_imdb_rating /
+search_douban_movie 接口，但所有网络请求都在同一个事件循环中调度：
+多个月份、多部电影的请求可以同时进行，每个站点的并发数由信号量限制，
+访问频率由令牌桶限速器控制。候选解析、最佳匹配选择和失败原因判定调用 BoxOfficeScraper
+的同一组方法（见其中标注"同步、异步抓取器共用"的方法），异步引擎只替换其中的网络请求。
+
+响应缓存、查询失败缓存、IMDb数据集和豆瓣静态映射都是同步的SQLite查询，
+通过 asyncio.to_thread 放到线程中执行（这些对象都带锁、允许跨线程使用）：
+写库提交或冷启动读盘时一次可达数毫秒，直接在事件循环中调用会阻塞所有进行中的请求。
+"""
+
+import asyncio
+import time
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from circuit_breaker import (BREAKER_FAILURE_STATUSES, RETRY_STATUSES, CircuitOpenError,
+                             backoff_delay, parse_retry_after)
+from boxoffice_scraper import (BoxOfficeScraper, DEFAULT_SPECULATIVE_CANDIDATES, DEFAULT_TOP_N, DOUBAN_SEARCH_HEADERS,
+                               DOUBAN_DETAIL_HEADERS)
+from imdb_dataset import DEFAULT_MAX_YEAR_DIFF
+from negative_cache import MISS_BLOCKED, MISS_NO_RESULTS, SOURCE_DOUBAN, SOURCE_IMDB
+from rate_limiter import AsyncHostRateLimiter, host_key
+from response_cache import ResponseCache, CACHE_USE
+from scrape_log import configure_logging, event, get_instance_logger, get_logger
+
+
+log = get_logger('async')
+
+# 视为网络错误的异常（aiohttp 的连接错误和响应转换后的 requests 异常）
+NETWORK_ERRORS = (aiohttp.ClientError, requests.RequestException)
+
+# 各站点同时进行中的最大请求数
+DEFAULT_HOST_CONCURRENCY = {
+    'boxofficemojo.com': 4,
+    'imdb.com': 8,
+    'douban.com': 2,
+}
+
+
+class AsyncBoxOfficeScraper:
+    def __init__(self, debug=False, host_concurrency=None, default_concurrency=4,
+                 rate_limits=None, cache=None, cache_mode=CACHE_USE, rating_memo=None, base_urls=None,
+                 negative_cache=None, top_n=DEFAULT_TOP_N, enrich_limit=None, imdb_dataset=None,
+                 speculative_candidates=DEFAULT_SPECULATIVE_CANDIDATES, imdb_max_year_diff=DEFAULT_MAX_YEAR_DIFF):
+        """
+        Args:
+            debug (bool): 是否启用调试模式
+            host_concurrency (dict): 站点域名 -> 最大并发请求数，覆盖 DEFAULT_HOST_CONCURRENCY
+            default_concurrency (int): 未配置站点的最大并发请求数
+            rate_limits (dict): 站点域名 -> 每秒请求数，覆盖默认限速
+            cache (str|ResponseCache): 响应缓存数据库路径或缓存对象，None表示不缓存
+            cache_mode (str): 按路径创建缓存时的模式，'use' / 'refresh' / 'bypass'
+            rating_memo (RatingMemo): 评分查询缓存，None表示不缓存
+            base_urls (dict): 覆盖各站点地址，键为 'boxoffice' / 'imdb' / 'douban'
+            negative_cache (str|NegativeCache): 查询失败缓存的数据库路径或缓存对象，None表示不缓存
+            top_n (int): 从月度榜单取前多少名，None表示整张榜单
+            enrich_limit (int): 只为排名前多少的电影查询评分，None表示全部查询，0表示只抓取票房表格
+            imdb_dataset (str|ImdbDataset): 离线IMDb数据集，优先从中查询评分，None表示只在线搜索
+            imdb_max_year_diff (int): 数据集中的电影与目标年份最多相差几年，超出时在线搜索；None表示不限
+            speculative_candidates (int): 同时请求排名最前的几个IMDb候选详情页，1表示逐个请求
+        """
+        # 复用同步抓取器的URL构建、页面解析、匹配和查询失败缓存，不创建它的会话池和限速器
+        self.parser = BoxOfficeScraper(debug=debug, rating_memo=rating_memo, base_urls=base_urls,
+                                       negative_cache=negative_cache, top_n=top_n, enrich_limit=enrich_limit,
+                                       imdb_dataset=imdb_dataset, imdb_max_year_diff=imdb_max_year_diff,
+                                       speculative_candidates=speculative_candidates, network=False)
+        self.headers = self.parser.headers
+        self.debug = debug
+        self.log = get_instance_logger('async', debug)
+        self.host_concurrency = dict(DEFAULT_HOST_CONCURRENCY)
+        if host_concurrency:
+            self.host_concurrency.update(host_concurrency)
+        self.default_concurrency = default_concurrency
+        self.semaphores = {}
+        self.rate_limiter = AsyncHostRateLimiter(rate_limits)
+        if isinstance(cache, str):
+            cache = ResponseCache(cache, mode=cache_mode)
+        self.cache = cache
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """创建共享的HTTP会话"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=sum(self.host_concurrency.values()) + self.default_concurrency)
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+
+    async def close(self):
+        """关闭HTTP会话、响应缓存、查询失败缓存和IMDb数据集"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.parser.negative_cache is not None:
+            self.parser.negative_cache.close()
+            self.parser.negative_cache = None
+        if self.parser.imdb_dataset is not None:
+            self.parser.imdb_dataset.close()
+            self.parser.imdb_dataset = None
+
+    def get_semaphore(self, url):
+        """获取（必要时创建）URL所属站点的并发信号量"""
+        host = host_key(url)
+        semaphore = self.semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.host_concurrency.get(host, self.default_concurrency))
+            self.semaphores[host] = semaphore
+        return semaphore
+
+    async def fetch_page(self, url, headers=None, timeout=10):
+        """
+        发送GET请求：优先读取响应缓存，未命中时在站点并发上限和限速下请求
+
+        Args:
+            url (str): 请求地址
+            headers (dict): 额外请求头，与会话默认请求头合并
+            timeout (int): 超时时间（秒）
+
+        Returns:
+            requests.Response: 与同步抓取器相同类型的响应对象，便于复用解析逻辑
+        """
+        if self.cache is not None:
+            cached_response = await asyncio.to_thread(self.cache.get, url)
+            if cached_response is not None:
+                return cached_response
+
+        await self.open()
+        async with self.get_semaphore(url):
+            await self.rate_limiter.acquire(url)
+            client_timeout = aiohttp.ClientTimeout(total=timeout)
+            async with self.session.get(url, headers=headers, timeout=client_timeout) as resp:
+                body = await resp.read()
+                response = requests.Response()
+                response.status_code = resp.status
+                response.reason = resp.reason
+                response.headers = CaseInsensitiveDict(resp.headers)
+                response.url = str(resp.url)
+                response._content = body
+                response.encoding = resp.charset
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, url, response)
+        return response
+
+    async def fetch_with_breaker(self, url, headers=None, timeout=10):
+        """
+        经过熔断器和退避重试的请求，熔断器与解析用的 BoxOfficeScraper 共用，
+        规则同 BoxOfficeScraper.fetch_with_breaker，等待时让出事件循环
+
+        Raises:
+            CircuitOpenError: 站点已熔断
+        """
+        breakers = self.parser.circuit_breakers
+        breakers.check(url)
+
+        for attempt in range(self.parser.backoff_retries + 1):
+            try:
+                response = await self.fetch_page(url, headers=headers, timeout=timeout)
+            except Exception:
+                # 任何请求异常都要记录失败，否则半开状态的探测请求不会释放
+                self.parser.record_breaker_failure(url)
+                raise
+            if response.status_code not in RETRY_STATUSES or attempt == self.parser.backoff_retries:
+                break
+            delay = backoff_delay(attempt, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            if delay > self.parser.max_backoff:
+                break
+            await asyncio.sleep(delay)
+
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            self.parser.record_breaker_failure(url, parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            self.parser.record_breaker_success(url)
+        return response
+
+    async def scrape_monthly_data(self, year, month):
+        """
+        抓取指定年月的票房数据，所有电影的评分查询并发进行
+
+        Args:
+            year (int): 年份
+            month (int): 月份 (1-12)
+
+        Returns:
+            list: 包含票房数据的字典列表
+        """
+        start = time.monotonic()
+        url = self.parser.build_month_url(year, month)
+        self.log.info("正在抓取: %s", url, extra=event('month_start', year=year, month=month, url=url))
+
+        try:
+            response = await self.fetch_page(url, timeout=10)
+            response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.RequestException) as e:
+            self.log.error("请求失败: %s", e, extra=event('month_failed', year=year, month=month, error=str(e)))
+            return []
+
+        movies_data = self.parser.parse_monthly_table(response.content)
+        enrich_limit = self.parser.enrich_limit
+        to_enrich = movies_data if enrich_limit is None else movies_data[:enrich_limit]
+        await asyncio.gather(*(self.enrich_movie(movie_data, year) for movie_data in to_enrich))
+
+        self.parser.report_month(year, month, movies_data, (), time.monotonic() - start)
+        return movies_data
+
+    async def scrape_months(self, year_months):
+        """
+        在同一个事件循环中抓取多个月份
+
+        Args:
+            year_months (list): (年份, 月份) 元组列表
+
+        Returns:
+            dict: (年份, 月份) -> 电影数据列表
+        """
+        results = await asyncio.gather(
+            *(self.scrape_monthly_data(year, month) for year, month in year_months),
+            return_exceptions=True
+        )
+
+        monthly_data = {}
+        for (year, month), result in zip(year_months, results):
+            if isinstance(result, Exception):
+                self.log.error("✗ %s年%s月 抓取出错: %s", year, month, result)
+                result = []
+            monthly_data[(year, month)] = result
+        return monthly_data
+
+    async def enrich_movie(self, movie_data, year):
+        """同时查询一部电影的IMDb评分和豆瓣信息，原地更新 movie_data"""
+        if not self.parser.apply_rating_memo(movie_data, year):
+            release_name = movie_data['英文片名']
+            (imdb_rating, imdb_reason), (chinese_title, douban_rating, douban_reason) = await asyncio.gather(
+                self.find_imdb_rating(release_name, year),
+                self.find_douban_movie(release_name, year)
+            )
+            movie_data['IMDb评分'] = imdb_rating
+            movie_data['中文片名'] = chinese_title
+            movie_data['豆瓣评分'] = douban_rating
+            await asyncio.to_thread(self.parser.remember_ratings, movie_data, year, imdb_reason, douban_reason)
+
+        self.parser.report_movie(movie_data)
+
+    async def search_imdb_rating(self, movie_title, target_year=None):
+        """
+        在IMDb上搜索电影并获取评分，优先选择年份最接近的版本
+
+        Args:
+            movie_title (str): 电影名称
+            target_year (int): 目标年份，用于匹配最相近的版本
+
+        Returns:
+            str: IMDb评分，如果未找到则返回"N/A"
+        """
+        return (await self.find_imdb_rating(movie_title, target_year))[0]
+
+    async def find_imdb_rating(self, movie_title, target_year=None):
+        """搜索IMDb评分，返回 (IMDb评分, 失败原因)，见 BoxOfficeScraper.find_imdb_rating"""
+        cached = await asyncio.to_thread(self.parser.cached_imdb_rating, movie_title, target_year)
+        if cached is not None:
+            return cached
+
+        with self.parser.metrics.timer('stage_seconds', stage='imdb_search'):
+            rating, reason = await self.lookup_imdb_rating(movie_title, target_year)
+        if reason is not None:
+            await asyncio.to_thread(self.parser.remember_miss, SOURCE_IMDB, movie_title, target_year, reason)
+        return rating, reason
+
+    async def lookup_imdb_rating(self, movie_title, target_year=None):
+        """搜索IMDb评分，返回 (IMDb评分, 失败原因)，见 BoxOfficeScraper.lookup_imdb_rating"""
+        try:
+            search_url = self.parser.imdb_search_url(movie_title, target_year)
+            response = await self.fetch_page(search_url, timeout=15)
+            if self.parser.imdb_search_blocked(response):
+                return "N/A", MISS_BLOCKED
+            response.raise_for_status()
+
+            candidates = self.parser.rank_imdb_candidates(response.content, target_year)
+            if not candidates:
+                return "N/A", MISS_NO_RESULTS
+
+            with self.parser.metrics.timer('stage_seconds', stage='imdb_select'):
+                rating, tried = await self.try_candidates(candidates, target_year)
+            return self.parser.imdb_outcome(rating, tried)
+
+        except Exception as e:
+            self.log.warning("    IMDb搜索出错: %s", e)
+            return "N/A", None
+
+    async def try_candidates(self, candidates, target_year):
+        """
+        按年份差距依次尝试已排序的候选电影，返回 (IMDb评分, 访问的详情页数量)
+
+        speculative_candidates 大于1时同时请求排名最前的几个候选，排名最靠前的有效评分胜出，
+        其余任务被取消：还在限速等待中的不再发出，已发出的中断读取并关闭连接（仍计入IMDb的访问量）。
+        """
+        tried = 0
+        for group in self.parser.imdb_candidate_groups(candidates):
+            tasks = [asyncio.ensure_future(self.get_rating_from_url(candidate['url'])) for candidate in group]
+            try:
+                for index, (candidate, task) in enumerate(zip(group, tasks)):
+                    self.log.debug("    尝试获取评分: %s (%s)", candidate['title'], candidate['year'])
+                    rating = await task
+                    if self.parser.accept_imdb_rating(candidate, rating, target_year):
+                        return rating, tried + index + 1
+            finally:
+                for task in tasks:
+                    task.cancel()
+            tried += len(group)
+        return "N/A", len(candidates)
+
+    async def get_rating_from_url(self, movie_url):
+        """从IMDb电影页面URL获取评分"""
+        try:
+            response = await self.fetch_page(movie_url, timeout=10)
+            response.raise_for_status()
+            return self.parser.parse_imdb_rating_page(response.content)
+        except Exception as e:
+            self.log.warning("    获取页面评分出错: %s", e)
+            return "N/A"
+
+    async def search_douban_movie(self, movie_title, target_year=None):
+        """
+        根据电影英文名称查找对应的中文片名和豆瓣评分，在线搜索失败时回退到静态映射
+
+        Args:
+            movie_title (str): 电影英文名称
+            target_year (int): 目标年份，用于匹配最相近的版本
+
+        Returns:
+            tuple: (中文片名, 豆瓣评分)
+        """
+        return (await self.find_douban_movie(movie_title, target_year))[:2]
+
+    async def find_douban_movie(self, movie_title, target_year=None):
+        """查找中文片名和豆瓣评分，返回 (中文片名, 豆瓣评分, 失败原因)，见 BoxOfficeScraper.find_douban_movie"""
+        try:
+            reason = await asyncio.to_thread(self.parser.recent_miss, SOURCE_DOUBAN, movie_title, target_year)
+            searched = reason is None
+            if searched:
+                online_result = await self.lookup_douban_online(movie_title, target_year)
+            else:
+                # 近期在线查不到：跳过在线搜索，只查询静态映射
+                online_result = ("N/A", "N/A", reason)
+            return await asyncio.to_thread(
+                self.parser.finish_douban_lookup, movie_title, target_year, online_result, searched)
+
+        except Exception as e:
+            self.log.warning("    豆瓣查找出错: %s", e)
+            return "N/A", "N/A", None
+
+    async def search_douban_online(self, movie_title, target_year=None):
+        """在线搜索豆瓣电影，返回 (中文片名, 豆瓣评分)"""
+        return (await self.lookup_douban_online(movie_title, target_year))[:2]
+
+    async def lookup_douban_online(self, movie_title, target_year=None):
+        """在线搜索豆瓣电影，返回 (中文片名, 豆瓣评分, 失败原因)，见 BoxOfficeScraper.lookup_douban_online"""
+        with self.parser.metrics.timer('stage_seconds', stage='douban_online'):
+            try:
+                clean_title = self.parser.clean_search_title(movie_title)
+                search_url = self.parser.build_douban_search_url(clean_title)
+                self.log.debug("    尝试豆瓣在线搜索: %s", clean_title)
+
+                response = await self.fetch_with_breaker(search_url, headers=DOUBAN_SEARCH_HEADERS, timeout=15)
+                if self.parser.douban_search_blocked(response, clean_title):
+                    return "N/A", "N/A", MISS_BLOCKED
+                response.raise_for_status()
+
+                best_candidate = self.parser.best_douban_candidate(response.content, target_year)
+                if best_candidate is None:
+                    return "N/A", "N/A", MISS_NO_RESULTS
+
+                chinese_title, rating = await self.get_douban_movie_details(best_candidate['url'])
+                return self.parser.douban_outcome(best_candidate, chinese_title, rating, target_year)
+
+            except Exception as e:
+                return "N/A", "N/A", self.parser.douban_lookup_error(e, NETWORK_ERRORS)
+
+    async def get_douban_movie_details(self, movie_url):
+        """获取豆瓣电影详情页面的 (中文片名, 评分)，见 BoxOfficeScraper.get_douban_movie_details"""
+        try:
+            response = await self.fetch_with_breaker(movie_url, headers=DOUBAN_DETAIL_HEADERS, timeout=15)
+            response.raise_for_status()
+            return self.parser.parse_douban_movie_details(response.content)
+        except Exception as e:
+            self.log.warning("    获取豆瓣详情出错: %s", e)
+            return "N/A", "N/A"
+
+
+async def scrape_range(year, start_month, end_month, cache_path=None):
+    """在一个事件循环中抓取指定年份的多个月份，并分别保存为CSV"""
+    async with AsyncBoxOfficeScraper(cache=cache_path) as scraper:
+        year_months = [(year, month) for month in range(start_month, end_month + 1)]
+        monthly_data = await scraper.scrape_months(year_months)
+
+    for (data_year, data_month), data in monthly_data.items():
+        if data:
+            scraper.parser.save_to_csv(data, data_year, data_month)
+        else:
+            log.error("✗ %s年%s月 未获取到数据", data_year, data_month)
+    return monthly_data
+
+
+def main():
+    """主函数"""
+    configure_logging()
+    print("=== BoxOfficeMojo 异步票房数据抓取工具 ===")
+    print()
+
+    try:
+        year = int(input("请输入年份 (例如: 2024): "))
+        start_month = int(input("请输入开始月份 (1-12): "))
+        end_month = int(input("请输入结束月份 (1-12): "))
+
+        if not (1 <= start_month <= 12) or not (1 <= end_month <= 12):
+            print("月份必须在1-12之间")
+            return
+
+        if start_month > end_month:
+            print("开始月份不能大于结束月份")
+            return
+
+        print()
+        asyncio.run(scrape_range(year, start_month, end_month))
+
+    except ValueError as e:
+        print(f"输入错误: {e}")
+    except KeyboardInterrupt:
+        print("\n用户取消操作")
+    except Exception as e:
+        print(f"发生错误: {e}")
+
+
+if __name__ == "__main__":
+    main()
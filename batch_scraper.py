@@ -1,69 +1,509 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import re
 import time
-from boxoffice_scraper import BoxOfficeScraper
+from concurrent.futures import ProcessPoolExecutor
 
+import pandas as pd
 
-def batch_scrape_multiple_months(year, start_month, end_month):
+from boxoffice_scraper import BoxOfficeScraper, DEFAULT_TOP_N, MONTHLY_COLUMNS, PARSE_PARTIAL, monthly_csv_path
+from checkpoint import DEFAULT_CHECKPOINT_DIR, MonthCheckpoint
+from columnar_export import columnar_format
+from imdb_dataset import DEFAULT_MAX_YEAR_DIFF, parse_max_year_diff
+from metrics import MetricsRegistry
+from negative_cache import DEFAULT_NEGATIVE_CACHE_PATH
+from rate_limiter import SharedHostRateLimiter
+from rating_memo import RatingMemo
+from response_cache import CACHE_USE, CACHE_REFRESH
+from row_sinks import open_row_sink
+from scrape_log import LOGGING_CONFIG, VERBOSITY_DEBUG, VERBOSITY_NORMAL, VERBOSITY_QUIET, configure_logging, get_logger
+
+
+# 默认的HTTP响应缓存位置，重复抓取已抓过的月份时直接读取缓存
+DEFAULT_CACHE_PATH = "data/cache/http_cache.sqlite3"
+
+# 多年份范围抓取：每个工作单元包含的月份数，以及默认的进程数
+DEFAULT_UNIT_MONTHS = 12
+DEFAULT_WORKERS = 4
+
+# 批量抓取同时请求的IMDb候选详情页数量：新片的最佳候选常常还没有评分，同时请求前两名
+# 多数情况下省掉一次往返，每部电影最多多发1次IMDb请求
+DEFAULT_BATCH_SPECULATIVE_CANDIDATES = 2
+
+# 范围抓取合并文件的列：每月七列之前加上年份和月份
+RANGE_COLUMNS = ['年份', '月份'] + MONTHLY_COLUMNS
+
+log = get_logger('batch')
+summary_log = get_logger('summary')
+
+# 工作进程内的抓取器，由 init_range_worker 创建，进程内各工作单元共用
+WORKER_SCRAPER = None
+# 工作进程每抓完一个月份放入 (年份, 月份, 当月数据) 的队列，由 init_range_worker 设置
+WORKER_RESULTS = None
+
+# 主进程等待月份结果时检查工作单元状态的间隔（秒）
+RESULT_POLL_SECONDS = 0.2
+
+
+def negative_cache_path(cache_path, refresh):
+    """
+    查询失败缓存的路径：与HTTP响应缓存同时启用，--refresh 或 --no-cache 时重新查询所有电影
+
+    Returns:
+        str: 数据库路径，None表示不使用
+    """
+    if cache_path is None or refresh:
+        return None
+    return DEFAULT_NEGATIVE_CACHE_PATH
+
+
+def load_completed_month(year, month, checkpoint):
+    """
+    读取已完成月份的数据：检查点已标记完成，或当月CSV已存在且没有未完成的检查点
+    
+    Returns:
+        list: 当月数据，月份未完成时返回None
+    """
+    csv_path = monthly_csv_path(year, month)
+    if not checkpoint.done and not (os.path.exists(csv_path) and not checkpoint.movies):
+        return None
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        return df.to_dict('records')
+    return checkpoint.saved_movies()
+
+
+def scrape_month_checkpointed(scraper, year, month, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, resume=False, sink=None,
+                              replay=True):
+    """
+    抓取一个月份，每部电影完成后立即写入检查点，全部完成后保存当月CSV
+    
+    resume 为 True 时已完成的月份直接读取已保存的结果，未完成的月份从上次中断的电影继续；
+    否则清除该月份的检查点重新抓取。
+    
+    Args:
+        sink (RowSink): 流式输出，每部电影完成后立即写入（包括已完成月份读取的结果），
+            写入的行带有年份和月份，输出是否包含这两列由输出的列决定
+        replay (bool): 已完成月份和从检查点恢复的电影是否也写入 sink；
+            续抓时追加到上次的输出文件，这些行上次已经写入，为False
+    
+    Returns:
+        tuple: (当月数据, 是否跳过了已完成的月份)
+    """
+    checkpoint = MonthCheckpoint(checkpoint_dir, year, month)
+    if resume:
+        saved = load_completed_month(year, month, checkpoint)
+        if saved is not None:
+            # 已完成月份查询过评分的电影也放入评分缓存，后续月份重复上榜的电影无需再查询；
+            # 检查点只记录实际查询过的电影，超出 enrich_limit 的长尾电影不放入
+            for movie_data in checkpoint.saved_movies():
+                scraper.remember_ratings(movie_data, year)
+            if sink is not None and replay:
+                sink.write_all({'年份': year, '月份': month, **movie_data} for movie_data in saved)
+            return saved, True
+    else:
+        checkpoint.reset()
+    
+    # 上次运行已写入输出的电影：与 MonthCheckpoint.restore 一样按序号和片名核对
+    written = {} if replay else dict(checkpoint.movies)
+    monthly_data = []
+    for index, movie_data in enumerate(scraper.iter_monthly_data(year, month, checkpoint=checkpoint), 1):
+        monthly_data.append(movie_data)
+        if sink is not None and written.get(index, {}).get('英文片名') != movie_data['英文片名']:
+            sink.write({'年份': year, '月份': month, **movie_data})
+    if monthly_data:
+        scraper.save_to_csv(monthly_data, year, month)
+        checkpoint.mark_done(len(monthly_data))
+    return monthly_data, False
+
+
+def append_to_output(output, resume):
+    """
+    续抓时是否追加到上次的合并文件：文件已存在且有内容，且不是列式文件（列式文件不支持追加，整体重写）
+    """
+    return (resume and columnar_format(output) is None
+            and os.path.exists(output) and os.path.getsize(output) > 0)
+
+
+def written_months(output):
+    """
+    已有合并文件（CSV 或 JSON Lines，含年份和月份列）中出现过的月份
+
+    Returns:
+        set: (年份, 月份) 集合
+    """
+    jsonl = output.lower().endswith(('.jsonl', '.ndjson'))
+    with open(output, encoding='utf-8' if jsonl else 'utf-8-sig', newline='') as f:
+        rows = (json.loads(line) for line in f if line.strip()) if jsonl else csv.DictReader(f)
+        return {(int(row['年份']), int(row['月份'])) for row in rows if row.get('年份') and row.get('月份')}
+
+
+def batch_scrape_multiple_months(year, start_month, end_month, concurrent=False,
+                                 cache_path=DEFAULT_CACHE_PATH, refresh=False,
+                                 resume=False, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, output=None,
+                                 metrics_path=None, top_n=DEFAULT_TOP_N, enrich_limit=None, imdb_dataset=None,
+                                 speculative_candidates=DEFAULT_BATCH_SPECULATIVE_CANDIDATES,
+                                 imdb_max_year_diff=DEFAULT_MAX_YEAR_DIFF):
     """
     批量抓取多个月份的票房数据
     
+    每部电影完成后立即追加到合并文件，不在内存中累积所有月份的数据。
+    续抓时追加到已有的合并文件，上次已写入的月份和电影不再重复写入；已有的合并文件不会被删除。
+    
     Args:
         year (int): 年份
         start_month (int): 开始月份
         end_month (int): 结束月份
+        concurrent (bool): 是否并发获取每月电影的评分信息
+        cache_path (str): HTTP响应缓存路径，None表示不使用缓存
+        refresh (bool): 是否忽略已有缓存，重新请求并更新缓存
+        resume (bool): 是否跳过已完成的月份，并从上次中断的电影继续
+        checkpoint_dir (str): 检查点目录
+        output (str): 合并文件名（.csv、.jsonl、.arrow 或 .parquet），None时按范围自动生成CSV
+        metrics_path (str): 抓取结束后导出指标的文件（.prom 为 Prometheus 文本格式，否则为JSON），None表示不导出
+        top_n (int): 每月取榜单前多少名，None表示整张榜单
+        enrich_limit (int): 每月只为排名前多少的电影查询评分，None表示全部查询，0表示只抓取票房表格
+        imdb_dataset (str): 离线IMDb数据集路径（见 imdb_dataset.py），None表示只在线搜索
+        speculative_candidates (int): 同时请求排名最前的几个IMDb候选详情页，1表示逐个请求
+        imdb_max_year_diff (int): 数据集中的电影与目标年份最多相差几年，超出时在线搜索；None表示不限
     """
-    scraper = BoxOfficeScraper()
-    all_data = []
+    # 各站点的访问频率由抓取器内置的限速器控制，无需在月份之间额外等待；
+    # 跨月份重复上榜的电影只查询一次评分；命中缓存时解析成为主要开销，使用局部解析
+    scraper = BoxOfficeScraper(
+        concurrent=concurrent,
+        cache=cache_path,
+        cache_mode=CACHE_REFRESH if refresh else CACHE_USE,
+        negative_cache=negative_cache_path(cache_path, refresh),
+        rating_memo=RatingMemo(),
+        parse_mode=PARSE_PARTIAL,
+        top_n=top_n,
+        enrich_limit=enrich_limit,
+        imdb_dataset=imdb_dataset,
+        imdb_max_year_diff=imdb_max_year_diff,
+        speculative_candidates=speculative_candidates,
+    )
+    if output is None:
+        # 为批量数据创建特殊的文件名
+        output = f"data/batch_boxoffice_{year}_{start_month:02d}_to_{end_month:02d}.csv"
     
     print(f"=== 批量抓取 {year}年 {start_month}月 到 {end_month}月 的票房数据 ===")
+    print(f"数据实时写入: {output}")
     print()
     
-    for month in range(start_month, end_month + 1):
-        print(f"正在抓取 {year}年{month}月...")
-        
-        try:
-            # 抓取当月数据
-            monthly_data = scraper.scrape_monthly_data(year, month)
-            
-            if monthly_data:
-                all_data.extend(monthly_data)
-                print(f"✓ {year}年{month}月 抓取成功：{len(monthly_data)} 条数据")
-            else:
-                print(f"✗ {year}年{month}月 抓取失败")
+    existed = os.path.exists(output)
+    append = append_to_output(output, resume)
+    total = 0
+    with open_row_sink(output, MONTHLY_COLUMNS, append=append) as sink:
+        for month in range(start_month, end_month + 1):
+            log.info("正在抓取 %s年%s月...", year, month)
             
-            # 添加延时，避免请求过于频繁
-            if month < end_month:
-                print("等待 2 秒...")
-                time.sleep(2)
+            try:
+                # 抓取当月数据，每部电影完成后立即写入检查点和合并文件
+                monthly_data, skipped = scrape_month_checkpointed(scraper, year, month, checkpoint_dir, resume, sink,
+                                                                  replay=not append)
+                total += len(monthly_data)
                 
-        except Exception as e:
-            print(f"✗ {year}年{month}月 抓取出错: {e}")
-        
-        print("-" * 30)
+                if skipped:
+                    log.info("✓ %s年%s月 已完成，跳过：%s 条数据", year, month, len(monthly_data))
+                elif monthly_data:
+                    log.info("✓ %s年%s月 抓取成功：%s 条数据", year, month, len(monthly_data))
+                else:
+                    log.error("✗ %s年%s月 抓取失败", year, month)
+                    
+            except Exception as e:
+                log.error("✗ %s年%s月 抓取出错: %s", year, month, e)
+            
+            log.info("-" * 30)
     
-    # 保存所有数据
-    if all_data:
-        # 为批量数据创建特殊的文件名
-        filename = f"data/batch_boxoffice_{year}_{start_month:02d}_to_{end_month:02d}.csv"
-        saved_filename = scraper.save_to_csv(all_data, year, start_month, filename)
-        
-        print(f"\n总计抓取了 {len(all_data)} 条电影数据")
-        print(f"所有数据已保存到: {saved_filename}")
+    if total:
+        print(f"\n总计抓取了 {total} 条电影数据")
+        print(f"所有数据已保存到: {output}")
         
         # 显示统计信息
         print(f"\n数据统计:")
         print(f"  时间范围: {year}年{start_month}月 到 {end_month}月")
-        print(f"  总电影数: {len(all_data)} 条")
+        print(f"  总电影数: {total} 条")
         
         # 按月份统计（基于抓取的月份范围）
         months_covered = end_month - start_month + 1
-        avg_per_month = len(all_data) / months_covered
+        avg_per_month = total / months_covered
         print(f"  平均每月: {avg_per_month:.1f} 条数据")
+        print(f"  实际查询评分: {len(scraper.rating_memo)} 部电影 (重复上榜复用 {scraper.rating_memo.hits} 次)")
+        
+        # 连接复用统计
+        print(f"\n连接复用:")
+        for host, stat in scraper.connection_stats().items():
+            print(f"  {host}: 请求 {stat['requests']} 次, 新建连接 {stat['new']} 个, 复用 {stat['reused']} 次")
+        
+        if scraper.cache is not None:
+            cache_stats = scraper.cache.stats()
+            print(f"\n响应缓存: 命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次, "
+                  f"共 {cache_stats['entries']} 条 ({cache_stats['bytes'] / 1024 / 1024:.1f} MB)")
+        
+        scraper.metrics.print_summary()
     else:
+        if not existed:
+            os.remove(output)
         print("\n未获取到任何数据")
+    
+    if metrics_path:
+        print(f"指标已导出到: {scraper.metrics.dump(metrics_path)}")
 
 
-def main():
-    """主函数"""
+def parse_year_month(text):
+    """
+    解析 'YYYY-MM' 格式的年月
+
+    Returns:
+        tuple: (年份, 月份)
+    """
+    match = re.fullmatch(r'\s*(\d{4})-(\d{1,2})\s*', text)
+    if not match:
+        raise ValueError(f"无效的年月: {text}（应为 YYYY-MM）")
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        raise ValueError(f"无效的月份: {text}")
+    return year, month
+
+
+def parse_month_span(text):
+    """
+    解析年月范围，如 '1990-01..2025-06'；单个 '2025-05' 表示只抓一个月
+
+    Returns:
+        list: 按时间顺序排列的 (年份, 月份) 列表
+    """
+    start_text, _, end_text = text.partition('..')
+    start = parse_year_month(start_text)
+    end = parse_year_month(end_text) if end_text else start
+    if start > end:
+        raise ValueError(f"开始年月不能晚于结束年月: {text}")
+
+    months = []
+    year, month = start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def parse_top_n(text):
+    """解析 --top-n：正整数，或 all 表示整张榜单"""
+    if text.strip().lower() == 'all':
+        return None
+    value = int(text)
+    if value <= 0:
+        raise ValueError(f"无效的名次数: {text}")
+    return value
+
+
+def split_work_units(months, unit_months=DEFAULT_UNIT_MONTHS):
+    """
+    把月份列表切分为工作单元，每个单元由一个进程按顺序抓取，单元内重复上榜的电影只查询一次评分
+
+    Returns:
+        list: 工作单元列表，每个单元是 (年份, 月份) 列表
+    """
+    unit_months = max(1, unit_months)
+    return [months[i:i + unit_months] for i in range(0, len(months), unit_months)]
+
+
+def init_range_worker(rate_limiter, scraper_options, log_config=None, results=None):
+    """
+    进程池初始化：在工作进程中创建抓取器
+
+    Args:
+        rate_limiter (SharedHostRateLimiter): 所有进程共享的站点限速器
+        scraper_options (dict): 传给 BoxOfficeScraper 的其他参数
+        log_config (dict): 主进程的 configure_logging 参数，工作进程使用相同的输出设置
+        results (multiprocessing.Queue): 月份结果队列，见 scrape_work_unit
+    """
+    global WORKER_SCRAPER, WORKER_RESULTS
+    if log_config:
+        configure_logging(**log_config)
+    WORKER_SCRAPER = BoxOfficeScraper(
+        rate_limits=rate_limiter,
+        rating_memo=RatingMemo(),
+        parse_mode=PARSE_PARTIAL,
+        **scraper_options,
+    )
+    WORKER_RESULTS = results
+
+
+def scrape_work_unit(unit, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, resume=False):
+    """
+    在工作进程中抓取一个工作单元，每个月份单独保存为CSV并写入检查点
+
+    每个月份完成后立即把 (年份, 月份, 当月数据) 放入结果队列，主进程不必等整个单元完成就能写入合并文件；
+    抓取失败的月份数据为空列表。各进程的查询失败缓存共用一个数据库，开始前重新加载布隆过滤器，
+    使其他进程已记录的失败在本单元中可见。
+
+    Returns:
+        dict: 本单元的指标快照
+    """
+    if WORKER_SCRAPER.negative_cache is not None:
+        WORKER_SCRAPER.negative_cache.reload()
+    for year, month in unit:
+        try:
+            monthly_data, skipped = scrape_month_checkpointed(WORKER_SCRAPER, year, month, checkpoint_dir, resume)
+            if skipped:
+                log.info("✓ %s年%s月 已完成，跳过", year, month)
+        except Exception as e:
+            log.error("✗ %s年%s月 抓取出错: %s", year, month, e)
+            monthly_data = []
+        WORKER_RESULTS.put((year, month, monthly_data or []))
+    # 进程内的各工作单元共用一个抓取器，取出本单元的指标后清零，由主进程汇总
+    snapshot = WORKER_SCRAPER.metrics.snapshot()
+    WORKER_SCRAPER.metrics.reset()
+    return snapshot
+
+
+def merge_unit_metrics(metrics, future, unit):
+    """
+    等待工作单元结束，把它的指标快照合并到主进程的汇总指标
+
+    Args:
+        metrics (MetricsRegistry): 主进程的汇总指标
+        future (Future): scrape_work_unit 的执行结果
+        unit (list): 该工作单元的 (年份, 月份) 列表
+    """
+    try:
+        metrics.merge(future.result())
+    except Exception as e:
+        log.error("✗ 工作单元 %s-%02d 出错: %s", unit[0][0], unit[0][1], e)
+
+
+def batch_scrape_range(months, workers=DEFAULT_WORKERS, unit_months=DEFAULT_UNIT_MONTHS, concurrent=False,
+                       cache_path=DEFAULT_CACHE_PATH, refresh=False, rate_limits=None, output=None,
+                       resume=False, checkpoint_dir=DEFAULT_CHECKPOINT_DIR, metrics_path=None,
+                       top_n=DEFAULT_TOP_N, enrich_limit=None, imdb_dataset=None,
+                       speculative_candidates=DEFAULT_BATCH_SPECULATIVE_CANDIDATES, imdb_max_year_diff=DEFAULT_MAX_YEAR_DIFF):
+    """
+    抓取任意年月范围的票房数据：切分为工作单元后由进程池并行抓取，各进程共享站点限速
+
+    工作进程每抓完一个月份就通过队列送回，主进程按时间顺序写入合并文件，先到的后续月份暂存到之前的月份写入为止。
+    续抓时追加到已有的合并文件，其中已有的月份不再重复写入；已有的合并文件不会被删除。
+
+    Args:
+        months (list): (年份, 月份) 列表，可由 parse_month_span 生成
+        workers (int): 进程数
+        unit_months (int): 每个工作单元包含的月份数
+        concurrent (bool): 每个进程内是否并发获取电影的评分信息
+        cache_path (str): HTTP响应缓存路径（各进程共用），None表示不使用缓存
+        refresh (bool): 是否忽略已有缓存，重新请求并更新缓存
+        rate_limits (dict): 站点域名 -> 每秒请求数，所有进程合计的限速
+        output (str): 合并文件名（.csv、.jsonl、.arrow 或 .parquet），None时按范围自动生成CSV
+        resume (bool): 是否跳过已完成的月份，并从上次中断的电影继续
+        checkpoint_dir (str): 检查点目录
+        metrics_path (str): 抓取结束后导出汇总指标的文件（.prom 为 Prometheus 文本格式，否则为JSON），None表示不导出
+        top_n (int): 每月取榜单前多少名，None表示整张榜单
+        enrich_limit (int): 每月只为排名前多少的电影查询评分，None表示全部查询，0表示只抓取票房表格
+        imdb_dataset (str): 离线IMDb数据集路径（各进程分别打开），None表示只在线搜索
+        speculative_candidates (int): 同时请求排名最前的几个IMDb候选详情页，1表示逐个请求
+        imdb_max_year_diff (int): 数据集中的电影与目标年份最多相差几年，超出时在线搜索；None表示不限
+
+    Returns:
+        dict: (年份, 月份) -> 当月电影数量
+    """
+    units = split_work_units(months, unit_months)
+    # 限速器在主进程创建，令牌桶状态通过共享内存在各进程间同步
+    rate_limiter = SharedHostRateLimiter(rate_limits)
+    scraper_options = {
+        'concurrent': concurrent,
+        'cache': cache_path,
+        'cache_mode': CACHE_REFRESH if refresh else CACHE_USE,
+        'negative_cache': negative_cache_path(cache_path, refresh),
+        'top_n': top_n,
+        'enrich_limit': enrich_limit,
+        'imdb_dataset': imdb_dataset,
+        'imdb_max_year_diff': imdb_max_year_diff,
+        'speculative_candidates': speculative_candidates,
+    }
+
+    first, last = months[0], months[-1]
+    if output is None:
+        output = f"data/batch_boxoffice_{first[0]}_{first[1]:02d}_to_{last[0]}_{last[1]:02d}.csv"
+    print(f"=== 批量抓取 {first[0]}年{first[1]}月 到 {last[0]}年{last[1]}月 的票房数据 ===")
+    print(f"共 {len(months)} 个月, {len(units)} 个工作单元, {workers} 个进程")
+    print(f"数据实时写入: {output}")
+    print()
+
+    os.makedirs('data', exist_ok=True)
+    existed = os.path.exists(output)
+    append = append_to_output(output, resume)
+    # 续抓时追加到上次的合并文件，其中已有的月份不再重复写入
+    written = written_months(output) if append else set()
+    counts = {}
+    metrics = MetricsRegistry()
+    # 月份完成的先后不定，先到的后续月份暂存，按时间顺序写入合并文件后即释放
+    position = {year_month: i for i, year_month in enumerate(months)}
+    pending = {}
+    next_month = 0
+    results = multiprocessing.Queue()
+    start_time = time.monotonic()
+    with open_row_sink(output, RANGE_COLUMNS, append=append) as sink, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_range_worker,
+                                initargs=(rate_limiter, scraper_options, dict(LOGGING_CONFIG), results)) as executor:
+        futures = {executor.submit(scrape_work_unit, unit, checkpoint_dir, resume): unit for unit in units}
+        running = set(futures)
+        while next_month < len(months):
+            try:
+                year, month, monthly_data = results.get(timeout=RESULT_POLL_SECONDS)
+                if position[(year, month)] >= next_month:
+                    pending[(year, month)] = monthly_data
+            except queue.Empty:
+                # 所有单元都已结束、队列中也没有结果：剩下的月份不会再到达（工作进程异常退出）
+                if not running:
+                    for year_month in months[next_month:]:
+                        pending.setdefault(year_month, [])
+
+            for future in [future for future in running if future.done()]:
+                running.discard(future)
+                merge_unit_metrics(metrics, future, futures[future])
+
+            while next_month < len(months) and months[next_month] in pending:
+                year, month = months[next_month]
+                monthly_data = pending.pop((year, month))
+                counts[(year, month)] = len(monthly_data)
+                if (year, month) not in written:
+                    sink.write_all({'年份': year, '月份': month, **movie} for movie in monthly_data)
+                next_month += 1
+                summary_log.info("✓ 已写入 %s年%s月 (%s/%s 个月, 已用时 %.0f秒)",
+                                 year, month, next_month, len(months), time.monotonic() - start_time)
+
+        # 最后几个月份写入时，所在单元可能还没返回指标
+        for future in running:
+            merge_unit_metrics(metrics, future, futures[future])
+
+    total = sum(counts.values())
+    if total:
+        failed = [f"{year}-{month:02d}" for year, month in months if not counts.get((year, month))]
+        print(f"\n总计抓取了 {total} 条电影数据")
+        print(f"所有数据已保存到: {output}")
+        if failed:
+            print(f"未获取到数据的月份 ({len(failed)} 个): {', '.join(failed)}")
+        metrics.print_summary()
+    else:
+        if not existed:
+            os.remove(output)
+        print("\n未获取到任何数据")
+    if metrics_path:
+        print(f"指标已导出到: {metrics.dump(metrics_path)}")
+    return counts
+
+
+def interactive_main(resume=False, metrics_path=None):
+    """
+    交互模式：按提示输入单个年份内的月份范围
+    
+    Args:
+        resume (bool): 是否跳过已完成的月份，并从上次中断的电影继续
+        metrics_path (str): 抓取结束后导出指标的文件，None表示不导出
+    """
     print("=== BoxOfficeMojo 批量票房数据抓取工具 ===")
     print()
     
@@ -85,7 +525,7 @@ def main():
             return
         
         print()
-        batch_scrape_multiple_months(year, start_month, end_month)
+        batch_scrape_multiple_months(year, start_month, end_month, resume=resume, metrics_path=metrics_path)
         
     except ValueError as e:
         print(f"输入错误: {e}")
@@ -95,5 +535,70 @@ def main():
         print(f"发生错误: {e}")
 
 
+def main():
+    """主函数：提供年月范围时按范围并行抓取，否则进入交互模式"""
+    parser = argparse.ArgumentParser(description="BoxOfficeMojo 批量票房数据抓取工具")
+    parser.add_argument('span', nargs='?', help="年月范围，如 1990-01..2025-06；不提供时进入交互模式")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="并行抓取的进程数")
+    parser.add_argument('--unit-months', type=int, default=DEFAULT_UNIT_MONTHS, help="每个工作单元包含的月份数")
+    parser.add_argument('--concurrent', action='store_true', help="每个进程内并发获取评分信息")
+    parser.add_argument('--refresh', action='store_true', help="忽略已有缓存，重新请求并更新缓存")
+    parser.add_argument('--no-cache', action='store_true', help="不使用HTTP响应缓存")
+    parser.add_argument('--output', help="合并文件名，.jsonl 为 JSON Lines，.arrow/.parquet 为带类型的列式文件，否则为CSV")
+    parser.add_argument('--resume', action='store_true', help="跳过已完成的月份，并从上次中断的电影继续")
+    parser.add_argument('--top-n', type=parse_top_n, default=DEFAULT_TOP_N,
+                        help=f"每月取榜单前多少名，all 表示整张榜单（默认 {DEFAULT_TOP_N}）")
+    parser.add_argument('--enrich-top', type=int, help="每月只为排名前多少的电影查询评分，其余只保留票房数据")
+    parser.add_argument('--table-only', action='store_true', help="只抓取票房表格，不查询评分（每月一次请求）")
+    parser.add_argument('--speculative', type=int, default=DEFAULT_BATCH_SPECULATIVE_CANDIDATES,
+                        help="同时请求排名最前的几个IMDb候选详情页，最佳候选没有评分时减少等待，1表示逐个请求"
+                             f"（默认 {DEFAULT_BATCH_SPECULATIVE_CANDIDATES}）")
+    parser.add_argument('--imdb-dataset', help="离线IMDb数据集（python imdb_dataset.py ingest 生成），优先从中查询IMDb评分")
+    parser.add_argument('--imdb-max-year-diff', type=parse_max_year_diff, default=DEFAULT_MAX_YEAR_DIFF,
+                        help="数据集中的电影与票房年份最多相差几年，超出时在线搜索；any 表示不限"
+                             f"（默认 {DEFAULT_MAX_YEAR_DIFF}）")
+    parser.add_argument('--quiet', action='store_true', help="只输出每个月份的摘要和错误")
+    parser.add_argument('--verbose', action='store_true', help="输出每个搜索候选、每个表格行等调试信息")
+    parser.add_argument('--events', help="把抓取过程的日志事件以 JSON Lines 追加写入该文件")
+    parser.add_argument('--metrics', help="抓取结束后导出各阶段指标，.prom 为 Prometheus 文本格式，否则为JSON")
+    args = parser.parse_args()
+
+    verbosity = VERBOSITY_QUIET if args.quiet else VERBOSITY_DEBUG if args.verbose else VERBOSITY_NORMAL
+    configure_logging(verbosity, events_path=args.events)
+
+    if args.span is None:
+        interactive_main(resume=args.resume, metrics_path=args.metrics)
+        return
+
+    try:
+        months = parse_month_span(args.span)
+    except ValueError as e:
+        print(f"输入错误: {e}")
+        return
+    if args.imdb_dataset and not os.path.exists(args.imdb_dataset):
+        print(f"输入错误: IMDb数据集不存在: {args.imdb_dataset}（请先运行 python imdb_dataset.py ingest）")
+        return
+
+    try:
+        batch_scrape_range(
+            months,
+            workers=args.workers,
+            unit_months=args.unit_months,
+            concurrent=args.concurrent,
+            cache_path=None if args.no_cache else DEFAULT_CACHE_PATH,
+            refresh=args.refresh,
+            output=args.output,
+            resume=args.resume,
+            metrics_path=args.metrics,
+            top_n=args.top_n,
+            enrich_limit=0 if args.table_only else args.enrich_top,
+            imdb_dataset=args.imdb_dataset,
+            imdb_max_year_diff=args.imdb_max_year_diff,
+            speculative_candidates=args.speculative,
+        )
+    except KeyboardInterrupt:
+        print("\n用户取消操作")
+
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
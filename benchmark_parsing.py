@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面解析性能对比：完整解析（html.parser 整页DOM） vs 局部解析（lxml + SoupStrainer）
+
+对 fixtures/ 下的IMDb搜索页、IMDb详情页和豆瓣详情页分别统计
+每页CPU时间和峰值内存，并确认两种模式的解析结果一致。
+
+用法:
+    python benchmark_parsing.py [--iterations 20] [--fixtures fixtures]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+from boxoffice_scraper import BoxOfficeScraper, PARSE_FULL, PARSE_PARTIAL
+
+
+# (名称, 夹具文件, 解析函数)
+PARSE_CASES = [
+    ('IMDb搜索页', 'imdb_search.html', lambda scraper, html: len(scraper.extract_imdb_candidates(html, 2025))),
+    ('IMDb详情页', 'imdb_title.html', lambda scraper, html: scraper.parse_imdb_rating_selectors(html)),
+    ('豆瓣详情页', 'douban_subject.html', lambda scraper, html: scraper.parse_douban_details_selectors(html)),
+]
+
+
+def measure(parse, scraper, html, iterations):
+    """
+    测量解析函数的耗时和内存
+
+    Returns:
+        tuple: (解析结果, 每页CPU毫秒数, 峰值内存KB)
+    """
+    # 解析过程中的进度输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        # CPU时间：多次运行取平均
+        start = time.process_time()
+        for _ in range(iterations):
+            result = parse(scraper, html)
+        cpu_ms = (time.process_time() - start) / iterations * 1000
+
+        # 峰值内存：单独运行一次，避免 tracemalloc 干扰计时
+        tracemalloc.start()
+        parse(scraper, html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, cpu_ms, peak / 1024
+
+
+def run_benchmark(fixtures_dir='fixtures', iterations=20):
+    """运行所有解析场景的对比，返回结果列表"""
+    scrapers = {
+        PARSE_FULL: BoxOfficeScraper(parse_mode=PARSE_FULL),
+        PARSE_PARTIAL: BoxOfficeScraper(parse_mode=PARSE_PARTIAL),
+    }
+
+    results = []
+    for name, filename, parse in PARSE_CASES:
+        with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+            html = f.read()
+
+        row = {'page': name, 'bytes': len(html)}
+        for mode, scraper in scrapers.items():
+            value, cpu_ms, peak_kb = measure(parse, scraper, html, iterations)
+            row[mode] = {'result': value, 'cpu_ms': cpu_ms, 'peak_kb': peak_kb}
+        row['same_result'] = row[PARSE_FULL]['result'] == row[PARSE_PARTIAL]['result']
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比完整解析与局部解析的CPU时间和峰值内存")
+    parser.add_argument('--iterations', type=int, default=20, help="每个场景的重复次数")
+    parser.add_argument('--fixtures', default='fixtures', help="HTML夹具目录")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.fixtures, args.iterations)
+
+    print(f"{'页面':<10} {'大小KB':>8} {'完整ms':>9} {'局部ms':>9} {'完整内存KB':>11} {'局部内存KB':>11} {'结果一致':>6}")
+    print("-" * 78)
+    for row in results:
+        full, partial = row[PARSE_FULL], row[PARSE_PARTIAL]
+        print(f"{row['page']:<10} {row['bytes'] / 1024:>8.1f} {full['cpu_ms']:>9.2f} {partial['cpu_ms']:>9.2f} "
+              f"{full['peak_kb']:>11.0f} {partial['peak_kb']:>11.0f} {'是' if row['same_result'] else '否':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线解析性能基准
+
+基于 fixtures/ 下录制的页面，对每条解析路径统计吞吐量（页/秒）、每行耗时（微秒）和峰值内存，
+完整解析与局部解析两种模式分别测量，结果写入JSON文件，便于比较不同版本的运行结果：
+
+- BoxOfficeMojo 月度榜单表格        parse_monthly_table（scrape_monthly_data 的解析部分；局部模式不构建soup）
+                                    extract_month_table（整张表格的带类型行）
+- IMDb搜索页三种结构（方法1/2/3）    parse_imdb_search_results（候选详情页从夹具回放）
+- IMDb详情页                        parse_imdb_rating_page（JSON-LD）/ parse_imdb_rating_selectors（CSS选择器）
+- 豆瓣搜索页                        parse_douban_search_results（详情页从夹具回放）
+- 豆瓣详情页                        get_douban_movie_details
+                                    parse_douban_movie_details（JSON-LD）/ parse_douban_details_selectors（CSS选择器）
+
+详情页的两种评分提取路径成对测量，结果末尾列出JSON-LD路径每页节省的CPU时间。
+
+所有页面请求都由 FixtureScraper 从夹具文件回放，不访问网络。
+
+用法:
+    python benchmark_suite.py [--iterations 20] [--output data/benchmarks/run.json] [--compare 上次结果.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import bs4
+import lxml.etree
+import requests
+
+from boxoffice_scraper import BoxOfficeScraper, PARSE_FULL, PARSE_PARTIAL
+from fast_extract import extract_month_table
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_OUTPUT_DIR = "data/benchmarks"
+
+# 回放规则：(URL片段, 夹具文件)，按顺序匹配第一条
+REPLAY_ROUTES = [
+    ('imdb.com/title/', 'imdb_title.html'),
+    ('douban.com/subject/', 'douban_subject.html'),
+    ('douban.com/link2/', 'douban_subject.html'),
+]
+
+DOUBAN_SUBJECT_URL = "https://movie.douban.com/subject/27071232/"
+
+# (场景名, 夹具文件, 测量的函数, 运行函数, 行数函数)
+# 运行函数返回解析结果；行数函数返回页面中的数据行数（榜单电影数、搜索候选数），用于计算每行耗时
+BENCHMARK_CASES = [
+    ('bom_month_table', 'bom_month.html', 'parse_monthly_table',
+     lambda scraper, html: len(scraper.parse_monthly_table(html)),
+     lambda scraper, html: len(scraper.parse_monthly_table(html))),
+    ('bom_month_typed', 'bom_month.html', 'extract_month_table',
+     lambda scraper, html: len(extract_month_table(html, 2025, 5)),
+     lambda scraper, html: len(extract_month_table(html, 2025, 5))),
+    ('imdb_search_method1', 'imdb_search_legacy.html', 'parse_imdb_search_results',
+     lambda scraper, html: scraper.parse_imdb_search_results(html, 2025),
+     lambda scraper, html: len(scraper.extract_imdb_candidates(html, 2025))),
+    ('imdb_search_method2', 'imdb_search.html', 'parse_imdb_search_results',
+     lambda scraper, html: scraper.parse_imdb_search_results(html, 2025),
+     lambda scraper, html: len(scraper.extract_imdb_candidates(html, 2025))),
+    ('imdb_search_method3', 'imdb_search_findresult.html', 'parse_imdb_search_results',
+     lambda scraper, html: scraper.parse_imdb_search_results(html, 2025),
+     lambda scraper, html: len(scraper.extract_imdb_candidates(html, 2025))),
+    ('imdb_title', 'imdb_title.html', 'extract_imdb_rating',
+     lambda scraper, html: scraper.parse_imdb_rating_page(html),
+     lambda scraper, html: 1),
+    ('douban_search', 'douban_search.html', 'parse_douban_search_results',
+     lambda scraper, html: scraper.parse_douban_search_results(html, 2025),
+     lambda scraper, html: len(scraper.extract_douban_candidates(html, 2025))),
+    ('imdb_title_css', 'imdb_title.html', 'parse_imdb_rating_selectors',
+     lambda scraper, html: scraper.parse_imdb_rating_selectors(html),
+     lambda scraper, html: 1),
+    ('douban_subject', 'douban_subject.html', 'get_douban_movie_details',
+     lambda scraper, html: scraper.get_douban_movie_details(DOUBAN_SUBJECT_URL),
+     lambda scraper, html: 1),
+    ('douban_detail', 'douban_subject.html', 'parse_douban_movie_details',
+     lambda scraper, html: scraper.parse_douban_movie_details(html),
+     lambda scraper, html: 1),
+    ('douban_detail_css', 'douban_subject.html', 'parse_douban_details_selectors',
+     lambda scraper, html: scraper.parse_douban_details_selectors(html),
+     lambda scraper, html: 1),
+]
+
+# 评分提取路径的对比：(JSON-LD场景, CSS选择器场景)
+EXTRACTION_PAIRS = [
+    ('imdb_title', 'imdb_title_css'),
+    ('douban_detail', 'douban_detail_css'),
+]
+
+
+def load_fixture(filename, fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+        return f.read()
+
+
+class FixtureScraper(BoxOfficeScraper):
+    """从夹具文件回放页面请求的抓取器，解析逻辑与 BoxOfficeScraper 完全相同"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = {filename: load_fixture(filename, fixtures_dir) for _, filename in REPLAY_ROUTES}
+
+    def fetch_page(self, url, headers=None, timeout=10, use_cache=True, cancelled=None):
+        """按URL回放夹具页面，未匹配的URL返回404"""
+        response = requests.Response()
+        response.url = url
+        response.status_code = 404
+        response._content = b''
+        for fragment, filename in REPLAY_ROUTES:
+            if fragment in url:
+                response.status_code = 200
+                response._content = self.pages[filename]
+                response.headers['Content-Type'] = 'text/html; charset=utf-8'
+                break
+        return response
+
+
+def measure(run, scraper, html, iterations):
+    """
+    测量一个场景
+
+    Returns:
+        tuple: (解析结果, 每页平均耗时秒数, 每页CPU秒数, 峰值内存字节数)
+    """
+    # 解析过程中的进度输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(scraper, html)  # 预热
+
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = run(scraper, html)
+        elapsed = (time.perf_counter() - start) / iterations
+        cpu = (time.process_time() - start_cpu) / iterations
+
+        # 峰值内存：单独运行一次，避免 tracemalloc 干扰计时
+        tracemalloc.start()
+        run(scraper, html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, elapsed, cpu, peak
+
+
+def run_suite(iterations=20, fixtures_dir=FIXTURES_DIR, modes=(PARSE_FULL, PARSE_PARTIAL), cases=None):
+    """
+    运行所有场景
+
+    Args:
+        iterations (int): 每个场景的重复次数
+        fixtures_dir (str): 夹具目录
+        modes (tuple): 要测量的解析模式
+        cases (list): 只运行这些场景名，None表示全部
+
+    Returns:
+        list: 每个 (场景, 解析模式) 一条结果
+    """
+    results = []
+    for mode in modes:
+        scraper = FixtureScraper(fixtures_dir, parse_mode=mode)
+        for name, filename, target, run, count_rows in BENCHMARK_CASES:
+            if cases is not None and name not in cases:
+                continue
+            html = load_fixture(filename, fixtures_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = count_rows(scraper, html)
+            value, elapsed, cpu, peak = measure(run, scraper, html, iterations)
+            results.append({
+                'case': name,
+                'function': target,
+                'mode': mode,
+                'fixture': filename,
+                'bytes': len(html),
+                'rows': rows,
+                'result': value if isinstance(value, (int, float, str)) else list(value),
+                'pages_per_sec': 1 / elapsed if elapsed else None,
+                'us_per_page': elapsed * 1e6,
+                'us_per_row': elapsed * 1e6 / rows if rows else None,
+                'cpu_us_per_page': cpu * 1e6,
+                'peak_kb': peak / 1024,
+            })
+        scraper.close()
+    return results
+
+
+def git_revision():
+    """当前代码的git提交号，不在git仓库中时返回None"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def build_report(results, iterations):
+    """带运行环境信息的完整报告"""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'beautifulsoup4': bs4.__version__,
+        'lxml': '.'.join(map(str, lxml.etree.LXML_VERSION)),
+        'iterations': iterations,
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current):
+    """
+    对比两次运行的吞吐量
+
+    Returns:
+        list: (场景, 解析模式, 基准页/秒, 当前页/秒, 变化比例)
+    """
+    previous = {(row['case'], row['mode']): row for row in baseline['results']}
+    changes = []
+    for row in current['results']:
+        old = previous.get((row['case'], row['mode']))
+        if old is None or not old['pages_per_sec'] or not row['pages_per_sec']:
+            continue
+        changes.append((row['case'], row['mode'], old['pages_per_sec'], row['pages_per_sec'],
+                        row['pages_per_sec'] / old['pages_per_sec'] - 1))
+    return changes
+
+
+def extraction_savings(results):
+    """
+    对比详情页两种评分提取路径的每页CPU时间
+
+    Returns:
+        list: (JSON-LD场景, 解析模式, CSS选择器微秒/页, JSON-LD微秒/页, 节省比例)
+    """
+    by_case = {(row['case'], row['mode']): row for row in results}
+    savings = []
+    for fast_case, selector_case in EXTRACTION_PAIRS:
+        for (case, mode), fast in by_case.items():
+            selector = by_case.get((selector_case, mode))
+            if case != fast_case or selector is None or not selector['cpu_us_per_page']:
+                continue
+            savings.append((fast_case, mode, selector['cpu_us_per_page'], fast['cpu_us_per_page'],
+                            1 - fast['cpu_us_per_page'] / selector['cpu_us_per_page']))
+    return savings
+
+
+def print_results(results):
+    print(f"{'场景':<20} {'模式':<8} {'大小KB':>7} {'行数':>5} {'页/秒':>9} {'微秒/行':>10} {'峰值内存KB':>11}")
+    print("-" * 78)
+    for row in results:
+        us_per_row = f"{row['us_per_row']:.1f}" if row['us_per_row'] is not None else '-'
+        print(f"{row['case']:<20} {row['mode']:<8} {row['bytes'] / 1024:>7.1f} {row['rows']:>5} "
+              f"{row['pages_per_sec']:>9.1f} {us_per_row:>10} {row['peak_kb']:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="基于录制页面的离线解析性能基准")
+    parser.add_argument('--iterations', type=int, default=20, help="每个场景的重复次数")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="HTML夹具目录")
+    parser.add_argument('--case', action='append', help="只运行指定场景，可重复指定")
+    parser.add_argument('--output', help="结果JSON文件，默认写入 data/benchmarks/ 下按时间命名的文件")
+    parser.add_argument('--compare', help="与之前的结果JSON对比吞吐量")
+    args = parser.parse_args()
+
+    results = run_suite(args.iterations, args.fixtures, cases=args.case)
+    report = build_report(results, args.iterations)
+    print_results(results)
+
+    savings = extraction_savings(results)
+    if savings:
+        print(f"\n详情页评分提取（每页CPU时间）:")
+        for case, mode, selector_us, fast_us, saved in savings:
+            print(f"  {case:<20} {mode:<8} CSS选择器 {selector_us:>9.1f} 微秒 -> JSON-LD {fast_us:>7.1f} 微秒 (节省 {saved:.1%})")
+
+    output = args.output
+    if output is None:
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"parsing_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n与 {args.compare}（{baseline.get('revision') or '未知版本'}）对比:")
+        for case, mode, old, new, change in compare_reports(baseline, report):
+            print(f"  {case:<20} {mode:<8} {old:>9.1f} -> {new:>9.1f} 页/秒 ({change:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,389 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
+import itertools
 import re
 import os
-from datetime import datetime
+import threading
 import time
+from datetime import datetime
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from circuit_breaker import (BREAKER_FAILURE_STATUSES, RETRY_STATUSES, CircuitOpenError, HostCircuitBreakers,
+                             backoff_delay, parse_retry_after)
+from douban_store import DEFAULT_MAPPING_PATH, get_mapping_store
+from fast_extract import extract_jsonld_movie, extract_jsonld_rating, iter_month_table_cells
+from http_session import SessionPool
+from imdb_dataset import DEFAULT_MAX_YEAR_DIFF, ImdbDataset
+from metrics import MetricsRegistry
+from negative_cache import (CONFIRMED_MISSES, MISS_BLOCKED, MISS_NO_RATING, MISS_NO_RESULTS, SOURCE_DOUBAN,
+                            SOURCE_IMDB, NegativeCache)
+from rate_limiter import HostRateLimiter, host_key
+from response_cache import ResponseCache, CACHE_USE
+from scrape_log import configure_logging, event, get_instance_logger, get_logger
+
+
+# 豆瓣搜索页专用请求头
+DOUBAN_SEARCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+}
+
+# 豆瓣详情页请求头
+DOUBAN_DETAIL_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+# 页面解析模式
+PARSE_FULL = 'full'        # html.parser 构建整页DOM
+PARSE_PARTIAL = 'partial'  # lxml + SoupStrainer，只构建需要的子树
+
+# 详情页评分的提取路径
+EXTRACT_JSONLD = 'jsonld'      # 页面嵌入的结构化数据，直接从字节提取
+EXTRACT_SELECTOR = 'selector'  # 构建soup后按CSS选择器查找
+
+
+def class_pattern(*class_names):
+    """
+    匹配class属性中任一类名的正则
+
+    SoupStrainer 过滤时class属性尚未按空格拆分，需要用正则按单词边界匹配
+    """
+    names = '|'.join(re.escape(name) for name in class_names)
+    return re.compile(rf'(?:^|\s)(?:{names})(?:\s|$)')
+
+
+# IMDb搜索结果：三种页面结构的结果项
+IMDB_SEARCH_STRAINER = SoupStrainer(
+    attrs={'class': class_pattern('result_text', 'ipc-metadata-list-summary-item', 'findResult')}
+)
+
+# IMDb详情页评分：新版页面的 data-testid 节点，其次是旧版页面的评分节点
+IMDB_RATING_STRAINERS = [
+    SoupStrainer(attrs={'data-testid': re.compile(r'aggregate-rating__score$')}),
+    SoupStrainer(attrs={'class': class_pattern(
+        'AggregateRatingButton__RatingScore-sc-1ll29m0-1', 'rating-other-user-rating', 'ratingValue'
+    )}),
+]
+
+# 豆瓣搜索结果项
+DOUBAN_SEARCH_STRAINER = SoupStrainer(attrs={'class': class_pattern('result')})
+
+# 豆瓣详情页：片名所在的h1和评分所在的strong
+DOUBAN_DETAIL_STRAINER = SoupStrainer(['h1', 'strong'])
+
+
+# 各站点的地址，可通过 base_urls 参数覆盖（例如指向本地替身服务器）
+DEFAULT_BASE_URLS = {
+    'boxoffice': "https://www.boxofficemojo.com/month/{month}/{year}/?ref_=bo_ml_table_1",
+    'imdb': "https://www.imdb.com",
+    'douban': "https://www.douban.com",
+}
+
+# 月度榜单默认只取前10名；top_n=None 时取整张榜单（通常有100~300部电影）
+DEFAULT_TOP_N = 10
+
+# IMDb同时请求的候选详情页数量，1表示按顺序逐个请求
+DEFAULT_SPECULATIVE_CANDIDATES = 1
+
+# 可取消的请求分块读取正文，每块之间检查取消标记
+CANCELLABLE_CHUNK_SIZE = 16 * 1024
+
+# 单月数据文件的七列，按输出顺序
+MONTHLY_COLUMNS = ['排名', '英文片名', '中文片名', '累计票房', '首映日期', 'IMDb评分', '豆瓣评分']
+
+
+class RequestCancelled(Exception):
+    """请求被取消（推测请求的结果已不再需要）：尚未发出，或已发出但正文读取中途放弃"""
+
+
+def monthly_csv_path(year, month):
+    """单月数据的CSV文件路径（相同年月会覆盖）"""
+    return f"data/boxoffice_{year}_{month:02d}.csv"
+
+
+summary_log = get_logger('summary')
 
 
 class BoxOfficeScraper:
-    def __init__(self, debug=False):
-        self.base_url = "https://www.boxofficemojo.com/month/{month}/{year}/?ref_=bo_ml_table_1"
+    def __init__(self, debug=False, concurrent=False, max_workers=8, rate_limits=None,
+                 pool_connections=4, pool_maxsize=16, max_retries=2,
+                 cache=None, cache_mode=CACHE_USE, rating_memo=None, parse_mode=PARSE_FULL,
+                 base_urls=None, metrics=None, circuit_breakers=None, backoff_retries=2, max_backoff=10.0,
+                 negative_cache=None, top_n=DEFAULT_TOP_N, enrich_limit=None, imdb_dataset=None,
+                 speculative_candidates=DEFAULT_SPECULATIVE_CANDIDATES, network=True,
+                 imdb_max_year_diff=DEFAULT_MAX_YEAR_DIFF):
+        """
+        Args:
+            debug (bool): 是否启用调试模式，输出每个搜索候选、每个表格行等调试信息
+            concurrent (bool): 是否并发获取每部电影的IMDb和豆瓣信息
+            max_workers (int): 并发模式下的最大线程数
+            rate_limits (dict|HostRateLimiter): 站点域名 -> 每秒请求数，覆盖默认限速；
+                也可以直接传入限速器对象（多进程抓取时共享同一个限速器）
+            pool_connections (int): 每个主机会话缓存的连接池数量
+            pool_maxsize (int): 每个连接池保持的最大keep-alive连接数
+            max_retries (int): 连接错误和5xx响应的最大重试次数
+            cache (str|ResponseCache): 响应缓存数据库路径或缓存对象，None表示不缓存
+            cache_mode (str): 按路径创建缓存时的模式，'use' / 'refresh' / 'bypass'
+            rating_memo (RatingMemo): 跨月份共享的评分查询缓存，None表示不缓存
+            parse_mode (str): 页面解析模式，'full' 解析整页，'partial' 只解析需要的节点
+            base_urls (dict): 覆盖 DEFAULT_BASE_URLS 中的站点地址，键为 'boxoffice' / 'imdb' / 'douban'
+            metrics (MetricsRegistry): 记录各阶段耗时和请求计数的指标集合，None表示新建一个
+            circuit_breakers (HostCircuitBreakers): 豆瓣请求使用的按站点熔断器，None表示使用默认阈值新建
+            backoff_retries (int): 豆瓣返回429时退避重试的次数
+            max_backoff (float): 单次退避等待的上限（秒），Retry-After 超过该值时不再等待，直接走静态映射
+            negative_cache (str|NegativeCache): 查询失败缓存的数据库路径或缓存对象，None表示不缓存
+            top_n (int): 从月度榜单取前多少名，None表示整张榜单
+            enrich_limit (int): 只为排名前多少的电影查询IMDb和豆瓣评分，其余只保留票房数据；
+                None表示全部查询，0表示只抓取票房表格（每个月份一次请求）
+            imdb_dataset (str|ImdbDataset): 离线IMDb数据集的数据库路径或数据集对象，优先从中查询评分，
+                None表示只在线搜索
+            imdb_max_year_diff (int): 按路径打开数据集时，数据集中的电影与目标年份最多相差几年，
+                超出时在线搜索；None表示不限
+            speculative_candidates (int): 同时请求排名最前的几个IMDb候选详情页，排名最靠前的有效评分胜出，
+                其余请求被取消；1表示逐个请求。已发出的请求无法撤回，仍计入IMDb的访问量
+                （每部电影最多多发 k-1 个请求），取消只是不再读取正文
+            network (bool): 是否创建同步请求用的会话池和限速器；异步抓取器只使用解析、匹配和缓存部分，传入False，
+                此时 rate_limits / pool_* / max_retries 不起作用，fetch_page 不可用
+        """
+        urls = dict(DEFAULT_BASE_URLS)
+        if base_urls:
+            urls.update(base_urls)
+        self.base_url = urls['boxoffice']
+        self.imdb_base_url = urls['imdb']
+        self.douban_search_base_url = urls['douban']
+        self.douban_mapping_path = DEFAULT_MAPPING_PATH
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.debug = debug
+        self.log = get_instance_logger('scraper', debug)
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        # 按站点限速，替代固定的sleep延时
+        if network and not isinstance(rate_limits, HostRateLimiter):
+            rate_limits = HostRateLimiter(rate_limits)
+        self.rate_limiter = rate_limits if network else None
+        # 按主机复用的keep-alive会话，所有请求共享
+        self.sessions = SessionPool(
+            headers=self.headers,
+            pool_connections=pool_connections,
+            pool_maxsize=max(pool_maxsize, max_workers),
+            max_retries=max_retries,
+        ) if network else None
+        # 持久化响应缓存（可选）
+        if isinstance(cache, str):
+            cache = ResponseCache(cache, mode=cache_mode)
+        self.cache = cache
+        # 已查询过的电影评分（批量抓取时由多个月份共享）
+        self.rating_memo = rating_memo
+        self.parse_mode = parse_mode
+        # 各阶段耗时、请求数、下载字节数等指标，抓取结束后可导出
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        # 豆瓣被拦截或限流时熔断，冷却期内直接使用静态映射
+        self.circuit_breakers = circuit_breakers if circuit_breakers is not None else HostCircuitBreakers()
+        self.backoff_retries = backoff_retries
+        self.max_backoff = max_backoff
+        # 近期查不到的电影（按原因设置有效期），重复抓取时跳过
+        if isinstance(negative_cache, str):
+            negative_cache = NegativeCache(negative_cache)
+        self.negative_cache = negative_cache
+        self.top_n = top_n
+        self.enrich_limit = enrich_limit
+        # 离线IMDb数据集（可选），在线搜索只作为后备
+        if isinstance(imdb_dataset, str):
+            imdb_dataset = ImdbDataset(imdb_dataset, imdb_max_year_diff)
+        self.imdb_dataset = imdb_dataset
+        # 推测请求候选详情页的线程池，首次使用时创建
+        self.speculative_candidates = max(1, speculative_candidates)
+        self.candidate_executor = None
+        self.candidate_executor_lock = threading.Lock()
+    
+    def fetch_page(self, url, headers=None, timeout=10, use_cache=True, cancelled=None):
+        """
+        发送GET请求：优先读取响应缓存，未命中时按站点限速后通过复用会话请求
+        
+        每次调用按站点记录请求数（HTTP状态、缓存命中）、下载字节数、请求耗时和限速等待时间。
+        
+        Args:
+            url (str): 请求地址
+            headers (dict): 额外请求头，与会话默认请求头 self.headers 合并
+            timeout (int): 超时时间（秒）
+            use_cache (bool): 是否读写响应缓存，条件请求（If-None-Match 等）应传入False
+            cancelled (threading.Event): 取消标记；已设置时不占用限速令牌，限速等待期间被设置时归还令牌，都不发出请求；
+                请求发出后被设置时不再读取正文并关闭连接（请求本身已到达服务器，仍计入请求数）
+            
+        Returns:
+            requests.Response: 响应对象
+            
+        Raises:
+            RequestCancelled: 请求被取消
+            RuntimeError: 抓取器以 network=False 创建
+        """
+        if self.sessions is None:
+            raise RuntimeError("该抓取器没有HTTP会话（network=False），不能发送请求")
+        site = host_key(url)
+        cache_state = 'off'
+        if self.cache is not None and use_cache:
+            cached_response = self.cache.get(url)
+            if cached_response is not None:
+                self.metrics.inc('http_requests_total', site=site, status=cached_response.status_code, cache='hit')
+                return cached_response
+            cache_state = 'miss'
+        
+        if cancelled is None:
+            waited = self.rate_limiter.acquire(url)
+        else:
+            waited = self.rate_limiter.acquire(url, cancelled)
+            if waited is None:
+                self.metrics.inc('http_requests_cancelled_total', site=site)
+                raise RequestCancelled(url)
+        self.metrics.observe('rate_limit_wait_seconds', waited or 0.0, site=site)
+        try:
+            with self.metrics.timer('http_request_seconds', site=site):
+                response = self.sessions.get(url, headers=headers, timeout=timeout, stream=cancelled is not None)
+                complete = cancelled is None or self.read_body(response, cancelled)
+        except requests.RequestException as e:
+            self.metrics.inc('http_errors_total', site=site, error=type(e).__name__)
+            raise
+        self.metrics.inc('http_requests_total', site=site, status=response.status_code, cache=cache_state)
+        if not complete:
+            self.metrics.inc('http_requests_aborted_total', site=site)
+            raise RequestCancelled(url)
+        self.metrics.inc('http_response_bytes_total', len(response.content), site=site)
+        
+        if self.cache is not None and use_cache:
+            self.cache.set(url, response)
+        return response
+    
+    def read_body(self, response, cancelled):
+        """
+        分块读取流式响应的正文，每块之间检查取消标记
+        
+        Args:
+            response (requests.Response): stream=True 发出的请求的响应
+            cancelled (threading.Event): 取消标记
+            
+        Returns:
+            bool: 是否读完；被取消时关闭响应（连接不再复用）并返回False
+        """
+        chunks = []
+        for chunk in response.iter_content(CANCELLABLE_CHUNK_SIZE):
+            if cancelled.is_set():
+                response.close()
+                return False
+            chunks.append(chunk)
+        response._content = b''.join(chunks)
+        return True
+    
+    def fetch_with_breaker(self, url, headers=None, timeout=10):
+        """
+        经过熔断器和退避重试的请求，用于容易被拦截的站点（豆瓣）
+        
+        429响应按指数退避（带随机抖动，不早于 Retry-After）重试；403、429以及超时、连接错误等
+        请求异常计为熔断失败，其他响应计为成功。熔断器打开期间不发出请求。
+        
+        Returns:
+            requests.Response: 响应对象
+            
+        Raises:
+            CircuitOpenError: 站点已熔断
+            requests.RequestException: 请求失败
+        """
+        self.circuit_breakers.check(url)
+        site = host_key(url)
+        
+        for attempt in range(self.backoff_retries + 1):
+            try:
+                response = self.fetch_page(url, headers=headers, timeout=timeout)
+            except Exception:
+                # 任何请求异常都要记录失败，否则半开状态的探测请求不会释放
+                self.record_breaker_failure(url)
+                raise
+            if response.status_code not in RETRY_STATUSES or attempt == self.backoff_retries:
+                break
+            delay = backoff_delay(attempt, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            if delay > self.max_backoff:
+                break
+            self.log.debug("    %s 返回%s，%.1f秒后重试", site, response.status_code, delay)
+            self.metrics.observe('backoff_wait_seconds', delay, site=site)
+            time.sleep(delay)
+        
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            self.record_breaker_failure(url, parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            self.record_breaker_success(url)
+        return response
+    
+    def record_breaker_success(self, url):
+        """记录一次成功，半开的熔断器因此关闭时输出提示"""
+        if self.circuit_breakers.record_success(url):
+            site = host_key(url)
+            self.log.info("%s 恢复访问，熔断器关闭", site, extra=event('circuit_closed', site=site))
+            self.metrics.inc('circuit_breaker_transitions_total', site=site, state='closed')
+    
+    def record_breaker_failure(self, url, retry_after=None):
+        """记录一次熔断失败，熔断器因此打开时输出警告"""
+        if self.circuit_breakers.record_failure(url, retry_after):
+            site = host_key(url)
+            breaker = self.circuit_breakers.get_breaker(url)
+            self.log.warning("%s 连续 %s 次被拦截或超时，熔断 %.0f 秒，期间直接使用静态映射",
+                        site, breaker.failures, breaker.retry_in(),
+                        extra=event('circuit_open', site=site, failures=breaker.failures,
+                                    cooldown=round(breaker.retry_in(), 1)))
+            self.metrics.inc('circuit_breaker_transitions_total', site=site, state='open')
+    
+    def connection_stats(self):
+        """返回各主机新建/复用连接的统计，见 SessionPool.connection_stats"""
+        return self.sessions.connection_stats() if self.sessions is not None else {}
+    
+    def close(self):
+        """关闭所有HTTP会话、响应缓存、查询失败缓存、IMDb数据集和候选请求线程池"""
+        if self.sessions is not None:
+            self.sessions.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.negative_cache is not None:
+            self.negative_cache.close()
+        if self.imdb_dataset is not None:
+            self.imdb_dataset.close()
+        if self.candidate_executor is not None:
+            self.candidate_executor.shutdown(wait=False, cancel_futures=True)
         
+    def make_soup(self, html_content, strainer=None):
+        """
+        构建BeautifulSoup对象
+        
+        完整模式使用 html.parser 解析整页；局部模式使用 lxml，
+        且只保留 strainer 匹配的节点及其子树，跳过页面其余部分的DOM构建。
+        
+        Args:
+            html_content: 页面HTML内容
+            strainer (SoupStrainer): 局部模式下的节点过滤器，None表示解析整页
+        """
+        if self.parse_mode == PARSE_PARTIAL and strainer is not None:
+            return BeautifulSoup(html_content, 'lxml', parse_only=strainer)
+        return BeautifulSoup(html_content, 'html.parser')
+    
     def get_month_name(self, month_number):
         """将月份数字转换为英文月份名"""
         months = {
@@ -66,10 +434,34 @@ class BoxOfficeScraper:
         except Exception:
             return date_text
     
+    def clean_search_title(self, movie_title):
+        """清理电影标题中的特殊字符，用作搜索关键词"""
+        return re.sub(r'[^\w\s]', ' ', movie_title).strip()
+    
+    def build_imdb_search_url(self, clean_title):
+        """构建IMDb电影搜索URL"""
+        search_query = urllib.parse.quote(clean_title)
+        return f"{self.imdb_base_url}/find?q={search_query}&s=tt&ttype=ft&ref_=fn_ft"
+    
+    def build_douban_search_url(self, clean_title):
+        """构建豆瓣电影搜索URL"""
+        search_query = urllib.parse.quote(clean_title)
+        return f"{self.douban_search_base_url}/search?cat=1002&q={search_query}"
+    
+    def build_month_url(self, year, month):
+        """构建BoxOfficeMojo月度票房榜URL"""
+        month_name = self.get_month_name(month)
+        if not month_name:
+            raise ValueError("月份必须在1-12之间")
+        return self.base_url.format(month=month_name, year=year)
+    
     def search_imdb_rating(self, movie_title, target_year=None):
         """
         在IMDb上搜索电影并获取评分，优先选择年份最接近的版本
         
+        设置了离线数据集时先从数据集查询，数据集中没有评分的电影才在线搜索；
+        近期在线查询失败过的电影（见 negative_cache）在失败记录过期前直接返回"N/A"。
+        
         Args:
             movie_title (str): 电影名称
             target_year (int): 目标年份，用于匹配最相近的版本
@@ -77,26 +469,101 @@ class BoxOfficeScraper:
         Returns:
             str: IMDb评分，如果未找到则返回"N/A"
         """
+        return self.find_imdb_rating(movie_title, target_year)[0]
+    
+    def find_imdb_rating(self, movie_title, target_year=None):
+        """
+        同 search_imdb_rating，同时给出未找到的原因
+        
+        Returns:
+            tuple: (IMDb评分, 失败原因)，失败原因为 MISS_NO_RESULTS / MISS_NO_RATING / MISS_BLOCKED，
+                找到评分或原因不确定（如网络错误）时为None；跳过在线搜索时为失败记录中的原因
+        """
+        cached = self.cached_imdb_rating(movie_title, target_year)
+        if cached is not None:
+            return cached
+        
+        with self.metrics.timer('stage_seconds', stage='imdb_search'):
+            rating, reason = self.lookup_imdb_rating(movie_title, target_year)
+        if reason is not None:
+            self.remember_miss(SOURCE_IMDB, movie_title, target_year, reason)
+        return rating, reason
+    
+    def cached_imdb_rating(self, movie_title, target_year=None):
+        """
+        不经在线搜索就能得到的IMDb结果：离线数据集中的评分，或未过期的失败记录（同步、异步抓取器共用）
+        
+        Returns:
+            tuple: (IMDb评分, 失败原因)，需要在线搜索时返回None
+        """
+        if self.imdb_dataset is not None:
+            rating = self.search_imdb_dataset(movie_title, target_year)
+            if rating is not None:
+                return rating, None
+        
+        reason = self.recent_miss(SOURCE_IMDB, movie_title, target_year)
+        if reason is not None:
+            return "N/A", reason
+        return None
+    
+    def search_imdb_dataset(self, movie_title, target_year=None):
+        """
+        从离线IMDb数据集查询评分
+        
+        Returns:
+            str: IMDb评分，数据集中没有该电影或尚无评分时返回None
+        """
+        with self.metrics.timer('stage_seconds', stage='imdb_dataset'):
+            result = self.imdb_dataset.lookup(movie_title, target_year)
+        if result is None:
+            self.metrics.inc('imdb_dataset_total', result='miss')
+            self.log.debug("    IMDb数据集中没有: %s", movie_title)
+            return None
+        tconst, rating = result
+        if rating is None:
+            self.metrics.inc('imdb_dataset_total', result='no_rating')
+            self.log.debug("    IMDb数据集中 %s 尚无评分", tconst)
+            return None
+        self.metrics.inc('imdb_dataset_total', result='hit')
+        self.log.debug("    ✅ IMDb数据集: %s (%s) 评分: %s", movie_title, tconst, rating)
+        return rating
+    
+    def lookup_imdb_rating(self, movie_title, target_year=None):
+        """
+        搜索IMDb评分，同时给出未找到的原因
+        
+        Returns:
+            tuple: (IMDb评分, 失败原因)，找到评分或失败原因不确定（如网络错误）时原因为None
+        """
         try:
-            # 清理电影标题，移除特殊字符
-            clean_title = re.sub(r'[^\w\s]', ' ', movie_title).strip()
-            
             # 构建搜索URL（模拟真实搜索）
-            search_query = urllib.parse.quote(clean_title)
-            search_url = f"https://www.imdb.com/find?q={search_query}&s=tt&ttype=ft&ref_=fn_ft"
-            
-            year_info = f" (目标年份: {target_year})" if target_year else ""
-            print(f"    正在搜索IMDb: {clean_title}{year_info}")
+            search_url = self.imdb_search_url(movie_title, target_year)
             
             # 发送搜索请求
-            response = requests.get(search_url, headers=self.headers, timeout=15)
+            response = self.fetch_page(search_url, timeout=15)
+            if self.imdb_search_blocked(response):
+                return "N/A", MISS_BLOCKED
             response.raise_for_status()
             
-            return self.parse_imdb_search_results(response.content, target_year)
+            return self.resolve_imdb_rating(response.content, target_year)
             
         except Exception as e:
-            print(f"    IMDb搜索出错: {e}")
-            return "N/A"
+            self.log.warning("    IMDb搜索出错: %s", e)
+            return "N/A", None
+    
+    def imdb_search_url(self, movie_title, target_year=None):
+        """清理片名并构建IMDb搜索地址（同步、异步抓取器共用）"""
+        clean_title = self.clean_search_title(movie_title)
+        year_info = f" (目标年份: {target_year})" if target_year else ""
+        self.log.debug("    正在搜索IMDb: %s%s", clean_title, year_info)
+        return self.build_imdb_search_url(clean_title)
+    
+    def imdb_search_blocked(self, response):
+        """IMDb搜索页是否被拦截（403/429），被拦截时输出警告（同步、异步抓取器共用）"""
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            self.log.warning("    IMDb返回%s，搜索被拦截", response.status_code)
+            return True
+        return False
     
     def parse_imdb_search_results(self, html_content, target_year=None):
         """
@@ -109,42 +576,113 @@ class BoxOfficeScraper:
         Returns:
             str: IMDb评分
         """
+        return self.resolve_imdb_rating(html_content, target_year)[0]
+    
+    def resolve_imdb_rating(self, html_content, target_year=None):
+        """
+        解析IMDb搜索结果页面并获取最匹配电影的评分
+        
+        Returns:
+            tuple: (IMDb评分, 失败原因)，失败原因为 MISS_NO_RESULTS / MISS_NO_RATING / None
+        """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 尝试多种可能的搜索结果结构
-            candidates = []
-            
-            # 方法1: 查找标准搜索结果
-            results = soup.find_all('td', class_='result_text')
-            if results:
-                print(f"    找到 {len(results)} 个搜索结果 (方法1)")
-                candidates.extend(self.extract_candidates_method1(results, target_year))
-            
-            # 方法2: 查找新版搜索结果
-            if not candidates:
-                results = soup.find_all('li', class_='ipc-metadata-list-summary-item')
-                if results:
-                    print(f"    找到 {len(results)} 个搜索结果 (方法2)")
-                    candidates.extend(self.extract_candidates_method2(results, target_year))
-            
-            # 方法3: 查找其他可能的结构
-            if not candidates:
-                results = soup.find_all('div', class_='findResult')
-                if results:
-                    print(f"    找到 {len(results)} 个搜索结果 (方法3)")
-                    candidates.extend(self.extract_candidates_method3(results, target_year))
-            
+            candidates = self.rank_imdb_candidates(html_content, target_year)
             if not candidates:
-                print(f"    未找到任何搜索结果")
-                return "N/A"
+                return "N/A", MISS_NO_RESULTS
             
             # 根据年份选择最佳匹配
-            return self.select_best_candidate(candidates, target_year)
+            with self.metrics.timer('stage_seconds', stage='imdb_select'):
+                rating, tried = self.try_candidates(candidates, target_year)
+            return self.imdb_outcome(rating, tried)
             
         except Exception as e:
-            print(f"    解析搜索结果出错: {e}")
-            return "N/A"
+            self.log.warning("    解析搜索结果出错: %s", e)
+            return "N/A", None
+    
+    def rank_imdb_candidates(self, html_content, target_year=None):
+        """
+        提取IMDb搜索结果中的候选电影，有目标年份时按年份差距排序（同步、异步抓取器共用）
+        
+        Returns:
+            list: 候选电影字典列表，没有搜索结果时为空列表
+        """
+        candidates = self.extract_imdb_candidates(html_content, target_year)
+        if not candidates:
+            self.log.debug("    未找到任何搜索结果")
+            self.metrics.inc('imdb_result_total', result='no_candidates')
+            return []
+        
+        # 如果有目标年份，按年份差距排序
+        if target_year:
+            candidates.sort(key=lambda x: x['year_diff'])
+            self.log.debug("    按年份差距排序完成")
+        return candidates
+    
+    def imdb_candidate_groups(self, candidates):
+        """把排好序的候选按 speculative_candidates 分组，每组同时请求（同步、异步抓取器共用）"""
+        size = self.speculative_candidates
+        return [candidates[start:start + size] for start in range(0, len(candidates), size)]
+    
+    def accept_imdb_rating(self, candidate, rating, target_year):
+        """候选详情页的评分是否有效，有效时输出选中的版本（同步、异步抓取器共用）"""
+        if not rating or rating == "N/A":
+            return False
+        if target_year:
+            self.log.debug("    ✅ 选择最佳匹配版本: %s (%s) 评分: %s", candidate['title'], candidate['year'], rating)
+        else:
+            self.log.debug("    ✅ 找到评分: %s", rating)
+        return True
+    
+    def imdb_outcome(self, rating, tried):
+        """
+        记录访问的候选详情页数量和查询结果，给出失败原因（同步、异步抓取器共用）
+        
+        Returns:
+            tuple: (IMDb评分, 失败原因)，有候选但都没有评分时原因为 MISS_NO_RATING
+        """
+        if rating == "N/A":
+            self.log.debug("    未找到有效评分")
+        self.metrics.inc('imdb_candidates_tried_total', tried)
+        self.metrics.inc('imdb_result_total', result='found' if rating != "N/A" else 'no_rating')
+        return rating, (MISS_NO_RATING if rating == "N/A" else None)
+    
+    def extract_imdb_candidates(self, html_content, target_year=None):
+        """
+        从IMDb搜索结果页面中提取候选电影（不发起网络请求）
+        
+        Args:
+            html_content: 搜索结果页面的HTML内容
+            target_year (int): 目标年份
+            
+        Returns:
+            list: 候选电影字典列表，包含 title / year / url / year_diff
+        """
+        soup = self.make_soup(html_content, IMDB_SEARCH_STRAINER)
+        
+        # 尝试多种可能的搜索结果结构
+        candidates = []
+        
+        # 方法1: 查找标准搜索结果
+        results = soup.find_all('td', class_='result_text')
+        if results:
+            self.log.debug("    找到 %s 个搜索结果 (方法1)", len(results))
+            candidates.extend(self.extract_candidates_method1(results, target_year))
+        
+        # 方法2: 查找新版搜索结果
+        if not candidates:
+            results = soup.find_all('li', class_='ipc-metadata-list-summary-item')
+            if results:
+                self.log.debug("    找到 %s 个搜索结果 (方法2)", len(results))
+                candidates.extend(self.extract_candidates_method2(results, target_year))
+        
+        # 方法3: 查找其他可能的结构
+        if not candidates:
+            results = soup.find_all('div', class_='findResult')
+            if results:
+                self.log.debug("    找到 %s 个搜索结果 (方法3)", len(results))
+                candidates.extend(self.extract_candidates_method3(results, target_year))
+        
+        return candidates
     
     def extract_candidates_method1(self, results, target_year):
         """从标准搜索结果中提取候选电影"""
@@ -162,7 +700,7 @@ class BoxOfficeScraper:
                 
                 if year_match:
                     movie_year = int(year_match.group(1))
-                    movie_url = "https://www.imdb.com" + link.get('href')
+                    movie_url = self.imdb_base_url + link.get('href')
                     movie_title = link.get_text(strip=True)
                     
                     year_diff = abs(movie_year - target_year) if target_year else 0
@@ -174,10 +712,10 @@ class BoxOfficeScraper:
                         'year_diff': year_diff
                     })
                     
-                    print(f"    候选: {movie_title} ({movie_year}) 差距: {year_diff}年")
+                    self.log.debug("    候选: %s (%s) 差距: %s年", movie_title, movie_year, year_diff)
                     
             except Exception as e:
-                print(f"    处理搜索结果出错: {e}")
+                self.log.debug("    处理搜索结果出错: %s", e)
                 continue
         
         return candidates
@@ -203,7 +741,7 @@ class BoxOfficeScraper:
                         break
                 
                 if movie_year:
-                    movie_url = "https://www.imdb.com" + link.get('href')
+                    movie_url = self.imdb_base_url + link.get('href')
                     movie_title = link.get_text(strip=True)
                     
                     year_diff = abs(movie_year - target_year) if target_year else 0
@@ -215,7 +753,7 @@ class BoxOfficeScraper:
                         'year_diff': year_diff
                     })
                     
-                    print(f"    候选: {movie_title} ({movie_year}) 差距: {year_diff}年")
+                    self.log.debug("    候选: %s (%s) 差距: %s年", movie_title, movie_year, year_diff)
                     
             except Exception as e:
                 continue
@@ -238,7 +776,7 @@ class BoxOfficeScraper:
                 
                 if year_match:
                     movie_year = int(year_match.group(1))
-                    movie_url = "https://www.imdb.com" + link.get('href')
+                    movie_url = self.imdb_base_url + link.get('href')
                     movie_title = link.get_text(strip=True)
                     
                     year_diff = abs(movie_year - target_year) if target_year else 0
@@ -250,40 +788,65 @@ class BoxOfficeScraper:
                         'year_diff': year_diff
                     })
                     
-                    print(f"    候选: {movie_title} ({movie_year}) 差距: {year_diff}年")
+                    self.log.debug("    候选: %s (%s) 差距: %s年", movie_title, movie_year, year_diff)
                     
             except Exception as e:
                 continue
         
         return candidates
     
-    def select_best_candidate(self, candidates, target_year):
-        """从候选电影中选择最佳匹配"""
-        if not candidates:
-            return "N/A"
+    def try_candidates(self, candidates, target_year):
+        """
+        依次访问已排序候选电影的详情页，直到找到有效评分
         
-        # 如果有目标年份，按年份差距排序
-        if target_year:
-            candidates.sort(key=lambda x: x['year_diff'])
-            print(f"    按年份差距排序完成")
+        speculative_candidates 大于1时改为同时请求排名最前的几个候选，见 try_candidates_speculatively。
+        
+        Returns:
+            tuple: (IMDb评分, 访问的详情页数量)
+        """
+        if self.speculative_candidates > 1:
+            return self.try_candidates_speculatively(candidates, target_year)
         
         # 尝试获取评分，直到找到有效评分
-        for candidate in candidates:
-            print(f"    尝试获取评分: {candidate['title']} ({candidate['year']})")
-            
+        for tried, candidate in enumerate(candidates, 1):
+            self.log.debug("    尝试获取评分: %s (%s)", candidate['title'], candidate['year'])
             rating = self.get_rating_from_url(candidate['url'])
-            
-            if rating and rating != "N/A":
-                if target_year:
-                    print(f"    ✅ 选择最佳匹配版本: {candidate['title']} ({candidate['year']}) 评分: {rating}")
-                else:
-                    print(f"    ✅ 找到评分: {rating}")
-                return rating
-            
-            time.sleep(1)  # 添加延时避免请求过频
+            if self.accept_imdb_rating(candidate, rating, target_year):
+                return rating, tried
+        return "N/A", len(candidates)
+    
+    def try_candidates_speculatively(self, candidates, target_year):
+        """
+        每次同时请求排名最前的k个候选详情页（仍受站点限速），按排名顺序检查结果：
+        排名最靠前的有效评分胜出，其余还在限速等待中的请求不再发出，已发出的请求放弃读取正文并关闭连接。
+        已发出的请求无法撤回，仍计入IMDb的访问量。最佳候选没有评分时，IMDb耗时约为一次往返而不是k次。
         
-        print(f"    未找到有效评分")
-        return "N/A"
+        Returns:
+            tuple: (IMDb评分, 访问的详情页数量)
+        """
+        executor = self.get_candidate_executor()
+        tried = 0
+        for group in self.imdb_candidate_groups(candidates):
+            cancelled = threading.Event()
+            futures = [executor.submit(self.get_rating_from_url, candidate['url'], cancelled) for candidate in group]
+            for index, (candidate, future) in enumerate(zip(group, futures)):
+                self.log.debug("    尝试获取评分: %s (%s)", candidate['title'], candidate['year'])
+                rating = future.result()
+                if self.accept_imdb_rating(candidate, rating, target_year):
+                    cancelled.set()
+                    for pending in futures[index + 1:]:
+                        pending.cancel()
+                    return rating, tried + index + 1
+            tried += len(group)
+        return "N/A", len(candidates)
+    
+    def get_candidate_executor(self):
+        """获取（必要时创建）候选详情页请求的线程池，并发模式下按同时查询的电影数放大"""
+        with self.candidate_executor_lock:
+            if self.candidate_executor is None:
+                movies = self.max_workers if self.concurrent else 1
+                self.candidate_executor = ThreadPoolExecutor(max_workers=self.speculative_candidates * movies)
+            return self.candidate_executor
     
     def get_first_valid_rating(self, results):
         """
@@ -301,42 +864,95 @@ class BoxOfficeScraper:
                 if not title_link:
                     continue
                 
-                movie_url = "https://www.imdb.com" + title_link.get('href')
+                movie_url = self.imdb_base_url + title_link.get('href')
                 rating = self.get_rating_from_url(movie_url)
                 
                 if rating and rating != "N/A":
-                    print(f"    找到评分: {rating}")
+                    self.log.debug("    找到评分: %s", rating)
                     return rating
-                
-                time.sleep(1)
             
-            print(f"    未找到有效评分")
+
+            self.log.debug("    未找到有效评分")
             return "N/A"
             
         except Exception as e:
-            print(f"    获取评分出错: {e}")
+            self.log.warning("    获取评分出错: %s", e)
             return "N/A"
     
-    def get_rating_from_url(self, movie_url):
+    def get_rating_from_url(self, movie_url, cancelled=None):
         """
         从IMDb电影页面URL获取评分
         
         Args:
             movie_url (str): IMDb电影详情页面URL
+            cancelled (threading.Event): 推测请求的取消标记，已设置时不再发出请求或读取正文
             
         Returns:
             str: 评分或"N/A"
         """
         try:
-            movie_response = requests.get(movie_url, headers=self.headers, timeout=10)
+            movie_response = self.fetch_page(movie_url, timeout=10, cancelled=cancelled)
             movie_response.raise_for_status()
             
-            movie_soup = BeautifulSoup(movie_response.content, 'html.parser')
-            return self.extract_imdb_rating(movie_soup)
+            return self.parse_imdb_rating_page(movie_response.content)
             
+        except RequestCancelled:
+            self.log.debug("    已取消: %s", movie_url)
+            return "N/A"
         except Exception as e:
-            print(f"    获取页面评分出错: {e}")
+            self.log.warning("    获取页面评分出错: %s", e)
+            return "N/A"
+    
+    def parse_imdb_rating_page(self, html_content):
+        """
+        解析IMDb电影详情页面的评分
+        
+        Args:
+            html_content: 电影详情页面的HTML内容
+            
+        Returns:
+            str: 评分或"N/A"
+        """
+        return self.resolve_imdb_rating_page(html_content)[0]
+    
+    def resolve_imdb_rating_page(self, html_content):
+        """
+        解析IMDb电影详情页面的评分，并返回使用的提取路径
+        
+        先从页面嵌入的结构化数据（JSON-LD）直接提取，不构建soup；
+        没有结构化数据时回退到CSS选择器。
+        
+        Returns:
+            tuple: (评分或"N/A", EXTRACT_JSONLD 或 EXTRACT_SELECTOR)
+        """
+        rating = extract_jsonld_rating(html_content)
+        if rating is not None:
+            self.metrics.inc('rating_extract_total', site='imdb', path=EXTRACT_JSONLD)
+            return rating, EXTRACT_JSONLD
+        
+        self.metrics.inc('rating_extract_total', site='imdb', path=EXTRACT_SELECTOR)
+        return self.parse_imdb_rating_selectors(html_content), EXTRACT_SELECTOR
+    
+    def parse_imdb_rating_selectors(self, html_content):
+        """
+        按CSS选择器解析IMDb电影详情页面的评分
+        
+        Args:
+            html_content: 电影详情页面的HTML内容
+            
+        Returns:
+            str: 评分或"N/A"
+        """
+        if self.parse_mode == PARSE_PARTIAL:
+            # 依次尝试新版和旧版页面的评分节点
+            for strainer in IMDB_RATING_STRAINERS:
+                rating = self.extract_imdb_rating(self.make_soup(html_content, strainer))
+                if rating != "N/A":
+                    return rating
             return "N/A"
+        
+        movie_soup = self.make_soup(html_content)
+        return self.extract_imdb_rating(movie_soup)
     
     def extract_imdb_rating(self, soup):
         """
@@ -376,6 +992,8 @@ class BoxOfficeScraper:
         """
         根据电影英文名称查找对应的中文片名和豆瓣评分，优先选择年份最接近的版本
         
+        在线搜索和静态映射都没有结果时记录失败原因，失败记录过期前跳过在线搜索，只查询静态映射。
+        
         Args:
             movie_title (str): 电影英文名称
             target_year (int): 目标年份，用于匹配最相近的版本
@@ -383,23 +1001,59 @@ class BoxOfficeScraper:
         Returns:
             tuple: (中文片名, 豆瓣评分)
         """
+        return self.find_douban_movie(movie_title, target_year)[:2]
+    
+    def find_douban_movie(self, movie_title, target_year=None):
+        """
+        同 search_douban_movie，同时给出在线搜索未找到的原因
+        
+        Returns:
+            tuple: (中文片名, 豆瓣评分, 失败原因)，失败原因同 lookup_douban_online；
+                跳过在线搜索时为失败记录中的原因
+        """
         try:
             year_info = f" (目标年份: {target_year})" if target_year else ""
-            print(f"    正在查找豆瓣信息: {movie_title}{year_info}")
-            
-            # 首先尝试网络搜索豆瓣
-            chinese_title, douban_rating = self.search_douban_online(movie_title, target_year)
+            self.log.debug("    正在查找豆瓣信息: %s%s", movie_title, year_info)
             
-            # 如果网络搜索失败，回退到静态映射
-            if chinese_title == "N/A" or douban_rating == "N/A":
-                print(f"    网络搜索失败，使用静态映射")
-                return self.search_douban_static_mapping(movie_title, target_year)
+            reason = self.recent_miss(SOURCE_DOUBAN, movie_title, target_year)
+            searched = reason is None
+            if searched:
+                # 首先尝试网络搜索豆瓣
+                chinese_title, douban_rating, reason = self.lookup_douban_online(movie_title, target_year)
+            else:
+                # 近期在线查不到：跳过在线搜索，静态映射（可能已补充该电影）仍要查询
+                chinese_title, douban_rating = "N/A", "N/A"
             
-            return chinese_title, douban_rating
+            return self.finish_douban_lookup(movie_title, target_year, (chinese_title, douban_rating, reason), searched)
             
         except Exception as e:
-            print(f"    豆瓣查找出错: {e}")
-            return "N/A", "N/A"
+            self.log.warning("    豆瓣查找出错: %s", e)
+            return "N/A", "N/A", None
+    
+    def finish_douban_lookup(self, movie_title, target_year, online_result, searched):
+        """
+        在线搜索之后的共同步骤（同步、异步抓取器共用）：在线没有结果时回退到静态映射，
+        静态映射也没有时记录在线搜索的失败原因
+        
+        Args:
+            online_result (tuple): 在线搜索的 (中文片名, 豆瓣评分, 失败原因)，跳过在线搜索时为 ("N/A", "N/A", 记录中的原因)
+            searched (bool): 是否进行了在线搜索；跳过时不重复记录失败
+            
+        Returns:
+            tuple: (中文片名, 豆瓣评分, 失败原因)
+        """
+        chinese_title, douban_rating, reason = online_result
+        if chinese_title != "N/A" and douban_rating != "N/A":
+            self.metrics.inc('douban_lookup_total', path='online')
+            return chinese_title, douban_rating, None
+        
+        # 如果网络搜索失败，回退到静态映射
+        self.log.debug("    网络搜索失败，使用静态映射", extra=event('douban_fallback', title=movie_title))
+        self.metrics.inc('douban_lookup_total', path='static')
+        chinese_title, douban_rating = self.search_douban_static_mapping(movie_title, target_year)
+        if (chinese_title, douban_rating) == ("N/A", "N/A") and searched and reason is not None:
+            self.remember_miss(SOURCE_DOUBAN, movie_title, target_year, reason)
+        return chinese_title, douban_rating, reason
     
     def search_douban_online(self, movie_title, target_year=None):
         """
@@ -412,51 +1066,75 @@ class BoxOfficeScraper:
         Returns:
             tuple: (中文片名, 豆瓣评分)
         """
-        try:
-            # 清理搜索关键词
-            clean_title = re.sub(r'[^\w\s]', ' ', movie_title).strip()
-            
-            # 构建豆瓣搜索URL
-            search_query = urllib.parse.quote(clean_title)
-            search_url = f"https://www.douban.com/search?cat=1002&q={search_query}"
-            
-            print(f"    尝试豆瓣在线搜索: {clean_title}")
-            
-            # 豆瓣专用请求头
-            douban_headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Sec-Fetch-User': '?1',
-                'Cache-Control': 'max-age=0'
-            }
+        return self.lookup_douban_online(movie_title, target_year)[:2]
+    
+    def lookup_douban_online(self, movie_title, target_year=None):
+        """
+        在线搜索豆瓣电影，同时给出未找到的原因
+        
+        Returns:
+            tuple: (中文片名, 豆瓣评分, 失败原因)，被拦截、限流、熔断或超时时原因为 MISS_BLOCKED，
+                找到评分或失败原因不确定时为None
+        """
+        with self.metrics.timer('stage_seconds', stage='douban_online'):
+            try:
+                # 清理搜索关键词
+                clean_title = self.clean_search_title(movie_title)
             
-            # 发送搜索请求
-            response = requests.get(search_url, headers=douban_headers, timeout=15)
+                # 构建豆瓣搜索URL
+                search_url = self.build_douban_search_url(clean_title)
             
-            # 检查响应状态
-            if response.status_code == 403:
-                print(f"    豆瓣返回403，可能被反爬虫拦截")
-                return "N/A", "N/A"
+                self.log.debug("    尝试豆瓣在线搜索: %s", clean_title)
             
-            response.raise_for_status()
+                # 发送搜索请求
+                response = self.fetch_with_breaker(search_url, headers=DOUBAN_SEARCH_HEADERS, timeout=15)
+                if self.douban_search_blocked(response, clean_title):
+                    return "N/A", "N/A", MISS_BLOCKED
+                response.raise_for_status()
             
-            # 解析搜索结果
-            return self.parse_douban_search_results(response.content, target_year)
+                # 解析搜索结果
+                return self.resolve_douban_search_results(response.content, target_year)
             
-        except requests.exceptions.RequestException as e:
-            print(f"    豆瓣网络请求失败: {e}")
-            return "N/A", "N/A"
-        except Exception as e:
-            print(f"    豆瓣在线搜索出错: {e}")
-            return "N/A", "N/A"
+            except Exception as e:
+                return "N/A", "N/A", self.douban_lookup_error(e)
+    
+    def douban_search_blocked(self, response, clean_title):
+        """豆瓣搜索页是否被限流（429）或拦截（403），是时输出警告并计数（同步、异步抓取器共用）"""
+        if response.status_code == 429:
+            self.log.warning("    豆瓣返回429，请求被限流", extra=event('douban_throttled', title=clean_title))
+            self.metrics.inc('douban_online_failures_total', reason='throttled')
+            return True
+        if response.status_code == 403:
+            self.log.warning("    豆瓣返回403，可能被反爬虫拦截", extra=event('douban_forbidden', title=clean_title))
+            self.metrics.inc('douban_online_failures_total', reason='forbidden')
+            return True
+        return False
+    
+    def douban_lookup_error(self, error, network_errors=(requests.RequestException,)):
+        """
+        豆瓣在线搜索出错时输出、计数并给出失败原因（同步、异步抓取器共用）
+        
+        Args:
+            error (Exception): 捕获的异常
+            network_errors (tuple): 视为网络错误的异常类型，异步抓取器另外传入 aiohttp 的异常
+            
+        Returns:
+            str: 熔断或超时时为 MISS_BLOCKED，其他错误的原因不确定，为None
+        """
+        if isinstance(error, CircuitOpenError):
+            self.log.debug("    %s，跳过豆瓣在线搜索", error)
+            self.metrics.inc('douban_online_failures_total', reason='circuit_open')
+            return MISS_BLOCKED
+        if isinstance(error, (requests.Timeout, asyncio.TimeoutError)):
+            self.log.warning("    豆瓣请求超时: %s", error)
+            self.metrics.inc('douban_online_failures_total', reason='timeout')
+            return MISS_BLOCKED
+        if isinstance(error, network_errors):
+            self.log.warning("    豆瓣网络请求失败: %s", error)
+            self.metrics.inc('douban_online_failures_total', reason='request_error')
+            return None
+        self.log.warning("    豆瓣在线搜索出错: %s", error)
+        return None
     
     def parse_douban_search_results(self, html_content, target_year=None):
         """
@@ -469,79 +1147,148 @@ class BoxOfficeScraper:
         Returns:
             tuple: (中文片名, 豆瓣评分)
         """
+        return self.resolve_douban_search_results(html_content, target_year)[:2]
+    
+    def resolve_douban_search_results(self, html_content, target_year=None):
+        """
+        解析豆瓣搜索结果页面并获取最匹配电影的详情
+        
+        Returns:
+            tuple: (中文片名, 豆瓣评分, 失败原因)，失败原因为 MISS_NO_RESULTS / MISS_NO_RATING / None
+        """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            best_candidate = self.best_douban_candidate(html_content, target_year)
+            if best_candidate is None:
+                return "N/A", "N/A", MISS_NO_RESULTS
             
-            # 查找搜索结果
-            results = soup.find_all('div', class_='result')
+            chinese_title, rating = self.get_douban_movie_details(best_candidate['url'])
+            return self.douban_outcome(best_candidate, chinese_title, rating, target_year)
             
-            if not results:
-                print(f"    豆瓣未找到搜索结果")
-                return "N/A", "N/A"
-            
-            print(f"    找到 {len(results)} 个豆瓣搜索结果")
-            
-            # 收集候选电影
-            candidates = []
+        except Exception as e:
+            self.log.warning("    解析豆瓣搜索结果出错: %s", e)
+            return "N/A", "N/A", None
+    
+    def best_douban_candidate(self, html_content, target_year=None):
+        """
+        豆瓣搜索结果中最匹配的候选电影（同步、异步抓取器共用）
+        
+        Returns:
+            dict: 候选电影，包含 title / year / url / year_diff；没有候选时返回None
+        """
+        candidates = self.extract_douban_candidates(html_content, target_year)
+        if not candidates:
+            return None
+        
+        # 尝试获取第一个候选的详细信息
+        best_candidate = candidates[0]
+        self.log.debug("    尝试获取详细信息: %s (%s)", best_candidate['title'], best_candidate['year'])
+        return best_candidate
+    
+    def douban_outcome(self, candidate, chinese_title, rating, target_year):
+        """
+        根据候选电影详情页的解析结果给出失败原因（同步、异步抓取器共用）
+        
+        Returns:
+            tuple: (中文片名, 豆瓣评分, 失败原因)，有中文片名但没有评分时原因为 MISS_NO_RATING
+        """
+        if chinese_title == "N/A":
+            # 详情页获取失败，原因不确定
+            return "N/A", "N/A", None
+        
+        if target_year:
+            self.log.debug("    ✅ 豆瓣最佳匹配: %s (%s) 评分: %s", chinese_title, candidate['year'], rating)
+        else:
+            self.log.debug("    ✅ 豆瓣找到: %s 评分: %s", chinese_title, rating)
+        return chinese_title, rating, (MISS_NO_RATING if rating == "N/A" else None)
+    
+    def recent_miss(self, source, movie_title, target_year):
+        """
+        电影近期是否在该来源查询失败过
+        
+        Returns:
+            str: 失败记录未过期时返回失败原因，否则返回None
+        """
+        if self.negative_cache is None:
+            return None
+        reason = self.negative_cache.get(source, movie_title, target_year)
+        if reason is None:
+            return None
+        self.log.debug("    %s近期未查到（%s），跳过: %s", source, reason, movie_title)
+        self.metrics.inc('negative_cache_hits_total', source=source, reason=reason)
+        return reason
+    
+    def remember_miss(self, source, movie_title, target_year, reason):
+        """记录一次查询失败，下次抓取在有效期内跳过该电影"""
+        if self.negative_cache is not None:
+            self.negative_cache.put(source, movie_title, target_year, reason)
+            self.metrics.inc('negative_cache_writes_total', source=source, reason=reason)
+    
+    def extract_douban_candidates(self, html_content, target_year=None):
+        """
+        从豆瓣搜索结果页面中提取候选电影（不发起网络请求）
+        
+        Args:
+            html_content: 搜索结果页面的HTML内容
+            target_year (int): 目标年份
             
-            for result in results[:5]:  # 只检查前5个结果
-                try:
-                    # 检查是否是电影结果
-                    if '电影' not in result.get_text() and 'movie.douban.com' not in str(result):
-                        continue
-                    
-                    # 查找电影链接
-                    movie_link = result.find('a', href=re.compile(r'movie\.douban\.com'))
-                    if not movie_link:
-                        continue
-                    
-                    movie_url = movie_link.get('href')
-                    movie_title = movie_link.get_text(strip=True)
-                    
-                    # 尝试从链接或结果中提取年份
-                    year_match = re.search(r'(\d{4})', result.get_text())
-                    movie_year = int(year_match.group(1)) if year_match else None
-                    
-                    if movie_year:
-                        year_diff = abs(movie_year - target_year) if target_year else 0
-                        candidates.append({
-                            'title': movie_title,
-                            'year': movie_year,
-                            'url': movie_url,
-                            'year_diff': year_diff
-                        })
-                        
-                        print(f"    候选: {movie_title} ({movie_year}) 差距: {year_diff}年")
-                    
-                except Exception as e:
+        Returns:
+            list: 候选电影字典列表，有目标年份时按年份差距排序
+        """
+        soup = self.make_soup(html_content, DOUBAN_SEARCH_STRAINER)
+        
+        # 查找搜索结果
+        results = soup.find_all('div', class_='result')
+        
+        if not results:
+            self.log.debug("    豆瓣未找到搜索结果")
+            return []
+        
+        self.log.debug("    找到 %s 个豆瓣搜索结果", len(results))
+        
+        # 收集候选电影
+        candidates = []
+        
+        for result in results[:5]:  # 只检查前5个结果
+            try:
+                # 检查是否是电影结果
+                if '电影' not in result.get_text() and 'movie.douban.com' not in str(result):
                     continue
-            
-            if not candidates:
-                print(f"    未找到有效的电影候选")
-                return "N/A", "N/A"
-            
-            # 选择最佳匹配
-            if target_year:
-                candidates.sort(key=lambda x: x['year_diff'])
-            
-            # 尝试获取第一个候选的详细信息
-            best_candidate = candidates[0]
-            print(f"    尝试获取详细信息: {best_candidate['title']} ({best_candidate['year']})")
-            
-            chinese_title, rating = self.get_douban_movie_details(best_candidate['url'])
-            
-            if chinese_title != "N/A":
-                if target_year:
-                    print(f"    ✅ 豆瓣最佳匹配: {chinese_title} ({best_candidate['year']}) 评分: {rating}")
-                else:
-                    print(f"    ✅ 豆瓣找到: {chinese_title} 评分: {rating}")
-                return chinese_title, rating
-            
-            return "N/A", "N/A"
-            
-        except Exception as e:
-            print(f"    解析豆瓣搜索结果出错: {e}")
-            return "N/A", "N/A"
+                
+                # 查找电影链接
+                movie_link = result.find('a', href=re.compile(r'movie\.douban\.com'))
+                if not movie_link:
+                    continue
+                
+                movie_url = movie_link.get('href')
+                movie_title = movie_link.get_text(strip=True)
+                
+                # 尝试从链接或结果中提取年份
+                year_match = re.search(r'(\d{4})', result.get_text())
+                movie_year = int(year_match.group(1)) if year_match else None
+                
+                if movie_year:
+                    year_diff = abs(movie_year - target_year) if target_year else 0
+                    candidates.append({
+                        'title': movie_title,
+                        'year': movie_year,
+                        'url': movie_url,
+                        'year_diff': year_diff
+                    })
+                    
+                    self.log.debug("    候选: %s (%s) 差距: %s年", movie_title, movie_year, year_diff)
+                
+            except Exception as e:
+                continue
+        
+        if not candidates:
+            self.log.debug("    未找到有效的电影候选")
+            return []
+        
+        # 选择最佳匹配
+        if target_year:
+            candidates.sort(key=lambda x: x['year_diff'])
+        
+        return candidates
     
     def get_douban_movie_details(self, movie_url):
         """
@@ -554,59 +1301,107 @@ class BoxOfficeScraper:
             tuple: (中文片名, 评分)
         """
         try:
-            # 豆瓣详情页请求头
-            douban_headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            
-            response = requests.get(movie_url, headers=douban_headers, timeout=15)
+            response = self.fetch_with_breaker(movie_url, headers=DOUBAN_DETAIL_HEADERS, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self.parse_douban_movie_details(response.content)
             
-            # 提取中文片名
-            chinese_title = "N/A"
-            title_selectors = [
-                'h1 span[property="v:itemreviewed"]',
-                'h1 span',
-                '#content h1 span',
-                '.movie-title h1'
-            ]
-            
-            for selector in title_selectors:
-                title_element = soup.select_one(selector)
-                if title_element:
-                    chinese_title = title_element.get_text(strip=True)
-                    break
-            
-            # 提取评分
-            rating = "N/A"
-            rating_selectors = [
-                '.ll.rating_num',
-                'span.rating_num',
-                '.rating_num',
-                '[property="v:average"]'
-            ]
+        except Exception as e:
+            self.log.warning("    获取豆瓣详情出错: %s", e)
+            return "N/A", "N/A"
+    
+    def parse_douban_movie_details(self, html_content):
+        """
+        解析豆瓣电影详情页面
+        
+        Args:
+            html_content: 电影详情页面的HTML内容
             
-            for selector in rating_selectors:
-                rating_element = soup.select_one(selector)
-                if rating_element:
-                    rating_text = rating_element.get_text(strip=True)
-                    if re.match(r'^\d+\.?\d*$', rating_text):
-                        rating = rating_text
-                        break
+        Returns:
+            tuple: (中文片名, 评分)
+        """
+        chinese_title, rating, _ = self.resolve_douban_movie_details(html_content)
+        return chinese_title, rating
+    
+    def resolve_douban_movie_details(self, html_content):
+        """
+        解析豆瓣电影详情页面，并返回使用的提取路径
+        
+        片名和评分都能从结构化数据（JSON-LD）中取到时不构建soup，否则回退到CSS选择器。
+        
+        Returns:
+            tuple: (中文片名, 评分, EXTRACT_JSONLD 或 EXTRACT_SELECTOR)
+        """
+        chinese_title, rating = extract_jsonld_movie(html_content)
+        if chinese_title is not None and rating is not None:
+            self.metrics.inc('rating_extract_total', site='douban', path=EXTRACT_JSONLD)
+            return chinese_title, rating, EXTRACT_JSONLD
+        
+        self.metrics.inc('rating_extract_total', site='douban', path=EXTRACT_SELECTOR)
+        chinese_title, rating = self.parse_douban_details_selectors(html_content)
+        return chinese_title, rating, EXTRACT_SELECTOR
+    
+    def parse_douban_details_selectors(self, html_content):
+        """
+        按CSS选择器解析豆瓣电影详情页面
+        
+        Args:
+            html_content: 电影详情页面的HTML内容
             
-            return chinese_title, rating
+        Returns:
+            tuple: (中文片名, 评分)
+        """
+        chinese_title, rating = self.extract_douban_details(self.make_soup(html_content, DOUBAN_DETAIL_STRAINER))
+        
+        # 局部解析未找到时回退到整页解析，兼容页面结构变化
+        if self.parse_mode == PARSE_PARTIAL and "N/A" in (chinese_title, rating):
+            chinese_title, rating = self.extract_douban_details(self.make_soup(html_content))
+        
+        return chinese_title, rating
+    
+    def extract_douban_details(self, soup):
+        """
+        从豆瓣电影详情页面提取中文片名和评分
+        
+        Args:
+            soup: BeautifulSoup对象
             
-        except Exception as e:
-            print(f"    获取豆瓣详情出错: {e}")
-            return "N/A", "N/A"
+        Returns:
+            tuple: (中文片名, 评分)
+        """
+        # 提取中文片名
+        chinese_title = "N/A"
+        title_selectors = [
+            'h1 span[property="v:itemreviewed"]',
+            'h1 span',
+            '#content h1 span',
+            '.movie-title h1'
+        ]
+        
+        for selector in title_selectors:
+            title_element = soup.select_one(selector)
+            if title_element:
+                chinese_title = title_element.get_text(strip=True)
+                break
+        
+        # 提取评分
+        rating = "N/A"
+        rating_selectors = [
+            '.ll.rating_num',
+            'span.rating_num',
+            '.rating_num',
+            '[property="v:average"]'
+        ]
+        
+        for selector in rating_selectors:
+            rating_element = soup.select_one(selector)
+            if rating_element:
+                rating_text = rating_element.get_text(strip=True)
+                if re.match(r'^\d+\.?\d*$', rating_text):
+                    rating = rating_text
+                    break
+        
+        return chinese_title, rating
     
     def search_douban_static_mapping(self, movie_title, target_year=None):
         """
@@ -619,225 +1414,98 @@ class BoxOfficeScraper:
         Returns:
             tuple: (中文片名, 豆瓣评分)
         """
-        try:
-            # 构建包含年份信息的电影映射表
-            movie_mapping = self.get_douban_movie_mapping()
+        with self.metrics.timer('stage_seconds', stage='douban_static'):
+            try:
+                # 获取已建好索引的电影映射表
+                matcher = self.get_douban_matcher()
             
-            # 清理电影标题进行匹配
-            clean_title = movie_title.strip()
+                # 清理电影标题进行匹配
+                clean_title = movie_title.strip()
             
-            # 如果没有目标年份，使用基本匹配逻辑
-            if not target_year:
-                return self.basic_douban_match(clean_title, movie_mapping)
+                # 如果没有目标年份，使用基本匹配逻辑
+                if not target_year:
+                    return self.basic_douban_match(clean_title, matcher)
             
-            # 有目标年份时，寻找年份最接近的版本
-            return self.year_aware_douban_match(clean_title, target_year, movie_mapping)
+                # 有目标年份时，寻找年份最接近的版本
+                return self.year_aware_douban_match(clean_title, target_year, matcher)
             
-        except Exception as e:
-            print(f"    静态映射查找出错: {e}")
-            return "N/A", "N/A"
+            except Exception as e:
+                self.log.warning("    静态映射查找出错: %s", e)
+                return "N/A", "N/A"
+    
+    def get_douban_matcher(self):
+        """
+        获取电影映射表的匹配器（data/douban_mapping.sqlite3）
+        
+        数据文件在首次静态查找时才打开，按需查询，不把映射表读入内存。
+        """
+        return get_mapping_store(self.douban_mapping_path)
     
     def get_douban_movie_mapping(self):
         """
-        获取电影映射表，包含同名电影的不同版本
+        获取完整的电影映射表，包含同名电影的不同版本
         格式：电影名称 -> [(中文名, 评分, 年份), ...]
+        
+        映射数据用 douban_store.py 维护，此方法仅用于导出和检查。
         """
-        return {
-            # 同名电影的不同版本按年份排列
-            'The Lion King': [
-                ('狮子王', '9.1', 1994),
-                ('狮子王', '7.4', 2019)  # CG版
-            ],
-            'Beauty and the Beast': [
-                ('美女与野兽', '8.8', 1991),
-                ('美女与野兽', '7.2', 2017)  # 真人版
-            ],
-            'Aladdin': [
-                ('阿拉丁', '8.7', 1992),
-                ('阿拉丁', '7.1', 2019)  # 真人版
-            ],
-            'The Jungle Book': [
-                ('森林王子', '8.9', 1967),
-                ('奇幻森林', '7.8', 2016)
-            ],
-            'Dumbo': [
-                ('小飞象', '8.3', 1941),
-                ('小飞象', '6.3', 2019)  # 真人版
-            ],
-            'Mulan': [
-                ('花木兰', '8.9', 1998),
-                ('花木兰', '4.9', 2020)  # 真人版
-            ],
-            'Spider-Man': [
-                ('蜘蛛侠', '7.4', 2002),
-                ('超凡蜘蛛侠', '7.4', 2012),
-                ('蜘蛛侠：英雄归来', '7.4', 2017)
-            ],
-            'Batman': [
-                ('蝙蝠侠', '7.5', 1989),
-                ('蝙蝠侠：侠影之谜', '8.4', 2005),
-                ('蝙蝠侠：黑暗骑士', '9.3', 2008),
-                ('蝙蝠侠大战超人', '6.4', 2016)
-            ],
-            'Superman': [
-                ('超人', '7.3', 1978),
-                ('超人：钢铁之躯', '7.2', 2013)
-            ],
-            'King Kong': [
-                ('金刚', '8.2', 1933),
-                ('金刚', '7.2', 2005),
-                ('金刚：骷髅岛', '6.8', 2017)
-            ],
-            'Godzilla': [
-                ('哥斯拉', '6.5', 1998),
-                ('哥斯拉', '6.5', 2014),
-                ('哥斯拉大战金刚', '6.3', 2021)
-            ],
-            'Star Wars': [
-                ('星球大战', '8.8', 1977),
-                ('星球大战：原力觉醒', '7.9', 2015),
-                ('星球大战：最后的绝地武士', '7.2', 2017)
-            ],
-            'Jurassic Park': [
-                ('侏罗纪公园', '8.2', 1993),
-                ('侏罗纪世界', '7.1', 2015),
-                ('侏罗纪世界2', '6.0', 2018)
-            ],
-            'Planet of the Apes': [
-                ('人猿星球', '8.0', 1968),
-                ('猩球崛起', '7.8', 2011),
-                ('猩球崛起2', '8.2', 2014),
-                ('猩球崛起3', '7.2', 2017)
-            ],
-            'Mad Max': [
-                ('疯狂的麦克斯', '7.0', 1979),
-                ('疯狂的麦克斯：狂暴之路', '8.6', 2015)
-            ],
-            'Transformers': [
-                ('变形金刚', '7.9', 2007),
-                ('变形金刚：大黄蜂', '7.2', 2018)
-            ],
-            'Fast & Furious': [
-                ('速度与激情', '7.0', 2001),
-                ('速度与激情：特别行动', '6.5', 2019)
-            ],
-            
-            # 单一版本电影
-            'Lilo & Stitch': [('星际宝贝史迪奇', '7.2', 2002)],
-            'Lilo Stitch': [('星际宝贝史迪奇', '7.2', 2002)],
-            'Thunderbolts': [('雷霆特攻队', '6.8', 2025)],
-            'Thunderbolts*': [('雷霆特攻队', '6.8', 2025)],
-            'Avatar': [('阿凡达', '8.8', 2009)],
-            'Titanic': [('泰坦尼克号', '9.4', 1997)],
-            'Frozen': [('冰雪奇缘', '8.4', 2013)],
-            'Toy Story': [('玩具总动员', '8.3', 1995)],
-            'Finding Nemo': [('海底总动员', '8.4', 2003)],
-            'The Incredibles': [('超人总动员', '8.1', 2004)],
-            'Up': [('飞屋环游记', '9.0', 2009)],
-            'WALL-E': [('机器人总动员', '9.3', 2008)],
-            'Inside Out': [('头脑特工队', '8.7', 2015)],
-            'Coco': [('寻梦环游记', '9.1', 2017)],
-            'Moana': [('海洋奇缘', '7.6', 2016)],
-            'Zootopia': [('疯狂动物城', '9.2', 2016)],
-            'Big Hero 6': [('超能陆战队', '8.7', 2014)],
-            'Iron Man': [('钢铁侠', '8.1', 2008)],
-            'The Avengers': [('复仇者联盟', '8.1', 2012)],
-            'Black Panther': [('黑豹', '6.5', 2018)],
-            'Wonder Woman': [('神奇女侠', '7.1', 2017)],
-            'Aquaman': [('海王', '7.7', 2018)],
-            'Shazam': [('雷霆沙赞', '7.0', 2019)],
-            'Captain Marvel': [('惊奇队长', '6.1', 2019)],
-            'Joker': [('小丑', '8.8', 2019)],
-            'Justice League': [('正义联盟', '6.4', 2017)],
-            'Mission: Impossible': [('碟中谍', '8.2', 1996)],
-            'James Bond': [('007', '7.8', 2006)],
-            'John Wick': [('疾速追杀', '7.2', 2014)],
-            'Star Trek': [('星际迷航', '8.0', 2009)],
-            'The Matrix': [('黑客帝国', '9.1', 1999)],
-            'Lord of the Rings': [('指环王', '9.1', 2001)],
-            'Harry Potter': [('哈利·波特', '8.8', 2001)],
-            'Pirates of the Caribbean': [('加勒比海盗', '8.8', 2003)],
-            'Indiana Jones': [('夺宝奇兵', '8.0', 1981)],
-            'Sinners': [('罪人', '7.8', 2024)],
-            'IF': [('如果', '6.7', 2024)],
-            'Kingdom of the Planet of the Apes': [('猩球崛起：王国黎明', '7.2', 2024)],
-            'The Fall Guy': [('特技替身', '6.9', 2024)],
-            'Furiosa': [('芙莉欧萨：疯狂的麦克斯传奇', '8.6', 2024)],
-            'The Garfield Movie': [('加菲猫', '6.2', 2024)],
-            'Challengers': [('挑战者', '7.8', 2024)],
-            'Godzilla x Kong': [('哥斯拉大战金刚：新帝国', '6.3', 2024)],
-            'A Minecraft Movie': [('我的世界', '5.5', 2025)],
-            'Final Destination': [('死神来了', '7.1', 2000)],
-            'The Accountant': [('会计刺客', '7.3', 2016)],
-            'Karate Kid': [('功夫梦', '6.8', 2010)],
-            'The Amateur': [('业余爱好者', '6.5', 2025)],
-            'Snow White': [('白雪公主', '6.0', 2025)],
-            'Warfare': [('战争', '6.8', 2024)],
-            'A Working Man': [('打工人', '6.2', 2024)]
-        }
+        return self.get_douban_matcher().to_mapping()
     
-    def basic_douban_match(self, clean_title, movie_mapping):
+    def basic_douban_match(self, clean_title, matcher):
         """
         基本匹配逻辑（不考虑年份）
         """
         # 尝试精确匹配
-        if clean_title in movie_mapping:
-            versions = movie_mapping[clean_title]
-            chinese_title, rating, year = versions[0]  # 使用第一个版本
-            print(f"    找到匹配: {chinese_title} (评分: {rating})")
+        entry = matcher.exact(clean_title)
+        if entry:
+            chinese_title, rating, year = entry.versions[0]  # 使用第一个版本
+            self.log.debug("    找到匹配: %s (评分: %s)", chinese_title, rating)
+            self.metrics.inc('douban_static_total', result='exact')
             return chinese_title, rating
         
-        # 尝试部分匹配
-        for key, versions in movie_mapping.items():
-            if key.lower() in clean_title.lower() or clean_title.lower() in key.lower():
-                chinese_title, rating, year = versions[0]  # 使用第一个版本
-                print(f"    找到部分匹配: {chinese_title} (评分: {rating})")
-                return chinese_title, rating
+        # 尝试模糊匹配
+        matches = matcher.search(clean_title)
+        if matches:
+            score, entry, (chinese_title, rating, year) = matches[0]
+            self.log.debug("    找到模糊匹配: %s -> %s (评分: %s, 相似度: %.2f)", entry.key, chinese_title, rating, score)
+            self.metrics.inc('douban_static_total', result='fuzzy')
+            return chinese_title, rating
         
-        print(f"    未找到匹配的中文片名")
+        self.log.debug("    未找到匹配的中文片名")
+        self.metrics.inc('douban_static_total', result='miss')
         return "N/A", "N/A"
     
-    def year_aware_douban_match(self, clean_title, target_year, movie_mapping):
+    def year_aware_douban_match(self, clean_title, target_year, matcher):
         """
         考虑年份的匹配逻辑
         """
         best_match = None
-        best_year_diff = float('inf')
+        result = 'exact'
         
-        # 尝试精确匹配
-        if clean_title in movie_mapping:
-            versions = movie_mapping[clean_title]
-            
-            for chinese_title, rating, movie_year in versions:
-                year_diff = abs(movie_year - target_year)
-                print(f"    找到版本: {chinese_title} ({movie_year}) 差距: {year_diff}年")
-                
-                if year_diff < best_year_diff:
-                    best_year_diff = year_diff
-                    best_match = (chinese_title, rating, movie_year)
+        # 尝试精确匹配：二分查找年份最接近的版本
+        entry = matcher.exact(clean_title)
+        if entry:
+            self.log.debug("    找到 %s 个版本: %s", len(entry.versions), entry.key)
+            best_match = entry.nearest_version(target_year)
         
-        # 如果精确匹配没找到，尝试部分匹配
+        # 如果精确匹配没找到，尝试模糊匹配（得分已计入年份差距和续集编号）
         if not best_match:
-            for key, versions in movie_mapping.items():
-                if key.lower() in clean_title.lower() or clean_title.lower() in key.lower():
-                    for chinese_title, rating, movie_year in versions:
-                        year_diff = abs(movie_year - target_year)
-                        print(f"    找到部分匹配版本: {chinese_title} ({movie_year}) 差距: {year_diff}年")
-                        
-                        if year_diff < best_year_diff:
-                            best_year_diff = year_diff
-                            best_match = (chinese_title, rating, movie_year)
+            matches = matcher.search(clean_title, target_year)
+            for score, entry, (chinese_title, rating, movie_year) in matches:
+                self.log.debug("    找到模糊匹配版本: %s -> %s (%s) 得分: %.2f", entry.key, chinese_title, movie_year, score)
+            if matches:
+                best_match = matches[0][2]
+                result = 'fuzzy'
         
         if best_match:
             chinese_title, rating, movie_year = best_match
-            print(f"    选择最佳匹配: {chinese_title} ({movie_year}) 评分: {rating}")
+            self.log.debug("    选择最佳匹配: %s (%s) 评分: %s", chinese_title, movie_year, rating)
+            self.metrics.inc('douban_static_total', result=result)
             return chinese_title, rating
         
-        print(f"    未找到匹配的中文片名")
+        self.log.debug("    未找到匹配的中文片名")
+        self.metrics.inc('douban_static_total', result='miss')
         return "N/A", "N/A"
     
-
-    
     def clean_gross_amount(self, gross_text):
         """清理票房金额文本，提取数字"""
         if not gross_text:
@@ -849,32 +1517,150 @@ class BoxOfficeScraper:
         except ValueError:
             return 0
     
-    def scrape_monthly_data(self, year, month):
+    def scrape_monthly_data(self, year, month, checkpoint=None):
         """
-        抓取指定年月的票房数据
+        抓取指定年月的票房数据（收集 iter_monthly_data 产出的所有电影）
         
         Args:
             year (int): 年份
             month (int): 月份 (1-12)
+            checkpoint (MonthCheckpoint): 检查点，每部电影完成后立即记录，已记录的电影直接恢复
             
         Returns:
             list: 包含票房数据的字典列表
         """
-        month_name = self.get_month_name(month)
-        if not month_name:
-            raise ValueError("月份必须在1-12之间")
+        return list(self.iter_monthly_data(year, month, checkpoint))
+    
+    def iter_monthly_data(self, year, month, checkpoint=None):
+        """
+        逐部产出指定年月的票房数据：每部电影补充完评分后立即产出，按排名顺序
+        
+        Args:
+            year (int): 年份
+            month (int): 月份 (1-12)
+            checkpoint (MonthCheckpoint): 检查点，每部电影完成后立即记录，已记录的电影直接恢复
+            
+        Yields:
+            dict: 一部电影的票房和评分数据；全部产出后记录当月用时并输出摘要
+        """
+        start = time.monotonic()
+        movies_data = self.scrape_month_table(year, month)
+        if movies_data is None:
+            self.metrics.observe('stage_seconds', time.monotonic() - start, stage='month')
+            return
+        
+        # 只为排名靠前的电影查询评分，长尾电影只保留票房数据（可稍后用 enrich_movies 补充）
+        enrich_count = len(movies_data) if self.enrich_limit is None else min(self.enrich_limit, len(movies_data))
+        to_enrich = movies_data[:enrich_count]
+        if enrich_count < len(movies_data):
+            self.log.info("为前 %s 部电影查询评分，其余 %s 部只抓取票房数据", enrich_count, len(movies_data) - enrich_count)
         
-        url = self.base_url.format(month=month_name, year=year)
-        print(f"正在抓取: {url}")
+        # 从检查点恢复上次运行中已完成的电影
+        restored = set()
+        if checkpoint is not None:
+            restored = {i for i, movie_data in enumerate(to_enrich, 1) if checkpoint.restore(i, movie_data)}
+            if restored:
+                self.log.info("从检查点恢复 %s 部已完成的电影", len(restored))
+            for i in restored:
+                self.remember_ratings(movies_data[i - 1], year)
+        
+        # 获取每部电影的IMDb评分和豆瓣信息（访问频率由限速器控制）
+        if self.concurrent:
+            movies = self.iter_enriched_concurrently(to_enrich, year, checkpoint, restored)
+        else:
+            movies = self.iter_enriched_serially(to_enrich, year, checkpoint, restored)
+        
+        completed = []
+        for movie_data in itertools.chain(movies, movies_data[enrich_count:]):
+            completed.append(movie_data)
+            yield movie_data
+        elapsed = time.monotonic() - start
+        self.metrics.observe('stage_seconds', elapsed, stage='month')
+        self.report_month(year, month, completed, restored, elapsed)
+        self.log.info("成功抓取 %s 条电影数据", len(completed))
+    
+    def scrape_month_table(self, year, month):
+        """
+        只抓取指定年月的票房表格，不查询评分（一次请求）
+        
+        Args:
+            year (int): 年份
+            month (int): 月份 (1-12)
+            
+        Returns:
+            list: 电影数据字典列表，中文片名和评分字段为"N/A"；请求失败时返回None
+        """
+        url = self.build_month_url(year, month)
+        self.log.info("正在抓取: %s", url, extra=event('month_start', year=year, month=month, url=url))
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            with self.metrics.timer('stage_seconds', stage='month_page'):
+                response = self.fetch_page(url, timeout=10)
             response.raise_for_status()
         except requests.RequestException as e:
-            print(f"请求失败: {e}")
-            return []
+            self.log.error("请求失败: %s", e, extra=event('month_failed', year=year, month=month, error=str(e)))
+            return None
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with self.metrics.timer('stage_seconds', stage='month_parse'):
+            movies_data = self.parse_monthly_table(response.content)
+        self.metrics.inc('movies_total', len(movies_data))
+        return movies_data
+    
+    def enrich_movies(self, movies_data, year):
+        """
+        为已抓取票房数据的电影补充评分，用于稍后补充 enrich_limit 之外的长尾电影
+        
+        已有任一评分或中文片名的电影跳过；并发模式下使用线程池，否则逐部查询。
+        
+        Args:
+            movies_data (list): 电影数据列表，原地更新
+            year (int): 票房统计年份
+            
+        Returns:
+            int: 查询的电影数量
+        """
+        pending = [movie_data for movie_data in movies_data
+                   if all(movie_data.get(field, "N/A") == "N/A" for field in ('中文片名', 'IMDb评分', '豆瓣评分'))]
+        if self.concurrent:
+            movies = self.iter_enriched_concurrently(pending, year)
+        else:
+            movies = self.iter_enriched_serially(pending, year)
+        for _ in movies:
+            pass
+        return len(pending)
+    
+    def iter_enriched_serially(self, movies_data, year, checkpoint=None, restored=()):
+        """逐部获取电影的IMDb评分和豆瓣信息，参数同 iter_enriched_concurrently"""
+        for i, movie_data in enumerate(movies_data, 1):
+            if i not in restored:
+                self.enrich_movie(movie_data, year, i)
+                if checkpoint is not None:
+                    checkpoint.record_movie(i, movie_data)
+            else:
+                self.report_movie(movie_data)
+            yield movie_data
+    
+    def parse_monthly_table(self, html_content):
+        """
+        解析BoxOfficeMojo月度榜单页面中的票房表格（不含评分信息），取前 self.top_n 行
+        
+        Args:
+            html_content: 月度榜单页面的HTML内容
+            
+        Returns:
+            list: 电影数据字典列表，中文片名和评分字段为"N/A"
+        """
+        if self.parse_mode == PARSE_PARTIAL:
+            # lxml直接按XPath取出表格各列，不构建soup；没有找到表格时回退到下面的完整解析
+            movies_data = [
+                self.monthly_row(rank, release_name, total_gross_text, release_date_raw)
+                for rank, release_name, _, total_gross_text, release_date_raw
+                in iter_month_table_cells(html_content, self.top_n, self.log)
+            ]
+            if movies_data:
+                return movies_data
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
         
         # 查找票房数据表格 - 尝试多种可能的类名
         table = soup.find('table', class_='a-bordered')
@@ -886,36 +1672,37 @@ class BoxOfficeScraper:
             table = soup.find('table')
         
         if not table:
-            print("未找到数据表格")
-            print("页面内容预览:")
-            print(soup.get_text()[:500])  # 显示前500个字符
+            self.log.warning("未找到数据表格")
+            self.log.debug("页面内容预览:\n%s", soup.get_text()[:500])  # 显示前500个字符
             return []
         
-        print(f"找到表格，类名: {table.get('class', 'no-class')}")
+        self.log.debug("找到表格，类名: %s", table.get('class', 'no-class'))
         
         movies_data = []
         # 更安全地查找表格行
         tbody = table.find('tbody')
         if tbody:
             rows = tbody.find_all('tr')
-            print(f"从tbody中找到 {len(rows)} 行数据")
+            self.log.debug("从tbody中找到 %s 行数据", len(rows))
         else:
             # 如果没有tbody，直接从table中查找tr
             rows = table.find_all('tr')
-            print(f"从table中找到 {len(rows)} 行数据")
+            self.log.debug("从table中找到 %s 行数据", len(rows))
             # 跳过表头行（通常第一行是表头）
             if rows and rows[0].find('th'):
                 rows = rows[1:]
-                print(f"跳过表头后剩余 {len(rows)} 行数据")
+                self.log.debug("跳过表头后剩余 %s 行数据", len(rows))
         
         if not rows:
-            print("未找到任何数据行")
+            self.log.warning("未找到任何数据行")
             return []
         
-        # 只取前10行数据
-        for i, row in enumerate(rows[:10]):
+        # 只取前 top_n 行数据，None 表示整张榜单
+        if self.top_n is not None:
+            rows = rows[:self.top_n]
+        for i, row in enumerate(rows):
             cells = row.find_all('td')
-            print(f"第{i+1}行包含 {len(cells)} 个单元格")
+            self.log.debug("第%s行包含 %s 个单元格", i+1, len(cells))
             
             if len(cells) >= 7:  # 需要至少7列数据
                 try:
@@ -933,41 +1720,193 @@ class BoxOfficeScraper:
                     
                     # 首映日期 - 第9列 (索引8)
                     release_date_raw = cells[8].get_text(strip=True) if len(cells) > 8 else "N/A"
-                    release_date = self.convert_date_to_chinese(release_date_raw)
-                    
-                    # 获取IMDb评分
-                    print(f"正在获取第{i+1}部电影的IMDb评分...")
-                    imdb_rating = self.search_imdb_rating(release_name, year)
-                    
-                    # 获取豆瓣信息（中文片名和评分）
-                    print(f"正在获取第{i+1}部电影的豆瓣信息...")
-                    chinese_title, douban_rating = self.search_douban_movie(release_name, year)
-                    
-                    movie_data = {
-                        '排名': rank,
-                        '英文片名': release_name,
-                        '中文片名': chinese_title,
-                        '累计票房': total_gross_text,
-                        '首映日期': release_date,
-                        'IMDb评分': imdb_rating,
-                        '豆瓣评分': douban_rating
-                    }
-                    
-                    movies_data.append(movie_data)
-                    print(f"已抓取: {rank}. {release_name} / {chinese_title} (IMDb: {imdb_rating}, 豆瓣: {douban_rating})")
                     
-                    # 添加延时，避免请求过于频繁
-                    if i < 9:  # 不是最后一部电影
-                        print(f"等待5秒...")
-                        time.sleep(5)
+                    movies_data.append(self.monthly_row(rank, release_name, total_gross_text, release_date_raw))
                     
                 except Exception as e:
-                    print(f"处理第{i+1}行数据时出错: {e}")
+                    self.log.warning("处理第%s行数据时出错: %s", i+1, e)
                     continue
         
-        print(f"成功抓取 {len(movies_data)} 条电影数据")
         return movies_data
     
+    def monthly_row(self, rank, release_name, total_gross_text, release_date_raw):
+        """
+        由票房表格一行的文本生成电影数据字典
+        
+        Args:
+            rank (str): 排名
+            release_name (str): 英文片名
+            total_gross_text (str): 累计票房，如 "$207,499,545"
+            release_date_raw (str): 英文首映日期，如 "May 23"
+            
+        Returns:
+            dict: 电影数据，中文片名和评分字段为"N/A"
+        """
+        return {
+            '排名': rank,
+            '英文片名': release_name,
+            '中文片名': "N/A",
+            '累计票房': total_gross_text,
+            '首映日期': self.convert_date_to_chinese(release_date_raw),
+            'IMDb评分': "N/A",
+            '豆瓣评分': "N/A"
+        }
+    
+    def enrich_movie(self, movie_data, year, index):
+        """
+        为单部电影补充IMDb评分、中文片名和豆瓣评分
+        
+        Args:
+            movie_data (dict): 从票房表格解析出的电影数据，原地更新
+            year (int): 票房统计年份
+            index (int): 电影序号，用于输出进度
+        """
+        release_name = movie_data['英文片名']
+        
+        if self.apply_rating_memo(movie_data, year):
+            self.log.debug("第%s部电影已查询过，使用缓存结果", index)
+        else:
+            # 获取IMDb评分
+            self.log.debug("正在获取第%s部电影的IMDb评分...", index)
+            movie_data['IMDb评分'], imdb_reason = self.find_imdb_rating(release_name, year)
+            
+            # 获取豆瓣信息（中文片名和评分）
+            self.log.debug("正在获取第%s部电影的豆瓣信息...", index)
+            movie_data['中文片名'], movie_data['豆瓣评分'], douban_reason = self.find_douban_movie(release_name, year)
+            
+            self.remember_ratings(movie_data, year, imdb_reason, douban_reason)
+        
+        self.report_movie(movie_data)
+    
+    def enrich_movies_concurrently(self, movies_data, year, checkpoint=None, restored=()):
+        """
+        并发获取所有电影的IMDb评分和豆瓣信息
+        
+        Args:
+            movies_data (list): 从票房表格解析出的电影数据列表，原地更新
+            year (int): 票房统计年份
+            checkpoint (MonthCheckpoint): 检查点，每部电影完成后立即记录
+            restored (set): 已从检查点恢复、无需再查询的电影序号（从1开始）
+        """
+        for _ in self.iter_enriched_concurrently(movies_data, year, checkpoint, restored):
+            pass
+    
+    def iter_enriched_concurrently(self, movies_data, year, checkpoint=None, restored=()):
+        """
+        并发获取所有电影的IMDb评分和豆瓣信息，按排名顺序逐部产出已完成的电影
+        
+        IMDb和豆瓣查询分别作为独立任务提交到线程池，
+        各站点的访问频率由 self.rate_limiter 统一控制。
+        
+        Args:
+            movies_data (list): 从票房表格解析出的电影数据列表，原地更新
+            year (int): 票房统计年份
+            checkpoint (MonthCheckpoint): 检查点，每部电影完成后立即记录
+            restored (set): 已从检查点恢复、无需再查询的电影序号（从1开始）
+            
+        Yields:
+            dict: 补充完评分的电影数据
+        """
+        if not movies_data:
+            return
+        
+        self.log.info("并发获取 %s 部电影的评分信息 (线程数: %s)...", len(movies_data), self.max_workers)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # 交替提交两个站点的任务，避免某个站点的任务排在队尾
+            futures = []
+            for index, movie_data in enumerate(movies_data, 1):
+                if index in restored:
+                    futures.append((index, movie_data, None, None))
+                    continue
+                if self.apply_rating_memo(movie_data, year):
+                    if checkpoint is not None:
+                        checkpoint.record_movie(index, movie_data)
+                    futures.append((index, movie_data, None, None))
+                    continue
+                release_name = movie_data['英文片名']
+                imdb_future = executor.submit(self.find_imdb_rating, release_name, year)
+                douban_future = executor.submit(self.find_douban_movie, release_name, year)
+                futures.append((index, movie_data, imdb_future, douban_future))
+            
+            for index, movie_data, imdb_future, douban_future in futures:
+                if imdb_future is not None:
+                    movie_data['IMDb评分'], imdb_reason = imdb_future.result()
+                    movie_data['中文片名'], movie_data['豆瓣评分'], douban_reason = douban_future.result()
+                    self.remember_ratings(movie_data, year, imdb_reason, douban_reason)
+                    if checkpoint is not None:
+                        checkpoint.record_movie(index, movie_data)
+                self.report_movie(movie_data)
+                yield movie_data
+    
+    def report_movie(self, movie_data):
+        """输出一部电影的抓取结果"""
+        self.log.info("已抓取: %s. %s / %s (IMDb: %s, 豆瓣: %s)",
+                 movie_data['排名'], movie_data['英文片名'], movie_data['中文片名'],
+                 movie_data['IMDb评分'], movie_data['豆瓣评分'],
+                 extra=event('movie', rank=movie_data['排名'], title=movie_data['英文片名'],
+                             chinese_title=movie_data['中文片名'], imdb=movie_data['IMDb评分'],
+                             douban=movie_data['豆瓣评分']))
+    
+    def report_month(self, year, month, movies_data, restored, elapsed):
+        """
+        输出一个月份的摘要（quiet 模式下也输出）
+        
+        Args:
+            movies_data (list): 当月已完成的电影数据
+            restored (set): 从检查点恢复的电影序号
+            elapsed (float): 用时（秒）
+        """
+        imdb_found = sum(1 for movie in movies_data if movie['IMDb评分'] != "N/A")
+        douban_found = sum(1 for movie in movies_data if movie['豆瓣评分'] != "N/A")
+        summary_log.info("%s年%s月: %s 部电影, IMDb评分 %s, 豆瓣评分 %s, 检查点恢复 %s, 用时 %.1f秒",
+                         year, month, len(movies_data), imdb_found, douban_found, len(restored), elapsed,
+                         extra=event('month_summary', year=year, month=month, movies=len(movies_data),
+                                     imdb_found=imdb_found, douban_found=douban_found,
+                                     restored=len(restored), seconds=round(elapsed, 3)))
+    
+    def apply_rating_memo(self, movie_data, year):
+        """
+        用评分缓存中已有的结果填充电影数据
+        
+        Returns:
+            bool: 是否命中缓存
+        """
+        if self.rating_memo is None:
+            return False
+        
+        cached = self.rating_memo.get(movie_data['英文片名'], year)
+        self.metrics.inc('rating_memo_total', result='miss' if cached is None else 'hit')
+        if cached is None:
+            return False
+        
+        movie_data['IMDb评分'], movie_data['中文片名'], movie_data['豆瓣评分'] = cached
+        return True
+    
+    def remember_ratings(self, movie_data, year, imdb_reason=None, douban_reason=None):
+        """
+        把一部电影的查询结果写入评分缓存
+        
+        只缓存可信的结果：每个来源要么查到了，要么确认查不到（失败原因在 CONFIRMED_MISSES 中）；
+        网络错误、被拦截或熔断导致的"N/A"不缓存，后续月份重新查询。
+        
+        Args:
+            movie_data (dict): 补充完评分的电影数据
+            year (int): 票房统计年份
+            imdb_reason (str): find_imdb_rating 给出的失败原因，不知道原因（如从检查点恢复）时为None
+            douban_reason (str): find_douban_movie 给出的失败原因
+        """
+        if self.rating_memo is None:
+            return
+        if movie_data['IMDb评分'] == "N/A" and imdb_reason not in CONFIRMED_MISSES:
+            return
+        if "N/A" in (movie_data['中文片名'], movie_data['豆瓣评分']) and douban_reason not in CONFIRMED_MISSES:
+            return
+        self.rating_memo.put(
+            movie_data['英文片名'], year,
+            movie_data['IMDb评分'], movie_data['中文片名'], movie_data['豆瓣评分']
+        )
+    
     def save_to_csv(self, data, year, month, filename=None):
         """
         将数据保存到CSV文件
@@ -979,7 +1918,7 @@ class BoxOfficeScraper:
             filename (str): 保存的文件名，如果为None则自动生成
         """
         if not data:
-            print("没有数据可保存")
+            self.log.warning("没有数据可保存")
             return
         
         if filename is None:
@@ -987,28 +1926,23 @@ class BoxOfficeScraper:
             os.makedirs('data', exist_ok=True)
             
             # 生成固定格式的文件名（相同年月会覆盖）
-            filename = f"data/boxoffice_{year}_{month:02d}.csv"
+            filename = monthly_csv_path(year, month)
         
         df = pd.DataFrame(data)
         # 保留需要的七列，按指定顺序
-        columns_order = ['排名', '英文片名', '中文片名', '累计票房', '首映日期', 'IMDb评分', '豆瓣评分']
-        df = df.reindex(columns=columns_order)
+        df = df.reindex(columns=MONTHLY_COLUMNS)
         
         df.to_csv(filename, index=False, encoding='utf-8-sig')
-        print(f"数据已保存到: {filename}")
+        self.log.info("数据已保存到: %s", filename)
         return filename
     
     def debug_page_structure(self, year, month):
         """调试模式：分析页面结构"""
-        month_name = self.get_month_name(month)
-        if not month_name:
-            raise ValueError("月份必须在1-12之间")
-        
-        url = self.base_url.format(month=month_name, year=year)
+        url = self.build_month_url(year, month)
         print(f"调试模式 - 分析页面: {url}")
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.fetch_page(url, timeout=10)
             response.raise_for_status()
         except requests.RequestException as e:
             print(f"请求失败: {e}")
@@ -1045,6 +1979,7 @@ class BoxOfficeScraper:
 
 def main():
     """主函数"""
+    configure_logging()
     print("=== BoxOfficeMojo 票房数据抓取工具 ===")
     print()
     
@@ -1093,6 +2028,7 @@ def main():
             # 保存数据
             filename = scraper.save_to_csv(data, year, month)
             print(f"\n所有数据已保存到: {filename}")
+            scraper.metrics.print_summary()
         else:
             print("未能获取到数据，请检查网络连接或稍后重试")
             
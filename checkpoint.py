@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量抓取的检查点
+
+每个月份一个 JSONL 文件（data/checkpoints/boxoffice_YYYY_MM.jsonl），追加写入：
+- 每部电影补充完评分后立即写入一条 movie 记录
+- 当月CSV保存后写入一条 month_done 记录
+
+中断后重新运行时，已完成的月份直接跳过，未完成的月份从最后一部已记录的电影之后继续。
+多进程抓取时每个月份只由一个进程处理，各进程写入不同的文件，无需加锁。
+"""
+
+import json
+import os
+import threading
+
+
+DEFAULT_CHECKPOINT_DIR = "data/checkpoints"
+
+
+class MonthCheckpoint:
+    """单个月份的检查点"""
+
+    def __init__(self, directory, year, month):
+        """
+        Args:
+            directory (str): 检查点目录
+            year (int): 年份
+            month (int): 月份
+        """
+        self.path = os.path.join(directory, f"boxoffice_{year}_{month:02d}.jsonl")
+        self.year = year
+        self.month = month
+        self.movies = {}
+        self.done = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """读取已有的检查点记录；中断时写了一半的最后一行会被忽略"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'movie':
+                    self.movies[record['index']] = record['data']
+                elif record.get('type') == 'month_done':
+                    self.done = True
+
+    def append(self, record):
+        """追加一条记录并立即落盘"""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def restore(self, index, movie_data):
+        """
+        用检查点中已完成的结果填充电影数据（片名不一致时视为榜单已变化，不恢复）
+
+        Returns:
+            bool: 是否已恢复
+        """
+        saved = self.movies.get(index)
+        if saved is None or saved.get('英文片名') != movie_data['英文片名']:
+            return False
+        movie_data.update(saved)
+        return True
+
+    def record_movie(self, index, movie_data):
+        """记录一部已补充完评分的电影"""
+        self.movies[index] = dict(movie_data)
+        self.append({'type': 'movie', 'index': index, 'data': movie_data})
+
+    def mark_done(self, count):
+        """记录当月已全部完成并保存"""
+        self.done = True
+        self.append({'type': 'month_done', 'count': count})
+
+    def saved_movies(self):
+        """按序号返回检查点中已完成的电影数据"""
+        return [self.movies[index] for index in sorted(self.movies)]
+
+    def reset(self):
+        """删除检查点，重新开始抓取该月份"""
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.movies = {}
+            self.done = False
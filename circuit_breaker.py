@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按站点的熔断器和退避重试
+
+站点连续返回403/429或超时达到阈值后熔断器打开，冷却期内的请求不再发出，
+直接走备选路径（豆瓣查询回退到静态映射）；冷却期结束后进入半开状态，
+放行一个探测请求，成功则关闭，失败则重新打开。
+
+退避重试的等待时间为带随机抖动的指数退避，服务器给出 Retry-After 时以其为准。
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from rate_limiter import host_key
+
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# 连续失败多少次后熔断，以及熔断的冷却时间（秒）
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+# 计为熔断失败的HTTP状态码：被拦截和被限流
+BREAKER_FAILURE_STATUSES = (403, 429)
+
+# 退避后重试的HTTP状态码（5xx由会话的urllib3重试策略处理）
+RETRY_STATUSES = (429,)
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开期间请求被拒绝"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} 已熔断，{retry_in:.0f}秒后重试")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value, now=None):
+    """
+    解析 Retry-After 响应头：秒数或HTTP日期
+
+    Returns:
+        float: 需要等待的秒数，无法解析时返回None
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if moment is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - now)
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None, rng=random):
+    """
+    第 attempt 次重试（从0开始）前的等待时间
+
+    使用全抖动的指数退避：在 [0, min(cap, base * 2^attempt)] 内均匀取值，
+    避免多个线程同时重试；服务器给出 Retry-After 时不早于该时间。
+
+    Args:
+        attempt (int): 已重试的次数
+        base (float): 退避基数（秒）
+        cap (float): 单次等待的上限（秒）
+        retry_after (float): 服务器要求的等待秒数
+        rng: 随机数来源
+
+    Returns:
+        float: 等待秒数
+    """
+    delay = rng.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """单个站点的熔断器"""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        """
+        Args:
+            failure_threshold (int): 连续失败多少次后打开
+            cooldown (float): 打开后的冷却时间（秒）
+            clock: 时间来源，返回秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        是否放行一个请求：关闭时放行；打开时冷却期结束后转为半开并只放行一个探测请求
+
+        Returns:
+            bool: 是否放行
+        """
+        with self.lock:
+            if self.state == STATE_OPEN and self.clock() >= self.opened_until:
+                self.state = STATE_HALF_OPEN
+                self.probing = False
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def retry_in(self):
+        """距离冷却期结束的秒数"""
+        with self.lock:
+            return max(0.0, self.opened_until - self.clock())
+
+    def record_success(self):
+        """
+        记录一次成功，清零连续失败次数，半开状态下关闭熔断器
+
+        Returns:
+            bool: 本次成功是否使熔断器从打开/半开转为关闭
+        """
+        with self.lock:
+            closed = self.state != STATE_CLOSED
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self.probing = False
+            return closed
+
+    def record_failure(self, retry_after=None):
+        """
+        记录一次失败：连续失败达到阈值或半开探测失败时打开
+
+        Args:
+            retry_after (float): 服务器要求的等待秒数，超过冷却时间时按其延长冷却期
+
+        Returns:
+            bool: 本次失败是否使熔断器打开（已打开时返回False）
+        """
+        with self.lock:
+            self.failures += 1
+            opened = self.state != STATE_OPEN and (
+                self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold)
+            if opened or self.state == STATE_OPEN:
+                self.state = STATE_OPEN
+                self.probing = False
+                self.opened_until = max(self.opened_until, self.clock() + max(self.cooldown, retry_after or 0.0))
+            return opened
+
+
+class HostCircuitBreakers:
+    """按站点划分的熔断器，同一站点的不同子域名共用一个（见 host_key）"""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get_breaker(self, url):
+        """获取（必要时创建）URL所属站点的熔断器"""
+        host = host_key(url)
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.cooldown, self.clock)
+                self.breakers[host] = breaker
+            return breaker
+
+    def check(self, url):
+        """
+        在访问URL前调用，熔断器打开时抛出 CircuitOpenError
+
+        Raises:
+            CircuitOpenError: 站点已熔断
+        """
+        breaker = self.get_breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(host_key(url), breaker.retry_in())
+
+    def record_success(self, url):
+        return self.get_breaker(url).record_success()
+
+    def record_failure(self, url, retry_after=None):
+        return self.get_breaker(url).record_failure(retry_after)
+
+    def states(self):
+        """各站点熔断器的当前状态"""
+        with self.lock:
+            return {host: breaker.state for host, breaker in self.breakers.items()}
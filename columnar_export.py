@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+带类型的列式导出（Parquet / Arrow IPC）
+
+CSV中所有字段都是文本（票房 "$344,684,243"、评分 "7.0" 或 "N/A"、日期 "5月23日"），
+每次分析都要重新解析。这里把抓取结果转换为带类型的列：
+
+    年份/月份/排名   int32
+    累计票房         int64（美元）
+    首映日期         date32（由榜单年月推断年份）
+    IMDb评分/豆瓣评分 float64，缺失为 null
+    中文片名         string，缺失为 null
+
+Arrow IPC 文件不压缩写入，读取时内存映射，只取需要的列，扫描几十年的数据也不复制内存。
+依赖 pyarrow（可选，pip install pyarrow）；未安装时其他功能不受影响。
+
+用法：
+    python columnar_export.py data/boxoffice_2025_0*.csv -o data/boxoffice_2025.arrow
+    python columnar_export.py data/batch_boxoffice_1990_01_to_2025_06.csv -o data/boxoffice.parquet
+"""
+
+import argparse
+import os
+import re
+from datetime import date
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# 列式文件默认每1000行一个记录批次（Parquet中为一个行组）
+DEFAULT_BATCH_ROWS = 1000
+
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+MONTHLY_CSV_PATTERN = re.compile(r'boxoffice_(\d{4})_(\d{2})\.csv$')
+CHINESE_DATE_PATTERN = re.compile(r'^\s*(\d{1,2})月(\d{1,2})日\s*$')
+ENGLISH_DATE_PATTERN = re.compile(r'^\s*([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2}),?(?:\s+(\d{4}))?\s*$')
+ENGLISH_MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+
+
+def require_pyarrow():
+    """未安装 pyarrow 时给出明确的提示"""
+    if pa is None:
+        raise ImportError("列式导出需要 pyarrow，请先运行: pip install pyarrow")
+
+
+def typed_schema():
+    """导出文件的列和类型"""
+    require_pyarrow()
+    return pa.schema([
+        ('年份', pa.int32()),
+        ('月份', pa.int32()),
+        ('排名', pa.int32()),
+        ('英文片名', pa.string()),
+        ('中文片名', pa.string()),
+        ('累计票房', pa.int64()),
+        ('首映日期', pa.date32()),
+        ('IMDb评分', pa.float64()),
+        ('豆瓣评分', pa.float64()),
+    ])
+
+
+def is_missing(value):
+    return value is None or value == '' or value == 'N/A' or (isinstance(value, float) and value != value)
+
+
+def parse_int(value):
+    """解析排名、年份等整数，无法解析时返回None"""
+    if is_missing(value):
+        return None
+    try:
+        return int(float(str(value).replace(',', '')))
+    except ValueError:
+        return None
+
+
+def parse_gross(value):
+    """
+    解析票房金额
+
+    Args:
+        value: 如 "$344,684,243"
+
+    Returns:
+        int: 美元金额，无法解析时返回None
+    """
+    if is_missing(value):
+        return None
+    cleaned = re.sub(r'[,$\s]', '', str(value))
+    try:
+        return int(round(float(cleaned)))
+    except ValueError:
+        return None
+
+
+def parse_rating(value):
+    """解析 "7.0" / 7.0 形式的评分，"N/A" 或无法解析时返回None"""
+    if is_missing(value):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_release_date(value, year, month):
+    """
+    解析首映日期
+
+    CSV中的日期没有年份（如 "5月23日"），按榜单年月推断：
+    首映月份晚于榜单月份时视为上一年上映（如1月榜单中12月上映的电影）。
+
+    Args:
+        value (str): "5月23日"，或未能转换的英文日期 "May 23" / "Dec 20, 2024"
+        year (int): 榜单年份
+        month (int): 榜单月份
+
+    Returns:
+        date: 首映日期，无法解析时返回None
+    """
+    if is_missing(value):
+        return None
+    text = str(value)
+    release_year = None
+    match = CHINESE_DATE_PATTERN.match(text)
+    if match:
+        release_month, day = int(match.group(1)), int(match.group(2))
+    else:
+        match = ENGLISH_DATE_PATTERN.match(text)
+        if not match or match.group(1).lower() not in ENGLISH_MONTHS:
+            return None
+        release_month, day = ENGLISH_MONTHS[match.group(1).lower()], int(match.group(2))
+        if match.group(3):
+            release_year = int(match.group(3))
+
+    if release_year is None:
+        if year is None:
+            return None
+        release_year = year - 1 if month is not None and release_month > month else year
+    try:
+        return date(release_year, release_month, day)
+    except ValueError:
+        return None
+
+
+def typed_row(row, year=None, month=None):
+    """
+    把一行抓取结果转换为带类型的值
+
+    Args:
+        row (dict): 抓取结果，可带 年份/月份 列（范围抓取的合并数据）
+        year (int): 行中没有年份时使用的榜单年份
+        month (int): 行中没有月份时使用的榜单月份
+
+    Returns:
+        dict: 列名 -> 类型化的值
+    """
+    year = parse_int(row.get('年份')) or year
+    month = parse_int(row.get('月份')) or month
+    chinese_title = row.get('中文片名')
+    return {
+        '年份': year,
+        '月份': month,
+        '排名': parse_int(row.get('排名')),
+        '英文片名': None if is_missing(row.get('英文片名')) else str(row['英文片名']),
+        '中文片名': None if is_missing(chinese_title) else str(chinese_title),
+        '累计票房': parse_gross(row.get('累计票房')),
+        '首映日期': parse_release_date(row.get('首映日期'), year, month),
+        'IMDb评分': parse_rating(row.get('IMDb评分')),
+        '豆瓣评分': parse_rating(row.get('豆瓣评分')),
+    }
+
+
+def typed_batch(rows, year=None, month=None):
+    """
+    把多行抓取结果转换为Arrow记录批次
+
+    Returns:
+        pyarrow.RecordBatch: 带类型的记录批次
+    """
+    schema = typed_schema()
+    typed = [typed_row(row, year, month) for row in rows]
+    return pa.RecordBatch.from_pylist(typed, schema=schema)
+
+
+def columnar_format(path):
+    """
+    根据扩展名判断列式格式
+
+    Returns:
+        str: 'arrow'、'parquet'，不是列式文件时返回None
+    """
+    lower = path.lower()
+    if lower.endswith(ARROW_EXTENSIONS):
+        return 'arrow'
+    if lower.endswith(PARQUET_EXTENSIONS):
+        return 'parquet'
+    return None
+
+
+class ColumnarRowSink:
+    """
+    逐行写入的列式输出，接口与 row_sinks.RowSink 相同
+
+    行先在内存中缓存，每 flush_rows 行转换为一个记录批次写入文件，内存占用不随总行数增长。
+    列式文件的索引在关闭时写入，因此只有关闭后才能读取；也不支持追加到已有文件。
+    """
+
+    def __init__(self, path, columns=None, append=False, flush_rows=DEFAULT_BATCH_ROWS, flush_seconds=None,
+                 compression='zstd'):
+        """
+        Args:
+            path (str): 输出文件路径，.arrow/.feather/.ipc 为Arrow IPC，.parquet/.pq 为Parquet
+            columns (list): 为与 RowSink 接口一致而保留，输出的列固定为 typed_schema()
+            append (bool): 列式文件不支持追加，为True时报错
+            flush_rows (int): 每个记录批次（行组）的行数
+            flush_seconds (float): 为与 RowSink 接口一致而保留
+            compression (str): Parquet的压缩算法；Arrow IPC 不压缩以便内存映射读取
+        """
+        require_pyarrow()
+        if append:
+            raise ValueError(f"列式文件不支持追加写入: {path}")
+        self.path = path
+        self.format = columnar_format(path) or 'arrow'
+        self.flush_rows = max(1, flush_rows)
+        self.schema = typed_schema()
+        self.buffer = []
+        self.rows = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if self.format == 'parquet':
+            self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, row):
+        """写入一行数据，缓存满一个批次时写入文件"""
+        self.buffer.append(row)
+        self.rows += 1
+        if len(self.buffer) >= self.flush_rows:
+            self.flush()
+
+    def write_all(self, rows):
+        """写入多行数据，返回写入的行数"""
+        count = 0
+        for row in rows:
+            self.write(row)
+            count += 1
+        return count
+
+    def flush(self):
+        """把缓存的行作为一个记录批次写入文件"""
+        if not self.buffer:
+            return
+        self.writer.write_batch(typed_batch(self.buffer))
+        self.buffer = []
+
+    def close(self):
+        if self.writer is not None:
+            self.flush()
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_rows(rows, path, year=None, month=None, **options):
+    """
+    把抓取结果导出为带类型的列式文件
+
+    Args:
+        rows (iterable): 抓取结果，如 scrape_monthly_data 的返回值
+        path (str): 输出文件路径（.arrow 或 .parquet）
+        year (int): 行中没有年份时使用的榜单年份
+        month (int): 行中没有月份时使用的榜单月份
+
+    Returns:
+        int: 导出的行数
+    """
+    with ColumnarRowSink(path, **options) as sink:
+        sink.write_all({'年份': year, '月份': month, **row} for row in rows)
+    return sink.rows
+
+
+def csv_year_month(csv_path):
+    """从单月CSV文件名（boxoffice_YYYY_MM.csv）中取出年月，其他文件返回 (None, None)"""
+    match = MONTHLY_CSV_PATTERN.search(os.path.basename(csv_path))
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def export_csv_files(csv_paths, path, **options):
+    """
+    把已保存的CSV（单月CSV或带年份月份列的范围合并CSV）转换为列式文件
+
+    每个CSV分块读取后逐批写入，内存占用不随文件数增长。
+
+    Returns:
+        int: 导出的行数
+    """
+    with ColumnarRowSink(path, **options) as sink:
+        for csv_path in csv_paths:
+            year, month = csv_year_month(csv_path)
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                                     chunksize=sink.flush_rows):
+                sink.write_all({'年份': year, '月份': month, **row} for row in chunk.to_dict('records'))
+    return sink.rows
+
+
+def read_columnar(path, columns=None):
+    """
+    读取列式文件
+
+    Arrow IPC 文件通过内存映射读取，返回的列直接引用映射的文件内容而不复制；
+    Parquet 文件只解码需要的列。
+
+    Args:
+        path (str): .arrow 或 .parquet 文件
+        columns (list): 只读取这些列，None表示全部
+
+    Returns:
+        pyarrow.Table: 带类型的数据表
+    """
+    require_pyarrow()
+    if columnar_format(path) == 'parquet':
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+
+def main():
+    """命令行：把CSV转换为列式文件"""
+    parser = argparse.ArgumentParser(description="把票房CSV转换为带类型的 Parquet / Arrow 文件")
+    parser.add_argument('csv_files', nargs='+', help="单月CSV（boxoffice_YYYY_MM.csv）或范围合并CSV")
+    parser.add_argument('-o', '--output', required=True, help="输出文件，.arrow 或 .parquet")
+    args = parser.parse_args()
+
+    if columnar_format(args.output) is None:
+        print(f"❌ 无法识别的输出格式: {args.output}（应为 .arrow 或 .parquet）")
+        return
+    try:
+        count = export_csv_files(args.csv_files, args.output)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ 导出失败: {e}")
+        return
+    print(f"✅ 已导出 {count} 行到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
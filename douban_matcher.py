@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+豆瓣静态映射表的索引匹配器
+
+内存中的映射表字典建立以下索引（数据文件版见 douban_store.py，接口相同）：
+- 规范化片名 -> 条目 的哈希索引，用于精确匹配
+- 字符三元组 -> 条目集合 的倒排索引，模糊匹配时只用查询中最少见的三元组生成候选（总长度有上限）
+- 每个片名的版本按年份排序，用二分查找选出年份最接近的版本
+
+模糊匹配只对前若干个候选计算得分：字符三元组相似度减去年份差距惩罚，
+续集编号不同的片名（如 "The Accountant 2" 与 "The Accountant"）直接排除；
+查询比候选多出有意义的单词（如副标题）且年份对不上时也排除，
+避免 "Mufasa: The Lion King" 匹配到 "The Lion King" 这类同系列的其他作品。
+"""
+
+import bisect
+import heapq
+import re
+from collections import defaultdict
+from operator import itemgetter
+
+
+# 生成候选时最多使用的三元组个数和倒排列表总长度，以及进入打分的候选个数
+CANDIDATE_GRAMS = 12
+POSTINGS_BUDGET = 5000
+CANDIDATE_LIMIT = 50
+# 模糊匹配的最低得分
+FUZZY_MIN_SCORE = 0.6
+# 年份差距惩罚：相差 YEAR_PENALTY_SPAN 年及以上时扣 YEAR_PENALTY 分
+YEAR_PENALTY = 0.4
+YEAR_PENALTY_SPAN = 10
+# 查询多出副标题等单词时，最接近的版本与目标年份最多相差的年数：
+# 映射表中同系列的作品作为同一片名的不同年份版本（"Mad Max" 的2015年版本即 "Mad Max: Fury Road"），
+# 年份对得上时才是这一部，否则是同系列的另一部
+EXTRA_WORDS_YEAR_SPAN = 2
+# 不算作有意义单词的虚词
+STOP_WORDS = {'a', 'an', 'the', 'of', 'and', 'in', 'on', 'to', 'x', 'vs'}
+
+ROMAN_NUMERALS = {'ii': 2, 'iii': 3, 'iv': 4, 'v': 5, 'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9}
+NUMBER_WORDS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10}
+PART_WORDS = {'part', 'chapter', 'vol', 'volume'}
+
+
+def normalize_title(title):
+    """规范化片名：小写、去掉标点符号、合并空白（'Lilo & Stitch' 与 'Lilo Stitch' 视为相同）"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', title.lower()).split())
+
+
+def title_grams(normalized):
+    """
+    规范化片名的字符三元组集合，首尾补空格以保留单词边界（'up' 不会命中 'superman'）
+    """
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def sequel_number(normalized):
+    """
+    识别片名中的续集编号：结尾的数字或罗马数字，或 Part/Chapter 之后的编号
+
+    Returns:
+        int: 续集编号，没有编号时返回1
+    """
+    tokens = normalized.split()
+    for index, token in enumerate(tokens[:-1]):
+        if token in PART_WORDS:
+            number = tokens[index + 1]
+            if number.isdigit():
+                return int(number)
+            if number in ROMAN_NUMERALS or number in NUMBER_WORDS:
+                return ROMAN_NUMERALS.get(number) or NUMBER_WORDS[number]
+    if len(tokens) > 1:
+        last = tokens[-1]
+        # 三位及以上的数字通常是片名的一部分或年份（如 Blade Runner 2049），不当作续集编号
+        if last.isdigit() and int(last) < 100:
+            return int(last)
+        if last in ROMAN_NUMERALS:
+            return ROMAN_NUMERALS[last]
+    return 1
+
+
+def pick_candidate_grams(gram_counts):
+    """
+    从最少见的三元组开始挑选用于生成候选的三元组，倒排列表总长度不超过 POSTINGS_BUDGET，
+    使候选生成的开销与映射表大小无关；全是常见三元组的笼统查询不做模糊匹配
+
+    Args:
+        gram_counts (iterable): (三元组, 出现的片名数)
+
+    Returns:
+        list: 选中的三元组
+    """
+    picked = []
+    total = 0
+    for gram, count in sorted(gram_counts, key=lambda item: (item[1], item[0])):
+        if len(picked) >= CANDIDATE_GRAMS or total + count > POSTINGS_BUDGET:
+            break
+        picked.append(gram)
+        total += count
+    return picked
+
+
+def extra_words(query_normalized, candidate_normalized):
+    """
+    查询片名中有、候选片名中没有的有意义单词（不含虚词）
+
+    Returns:
+        set: 多出的单词，如 'mufasa the lion king' 相对 'the lion king' 为 {'mufasa'}
+    """
+    return set(query_normalized.split()) - set(candidate_normalized.split()) - STOP_WORDS
+
+
+def title_similarity(query_grams, candidate_grams):
+    """
+    片名相似度：Dice 系数与重叠系数的平均值
+
+    重叠系数让带副标题的片名（'Furiosa: A Mad Max Saga'）仍能接近原片名，
+    同系列不同作品之间的歧义再由年份差距区分（见 rank_entries）。
+    """
+    shared = len(query_grams & candidate_grams)
+    if not shared:
+        return 0.0
+    dice = 2 * shared / (len(query_grams) + len(candidate_grams))
+    overlap = shared / min(len(query_grams), len(candidate_grams))
+    return (dice + overlap) / 2
+
+
+class TitleEntry:
+    """映射表中的一个片名及其按年份排序的各个版本"""
+
+    __slots__ = ('key', 'order', 'normalized', 'versions', 'years')
+
+    def __init__(self, key, order, normalized):
+        self.key = key
+        self.order = order
+        self.normalized = normalized
+        self.versions = []
+        self.years = []
+
+    def add_version(self, chinese_title, rating, year):
+        """按年份插入一个版本，同一年份保留先出现的版本在前；重复的版本忽略"""
+        if (chinese_title, rating, year) in self.versions:
+            return
+        index = bisect.bisect_right(self.years, year)
+        self.years.insert(index, year)
+        self.versions.insert(index, (chinese_title, rating, year))
+
+    def nearest_version(self, target_year):
+        """
+        二分查找年份最接近目标年份的版本，距离相同时选择较早的版本
+
+        Returns:
+            tuple: (中文片名, 评分, 年份)
+        """
+        index = bisect.bisect_left(self.years, target_year)
+        if index == 0:
+            return self.versions[0]
+        if index == len(self.years):
+            return self.versions[-1]
+        before, after = self.versions[index - 1], self.versions[index]
+        if after[2] - target_year < target_year - before[2]:
+            return after
+        return before
+
+
+def rank_entries(title, entries, target_year=None, limit=5):
+    """
+    对候选条目打分并排序
+
+    Args:
+        title (str): 查询片名
+        entries (iterable): 候选 TitleEntry
+        target_year (int): 目标年份，为空时不计年份惩罚
+        limit (int): 最多返回的结果数
+
+    Returns:
+        list: [(得分, 条目, 选中的版本), ...]，按得分从高到低排列，只包含不低于 FUZZY_MIN_SCORE 的结果
+    """
+    normalized = normalize_title(title)
+    query_grams = title_grams(normalized)
+    query_sequel = sequel_number(normalized)
+
+    scored = []
+    for entry in entries:
+        if sequel_number(entry.normalized) != query_sequel:
+            continue
+        score = title_similarity(query_grams, title_grams(entry.normalized))
+        if target_year:
+            version = entry.nearest_version(target_year)
+            year_diff = abs(version[2] - target_year)
+            if year_diff > EXTRA_WORDS_YEAR_SPAN and extra_words(normalized, entry.normalized):
+                continue
+            score -= YEAR_PENALTY * min(year_diff, YEAR_PENALTY_SPAN) / YEAR_PENALTY_SPAN
+        else:
+            version = entry.versions[0]
+        if score >= FUZZY_MIN_SCORE:
+            scored.append((score, entry, version))
+
+    scored.sort(key=lambda item: (-item[0], item[1].order))
+    return scored[:limit]
+
+
+class DoubanTitleMatcher:
+    """基于哈希索引和字符三元组倒排索引的片名匹配器"""
+
+    def __init__(self, movie_mapping):
+        """
+        Args:
+            movie_mapping (dict): 电影名称 -> [(中文名, 评分, 年份), ...]
+        """
+        self.entries = {}
+        self.gram_index = defaultdict(set)
+
+        for key, versions in movie_mapping.items():
+            normalized = normalize_title(key)
+            if not normalized:
+                continue
+            entry = self.entries.get(normalized)
+            if entry is None:
+                entry = TitleEntry(key, len(self.entries), normalized)
+                self.entries[normalized] = entry
+                for gram in title_grams(normalized):
+                    self.gram_index[gram].add(entry)
+            for chinese_title, rating, year in versions:
+                entry.add_version(chinese_title, rating, year)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def exact(self, title):
+        """
+        精确匹配（忽略大小写和标点）
+
+        Returns:
+            TitleEntry: 匹配的条目，未找到时返回None
+        """
+        return self.entries.get(normalize_title(title))
+
+    def search(self, title, target_year=None, limit=5):
+        """
+        模糊匹配：用查询中最少见的字符三元组生成候选，只对命中最多的候选打分
+
+        Returns:
+            list: [(得分, 条目, 选中的版本), ...]，见 rank_entries
+        """
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+
+        gram_counts = [(gram, len(self.gram_index[gram])) for gram in title_grams(normalized) if gram in self.gram_index]
+        hit_counts = defaultdict(int)
+        for gram in pick_candidate_grams(gram_counts):
+            for entry in self.gram_index[gram]:
+                hit_counts[entry] += 1
+
+        candidates = heapq.nlargest(CANDIDATE_LIMIT, hit_counts.items(), key=itemgetter(1))
+        return rank_entries(title, (entry for entry, _ in candidates), target_year, limit)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+豆瓣映射表的外部数据文件（SQLite）
+
+映射表不再以字典字面量写在代码里，而是保存在 data/douban_mapping.sqlite3：
+- 首次静态查找时才打开数据库，只读并启用内存映射，按需查询，不把整个映射表读入内存
+- PRAGMA user_version 记录数据格式版本，版本不符时拒绝读取
+- 命令行工具可批量导入/合并 (英文片名, 中文片名, 评分, 年份) 行，并导出为CSV
+
+用法:
+    python douban_store.py import new_movies.csv [--store data/douban_mapping.sqlite3]
+    python douban_store.py export mapping.csv
+    python douban_store.py stats
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+
+from douban_matcher import CANDIDATE_LIMIT, TitleEntry, normalize_title, pick_candidate_grams, rank_entries, title_grams
+
+
+DEFAULT_MAPPING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'douban_mapping.sqlite3')
+SCHEMA_VERSION = 2
+MMAP_SIZE = 64 * 1024 * 1024
+
+# CSV列名 -> 行字段，同时接受中文和英文表头
+CSV_COLUMNS = {
+    '英文片名': 'english_title', 'english_title': 'english_title',
+    '中文片名': 'chinese_title', 'chinese_title': 'chinese_title',
+    '豆瓣评分': 'rating', 'rating': 'rating',
+    '年份': 'year', 'year': 'year',
+}
+EXPORT_HEADER = ['英文片名', '中文片名', '豆瓣评分', '年份']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    normalized TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    entry_id INTEGER NOT NULL REFERENCES entries (id),
+    chinese_title TEXT NOT NULL,
+    rating TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    UNIQUE (entry_id, year, chinese_title)
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, entry_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gram_counts (
+    gram TEXT PRIMARY KEY,
+    total INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class DoubanMappingStore:
+    """基于SQLite的豆瓣映射表，提供与 DoubanTitleMatcher 相同的 exact/search 接口"""
+
+    def __init__(self, path=DEFAULT_MAPPING_PATH, writable=False):
+        """
+        Args:
+            path (str): 数据文件路径
+            writable (bool): 是否以读写方式打开（导入数据时使用，文件不存在时创建）
+        """
+        self.path = path
+        self.writable = writable
+        self.conn = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """按需打开数据库；fork 出的子进程会重新打开自己的连接"""
+        if self.conn is not None and self.pid == os.getpid():
+            return self.conn
+
+        if self.writable:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                conn.executescript(SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+                version = SCHEMA_VERSION
+        else:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"豆瓣映射数据文件不存在: {self.path}")
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if version != SCHEMA_VERSION:
+            conn.close()
+            raise ValueError(f"豆瓣映射数据文件版本不符: {version}（需要 {SCHEMA_VERSION}）")
+
+        self.conn = conn
+        self.pid = os.getpid()
+        return conn
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.connect().execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self.query("SELECT COUNT(*) FROM entries")[0][0]
+
+    def load_entries(self, rows):
+        """
+        把 (id, 规范化片名, 原片名) 行组装成带版本列表的 TitleEntry
+
+        Returns:
+            dict: 规范化片名 -> TitleEntry
+        """
+        entries = {row[1]: TitleEntry(row[2], row[0], row[1]) for row in rows}
+        if not entries:
+            return entries
+
+        by_id = {entry.order: entry for entry in entries.values()}
+        placeholders = ','.join('?' * len(by_id))
+        versions = self.query(
+            f"SELECT entry_id, chinese_title, rating, year FROM versions "
+            f"WHERE entry_id IN ({placeholders}) ORDER BY entry_id, year, rowid",
+            list(by_id),
+        )
+        for entry_id, chinese_title, rating, year in versions:
+            by_id[entry_id].add_version(chinese_title, rating, year)
+        return entries
+
+    def exact(self, title):
+        """
+        精确匹配（忽略大小写和标点）
+
+        Returns:
+            TitleEntry: 匹配的条目，未找到时返回None
+        """
+        rows = self.query("SELECT id, normalized, title FROM entries WHERE normalized = ?", (normalize_title(title),))
+        return next(iter(self.load_entries(rows).values()), None)
+
+    def search(self, title, target_year=None, limit=5):
+        """
+        模糊匹配：用查询中最少见的字符三元组生成候选，只对命中最多的候选打分
+
+        Returns:
+            list: [(得分, 条目, 选中的版本), ...]，见 douban_matcher.rank_entries
+        """
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+
+        grams = sorted(title_grams(normalized))
+        placeholders = ','.join('?' * len(grams))
+        rarest = pick_candidate_grams(self.query(f"SELECT gram, total FROM gram_counts WHERE gram IN ({placeholders})", grams))
+        if not rarest:
+            return []
+
+        placeholders = ','.join('?' * len(rarest))
+        rows = self.query(
+            f"SELECT e.id, e.normalized, e.title FROM entries e JOIN ("
+            f"SELECT entry_id, COUNT(*) AS hits FROM grams WHERE gram IN ({placeholders}) "
+            f"GROUP BY entry_id ORDER BY hits DESC, entry_id LIMIT ?"
+            f") c ON c.entry_id = e.id",
+            rarest + [CANDIDATE_LIMIT],
+        )
+        return rank_entries(title, self.load_entries(rows).values(), target_year, limit)
+
+    def to_mapping(self):
+        """
+        导出为字典格式：电影名称 -> [(中文名, 评分, 年份), ...]
+        """
+        rows = self.query(
+            "SELECT e.title, v.chinese_title, v.rating, v.year FROM entries e "
+            "JOIN versions v ON v.entry_id = e.id ORDER BY e.id, v.year, v.rowid"
+        )
+        mapping = {}
+        for title, chinese_title, rating, year in rows:
+            mapping.setdefault(title, []).append((chinese_title, rating, year))
+        return mapping
+
+    def merge_rows(self, rows):
+        """
+        批量导入/合并映射行：新片名追加到末尾；同一片名、年份和中文名的版本更新评分
+
+        Args:
+            rows (iterable): (英文片名, 中文片名, 评分, 年份) 行
+
+        Returns:
+            tuple: (新增片名数, 新增或更新的版本数)
+        """
+        added_entries = 0
+        changed_versions = 0
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                for english_title, chinese_title, rating, year in rows:
+                    normalized = normalize_title(english_title)
+                    if not normalized:
+                        continue
+                    row = conn.execute("SELECT id FROM entries WHERE normalized = ?", (normalized,)).fetchone()
+                    if row:
+                        entry_id = row[0]
+                    else:
+                        entry_id = conn.execute(
+                            "INSERT INTO entries (normalized, title) VALUES (?, ?)",
+                            (normalized, english_title.strip()),
+                        ).lastrowid
+                        conn.executemany(
+                            "INSERT INTO grams (gram, entry_id) VALUES (?, ?)",
+                            [(gram, entry_id) for gram in title_grams(normalized)],
+                        )
+                        added_entries += 1
+                    cursor = conn.execute(
+                        "INSERT INTO versions (entry_id, chinese_title, rating, year) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (entry_id, year, chinese_title) DO UPDATE SET rating = excluded.rating "
+                        "WHERE rating != excluded.rating",
+                        (entry_id, chinese_title.strip(), str(rating).strip(), int(year)),
+                    )
+                    changed_versions += cursor.rowcount
+                self.update_gram_counts(conn)
+        return added_entries, changed_versions
+
+    def update_gram_counts(self, conn):
+        """重新统计每个三元组出现的片名数，查询时据此挑选最少见的三元组"""
+        conn.execute("DELETE FROM gram_counts")
+        conn.execute("INSERT INTO gram_counts SELECT gram, COUNT(*) FROM grams GROUP BY gram")
+
+    def stats(self):
+        """
+        Returns:
+            dict: 片名数、版本数和数据格式版本
+        """
+        return {
+            'entries': len(self),
+            'versions': self.query("SELECT COUNT(*) FROM versions")[0][0],
+            'schema_version': self.query("PRAGMA user_version")[0][0],
+        }
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None and self.pid == os.getpid():
+                self.conn.close()
+            self.conn = None
+
+
+def read_mapping_csv(path):
+    """
+    读取待导入的CSV（表头：英文片名,中文片名,豆瓣评分,年份）
+
+    Returns:
+        list: (英文片名, 中文片名, 评分, 年份) 行
+    """
+    rows = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for record in csv.DictReader(f):
+            fields = {CSV_COLUMNS[name.strip()]: value for name, value in record.items() if name and name.strip() in CSV_COLUMNS}
+            missing = {'english_title', 'chinese_title', 'rating', 'year'} - set(fields)
+            if missing:
+                raise ValueError(f"CSV缺少列: {', '.join(sorted(missing))}")
+            rows.append((fields['english_title'], fields['chinese_title'], fields['rating'], int(fields['year'])))
+    return rows
+
+
+def write_mapping_csv(mapping, path):
+    """把映射表字典导出为CSV"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_HEADER)
+        for english_title, versions in mapping.items():
+            for chinese_title, rating, year in versions:
+                writer.writerow([english_title, chinese_title, rating, year])
+
+
+# 每个数据文件在进程内只打开一次
+STORE_CACHE = {}
+STORE_LOCK = threading.Lock()
+
+
+def get_mapping_store(path=DEFAULT_MAPPING_PATH):
+    """获取进程内共享的只读映射表（此时尚未打开数据库，首次查询时才打开）"""
+    with STORE_LOCK:
+        store = STORE_CACHE.get(path)
+        if store is None:
+            store = DoubanMappingStore(path)
+            STORE_CACHE[path] = store
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="管理豆瓣映射数据文件")
+    parser.add_argument('--store', default=DEFAULT_MAPPING_PATH, help="映射数据文件路径")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="从CSV批量导入/合并映射行")
+    import_parser.add_argument('csv_files', nargs='+', help="表头为 英文片名,中文片名,豆瓣评分,年份 的CSV文件")
+    export_parser = commands.add_parser('export', help="导出映射表为CSV")
+    export_parser.add_argument('csv_file', help="输出CSV文件")
+    commands.add_parser('stats', help="显示映射表统计")
+    args = parser.parse_args()
+
+    store = DoubanMappingStore(args.store, writable=args.command == 'import')
+    try:
+        if args.command == 'import':
+            for csv_file in args.csv_files:
+                rows = read_mapping_csv(csv_file)
+                added_entries, changed_versions = store.merge_rows(rows)
+                print(f"✅ {csv_file}: 读取 {len(rows)} 行，新增 {added_entries} 个片名，新增/更新 {changed_versions} 个版本")
+        elif args.command == 'export':
+            mapping = store.to_mapping()
+            write_mapping_csv(mapping, args.csv_file)
+            print(f"✅ 已导出 {len(mapping)} 个片名到 {args.csv_file}")
+        stats = store.stats()
+        print(f"📊 映射表: {stats['entries']} 个片名，{stats['versions']} 个版本（数据格式版本 {stats['schema_version']}）")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+直接从响应字节提取数据，不构建soup
+
+详情页评分 —— IMDb和豆瓣的电影详情页在 <head> 中嵌入了 schema.org 的结构化数据：
+
+    <script type="application/ld+json">{"@type": "Movie", "name": "...",
+        "aggregateRating": {"ratingValue": 7.8, ...}, ...}</script>
+
+在字节中定位这段脚本并只解码它，比构建整页（或局部）soup 再逐个尝试CSS选择器快得多。
+页面中没有结构化数据或数据不完整时返回None，由调用方回退到CSS选择器。
+
+月度榜单表格 —— 直接用 lxml 解析 BoxOfficeMojo 月度榜单页面，按XPath取出票房表格的各列，
+返回带类型的行（排名、片名、影片链接、累计票房整数、首映日期）。回补历史数据时要重新解析
+成百上千个月的页面，这一步是主要的CPU开销。
+"""
+
+import html
+import json
+import re
+import urllib.parse
+
+from lxml import etree
+
+from columnar_export import parse_gross, parse_int, parse_release_date
+from scrape_log import get_logger
+
+
+log = get_logger('extract')
+
+
+JSONLD_MARKER = b'application/ld+json'
+SCRIPT_END = b'</script>'
+
+# JSON不合法时（如描述中有未转义的引号）直接在脚本文本中查找评分
+RATING_VALUE_PATTERN = re.compile(r'"ratingValue"\s*:\s*"?(\d+(?:\.\d+)?)')
+
+
+def iter_jsonld_scripts(content):
+    """
+    逐个产出页面中 application/ld+json 脚本的文本
+
+    Args:
+        content (bytes): 页面原始字节（str 按UTF-8编码）
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    position = content.find(JSONLD_MARKER)
+    while position != -1:
+        start = content.find(b'>', position)
+        if start == -1:
+            return
+        end = content.find(SCRIPT_END, start)
+        if end == -1:
+            return
+        yield content[start + 1:end].decode('utf-8', errors='replace')
+        position = content.find(JSONLD_MARKER, end)
+
+
+def iter_jsonld_objects(data):
+    """展开顶层列表和 @graph，产出每个对象"""
+    if isinstance(data, list):
+        for item in data:
+            yield from iter_jsonld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from iter_jsonld_objects(data.get('@graph'))
+
+
+def normalize_rating(value):
+    """评分统一为一位小数的字符串（7.8 / "7.8" / 8 -> "7.8" / "8.0"），无效评分返回None"""
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not 0 < rating <= 10:
+        return None
+    return f"{rating:.1f}"
+
+
+def extract_jsonld_movie(content):
+    """
+    从页面的结构化数据中提取片名和评分
+
+    Args:
+        content (bytes): 电影详情页的原始字节
+
+    Returns:
+        tuple: (片名, 评分字符串)，找不到的项为None
+    """
+    for script in iter_jsonld_scripts(content):
+        try:
+            data = json.loads(script, strict=False)
+        except ValueError:
+            match = RATING_VALUE_PATTERN.search(script)
+            if match:
+                return None, normalize_rating(match.group(1))
+            continue
+        for item in iter_jsonld_objects(data):
+            aggregate = item.get('aggregateRating')
+            if not isinstance(aggregate, dict):
+                continue
+            name = item.get('name')
+            name = html.unescape(name).strip() if isinstance(name, str) else None
+            return name or None, normalize_rating(aggregate.get('ratingValue'))
+    return None, None
+
+
+def extract_jsonld_rating(content):
+    """
+    从页面的结构化数据中提取评分
+
+    Returns:
+        str: 评分，如 "7.8"；没有结构化数据或没有有效评分时返回None
+    """
+    return extract_jsonld_movie(content)[1]
+
+
+BOM_ROOT = "https://www.boxofficemojo.com"
+
+
+def class_xpath(class_name):
+    """按单词匹配class属性中类名的XPath"""
+    return etree.XPath(f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+
+# 票房表格：依次尝试两种类名，最后取页面中的第一个表格
+MONTH_TABLE_XPATHS = [class_xpath('a-bordered'), class_xpath('mojo-body-table'), etree.XPath('//table')]
+
+# 数据行：有 td 的行（表头行只有 th），兼容有无 tbody
+MONTH_ROWS_XPATH = etree.XPath('./tr[td] | ./tbody/tr[td]')
+
+# 月度榜单各列的位置
+RANK_COLUMN = 0
+RELEASE_COLUMN = 1
+TOTAL_GROSS_COLUMN = 7
+RELEASE_DATE_COLUMN = 8
+
+
+def cell_text(cell):
+    """单元格文本，与 get_text(strip=True) 一致：各段文本去掉首尾空白后拼接"""
+    return ''.join(text.strip() for text in cell.itertext())
+
+
+def find_month_table(content):
+    """
+    解析页面并找到票房表格
+
+    Args:
+        content (bytes): 月度榜单页面的原始字节
+
+    Returns:
+        lxml元素：票房表格，未找到时返回None
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    root = etree.HTML(content) if content else None
+    if root is None:
+        return None
+    for xpath in MONTH_TABLE_XPATHS:
+        tables = xpath(root)
+        if tables:
+            return tables[0]
+    return None
+
+
+def iter_month_table_cells(content, limit=None, logger=log):
+    """
+    逐行产出票房表格的原始文本
+
+    Args:
+        content (bytes): 月度榜单页面的原始字节
+        limit (int): 只取前几行，None表示整张表格
+        logger (logging.Logger): 输出调试信息的日志器，抓取器传入自己的日志器
+
+    Returns:
+        iterator: (排名, 片名, 影片链接href或None, 累计票房文本, 首映日期文本或"N/A")；
+                  页面中没有表格时不产出任何行
+    """
+    table = find_month_table(content)
+    if table is None:
+        return
+    logger.debug("找到表格，类名: %s", table.get('class', 'no-class'))
+    rows = MONTH_ROWS_XPATH(table)
+    if limit is not None:
+        rows = rows[:limit]
+    for i, row in enumerate(rows):
+        cells = row.findall('td')
+        logger.debug("第%s行包含 %s 个单元格", i + 1, len(cells))
+        if len(cells) <= TOTAL_GROSS_COLUMN:
+            continue
+        release_cell = cells[RELEASE_COLUMN]
+        link = release_cell.find('.//a')
+        title = cell_text(link if link is not None else release_cell)
+        href = link.get('href') if link is not None else None
+        release_date = cell_text(cells[RELEASE_DATE_COLUMN]) if len(cells) > RELEASE_DATE_COLUMN else "N/A"
+        yield cell_text(cells[RANK_COLUMN]), title, href, cell_text(cells[TOTAL_GROSS_COLUMN]), release_date
+
+
+def release_url(href, base_url=BOM_ROOT):
+    """影片链接转为不带跟踪参数的绝对地址，如 https://www.boxofficemojo.com/release/rl6820221993/"""
+    if not href:
+        return None
+    return urllib.parse.urljoin(base_url, href.split('?', 1)[0])
+
+
+def extract_month_table(content, year=None, month=None, limit=None):
+    """
+    提取月度榜单表格的带类型行
+
+    Args:
+        content (bytes): 月度榜单页面的原始字节
+        year (int): 榜单年份，用于推断首映日期的年份
+        month (int): 榜单月份（1月榜单中12月上映的电影属于上一年）
+        limit (int): 只取前几行，None表示整张表格
+
+    Returns:
+        list: 每行一个字典：排名(int)、英文片名(str)、链接(str)、累计票房(int，美元)、
+              首映日期(date，没有年份信息时为None)
+    """
+    return [
+        {
+            '排名': parse_int(rank),
+            '英文片名': title,
+            '链接': release_url(href),
+            '累计票房': parse_gross(gross),
+            '首映日期': parse_release_date(release_date, year, month),
+        }
+        for rank, title, href, gross, release_date in iter_month_table_cells(content, limit)
+    ]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试用的固定内容本地站点
+
+模拟 BoxOfficeMojo 月度榜单和 IMDb 搜索页、详情页，豆瓣搜索返回403（验证回退到静态映射）。
+与 standin_server.py 的替身服务器不同，这里只有三部电影、页面内容固定，
+并按片名统计IMDb搜索次数（server.requests），便于精确断言续抓、复用时发出了哪些请求。
+抓取器由 standin_server.make_scraper / make_async_scraper 创建。
+"""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# (英文片名, IMDb编号, IMDb评分, 首映日期, 累计票房)
+MOVIES = [
+    ('Sinners', '31193180', '7.8', 'Apr 18', '$273,381,913'),
+    ('A Minecraft Movie', '3566834', '5.7', 'Apr 4', '$423,653,012'),
+    ('Warfare', '31434639', '7.3', 'Apr 11', '$21,471,359'),
+]
+
+MONTH_PAGE = "<html><body><table class=\"a-bordered\"><tbody><tr><th>Rank</th></tr>" + "".join(
+    f"<tr><td>{i}</td><td><a href=\"/release/rl{i}/\">{title}</a></td><td></td><td></td><td></td><td></td><td></td>"
+    f"<td>{gross}</td><td>{release_date}</td></tr>"
+    for i, (title, _, _, release_date, gross) in enumerate(MOVIES, 1)
+) + "</tbody></table></body></html>"
+
+SEARCH_PAGE = """<html><body><ul>
+<li class="ipc-metadata-list-summary-item"><a href="/title/tt{tt}/">{title}</a><span>2025</span></li>
+</ul></body></html>"""
+
+TITLE_PAGE = """<html><body>
+<span data-testid="hero-rating-bar__aggregate-rating__score"><span>{rating}</span>/10</span>
+</body></html>"""
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """固定站点的请求处理，每个请求先等待 server.delay 秒"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        status = 200
+        if self.path.startswith('/month/'):
+            body = MONTH_PAGE
+        elif self.path.startswith('/find'):
+            title, tt = next((m[0], m[1]) for m in MOVIES if m[0].replace(' ', '%20') in self.path)
+            self.server.requests[title] += 1
+            body = SEARCH_PAGE.format(tt=tt, title=title)
+        elif self.path.startswith('/title/tt'):
+            body = TITLE_PAGE.format(rating=next(m[2] for m in MOVIES if m[1] in self.path))
+        else:
+            status, body = 403, "forbidden"
+
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite(ThreadingHTTPServer):
+    """
+    固定内容的本地站点
+
+    requests 按片名统计本服务器收到的IMDb搜索次数，每个服务器各自计数；
+    base_urls() 与 StandinServer 相同，可直接传给 standin_server.make_scraper / make_async_scraper。
+    """
+
+    def __init__(self, delay=0.0):
+        super().__init__(('127.0.0.1', 0), FixtureHandler)
+        self.delay = delay
+        self.requests = Counter()
+
+    @property
+    def root(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self):
+        """传给 BoxOfficeScraper(base_urls=...) 的站点地址"""
+        return {
+            'boxoffice': self.root + "/month/{month}/{year}/",
+            'imdb': self.root,
+            'douban': self.root,
+        }
+
+
+def start_fixture_site(delay=0.0):
+    """
+    在后台线程启动固定站点
+
+    Args:
+        delay (float): 每个请求的响应延时（秒）
+
+    Returns:
+        FixtureSite: 已启动的服务器，用完后调用 server.shutdown() 和 server.server_close()
+    """
+    server = FixtureSite(delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
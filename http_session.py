@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按主机复用的HTTP会话池
+
+每个主机一个 requests.Session，挂载带连接池和重试策略的适配器，
+同一主机的后续请求复用已建立的 keep-alive 连接，避免重复的 TCP+TLS 握手。
+"""
+
+import threading
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SessionPool:
+    """按主机划分的 requests.Session 集合"""
+
+    def __init__(self, headers=None, pool_connections=4, pool_maxsize=16,
+                 max_retries=2, backoff_factor=0.5):
+        """
+        Args:
+            headers (dict): 所有会话共享的默认请求头
+            pool_connections (int): 每个会话缓存的连接池数量
+            pool_maxsize (int): 每个连接池保持的最大连接数，并发抓取时应不小于线程数
+            max_retries (int): 连接错误和5xx响应的最大重试次数
+            backoff_factor (float): 重试退避系数
+        """
+        self.headers = dict(headers or {})
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def create_session(self):
+        """创建带连接池和重试适配器的会话"""
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, url):
+        """获取（必要时创建）URL所属主机的会话"""
+        host = urllib.parse.urlparse(url).netloc
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self.create_session()
+                self.sessions[host] = session
+            return session
+
+    def get(self, url, headers=None, timeout=10, stream=False):
+        """
+        使用所属主机的会话发送GET请求
+
+        Args:
+            url (str): 请求地址
+            headers (dict): 额外请求头，与会话默认请求头合并
+            timeout (int): 超时时间（秒）
+            stream (bool): 是否只读取响应头，正文由调用方读取（或关闭响应放弃读取）
+
+        Returns:
+            requests.Response: 响应对象
+        """
+        return self.get_session(url).get(url, headers=headers, timeout=timeout, stream=stream)
+
+    def connection_stats(self):
+        """
+        统计各主机新建连接和复用连接的次数
+
+        Returns:
+            dict: 主机 -> {'requests': 请求数, 'new': 新建连接数, 'reused': 复用连接数}
+        """
+        stats = {}
+        with self.lock:
+            sessions = list(self.sessions.items())
+
+        for host, session in sessions:
+            adapter = session.get_adapter('https://')
+            pools = adapter.poolmanager.pools
+            total_requests = 0
+            new_connections = 0
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                total_requests += pool.num_requests
+                new_connections += pool.num_connections
+            stats[host] = {
+                'requests': total_requests,
+                'new': new_connections,
+                'reused': max(total_requests - new_connections, 0),
+            }
+        return stats
+
+    def close(self):
+        """关闭所有会话及其连接"""
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
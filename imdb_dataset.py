@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于IMDb数据集的离线评分查询
+
+在线查询一部电影的IMDb评分需要一次搜索页请求和最多五次详情页请求。IMDb提供每日更新的
+数据集（https://datasets.imdbws.com/）：
+
+    title.basics.tsv.gz   tconst, titleType, primaryTitle, originalTitle, isAdult, startYear, ...
+    title.ratings.tsv.gz  tconst, averageRating, numVotes
+
+这里把两个文件导入带索引的SQLite数据库（规范化片名 + 年份 -> tconst -> 评分），
+查询一部电影只需一次索引查找（几十微秒）。BoxOfficeScraper(imdb_dataset=...) 优先从数据集查询，
+数据集中没有的电影才在线搜索。
+
+用法:
+    python imdb_dataset.py ingest --basics title.basics.tsv.gz --ratings title.ratings.tsv.gz
+    python imdb_dataset.py lookup "Sinners" 2025
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+
+
+DEFAULT_IMDB_DATASET_PATH = "data/imdb_dataset.sqlite3"
+
+# 默认只导入电影，剧集、短片等与票房榜单无关
+DEFAULT_TITLE_TYPES = ('movie',)
+
+# 数据集中与目标年份最多相差几年：票房年份与上映年份通常相同，跨年上映或延期时差一年；
+# 差得更多的同名电影多半是另一部，交给在线搜索判断
+DEFAULT_MAX_YEAR_DIFF = 1
+
+# 数据集中的空值
+NULL_VALUE = '\\N'
+
+# 每批写入的行数
+INGEST_BATCH_ROWS = 10000
+
+
+def normalize_title(title):
+    """
+    规范化片名：去掉重音符号、统一大小写、& 视为 and，标点和多余空白合并为单个空格
+
+    如 "Mission: Impossible - The Final Reckoning" -> "mission impossible the final reckoning"
+    """
+    text = unicodedata.normalize('NFKD', title)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = text.replace('&', ' and ')
+    return ' '.join(re.sub(r'[\W_]+', ' ', text).split())
+
+
+def open_dump(path):
+    """打开 .tsv 或 .tsv.gz 数据集文件，返回逐行读取的 csv.reader（跳过表头）"""
+    opener = gzip.open if path.endswith('.gz') else open
+    file = opener(path, 'rt', encoding='utf-8', newline='')
+    # 数据集不使用引号，片名中可能出现单独的双引号
+    reader = csv.reader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
+    next(reader, None)
+    return file, reader
+
+
+def iter_ratings(path):
+    """逐行产出 (tconst, 评分, 票数)"""
+    file, reader = open_dump(path)
+    with file:
+        for row in reader:
+            if len(row) >= 3:
+                yield row[0], float(row[1]), int(row[2])
+
+
+def iter_title_keys(path, title_types=DEFAULT_TITLE_TYPES):
+    """
+    逐行产出 (规范化片名, 年份, tconst)；原名与主片名不同时各产出一条
+
+    Args:
+        path (str): title.basics 文件路径
+        title_types (tuple): 导入的 titleType，None表示全部导入
+    """
+    file, reader = open_dump(path)
+    with file:
+        for row in reader:
+            if len(row) < 6 or (title_types and row[1] not in title_types):
+                continue
+            year = int(row[5]) if row[5] != NULL_VALUE else None
+            keys = {normalize_title(row[2]), normalize_title(row[3])}
+            for key in keys:
+                if key:
+                    yield key, year, row[0]
+
+
+def batched(rows, size=INGEST_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest_dumps(basics_path, ratings_path, db_path=DEFAULT_IMDB_DATASET_PATH, title_types=DEFAULT_TITLE_TYPES):
+    """
+    把 title.basics 和 title.ratings 导入SQLite数据库
+
+    先写入临时文件再替换，导入过程中原有数据库仍可使用。
+
+    Args:
+        basics_path (str): title.basics.tsv(.gz) 路径
+        ratings_path (str): title.ratings.tsv(.gz) 路径
+        db_path (str): 数据库路径
+        title_types (tuple): 导入的 titleType，None表示全部导入
+
+    Returns:
+        dict: {'titles': 片名条数, 'ratings': 评分条数, 'seconds': 用时}
+    """
+    start = time.monotonic()
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    temp_path = db_path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        # 一次性导入，不需要日志和同步
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('CREATE TABLE ratings (tconst TEXT PRIMARY KEY, rating REAL NOT NULL, votes INTEGER NOT NULL) WITHOUT ROWID')
+        conn.execute('CREATE TABLE titles (key TEXT NOT NULL, year INTEGER, tconst TEXT NOT NULL)')
+        for batch in batched(iter_ratings(ratings_path)):
+            conn.executemany('INSERT OR REPLACE INTO ratings VALUES (?, ?, ?)', batch)
+        for batch in batched(iter_title_keys(basics_path, title_types)):
+            conn.executemany('INSERT INTO titles VALUES (?, ?, ?)', batch)
+        # 全部写入后再建索引，比逐行维护索引快得多
+        conn.execute('CREATE INDEX titles_key ON titles (key, year)')
+        counts = {
+            'titles': conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0],
+            'ratings': conn.execute('SELECT COUNT(*) FROM ratings').fetchone()[0],
+        }
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(temp_path, db_path)
+    counts['seconds'] = time.monotonic() - start
+    return counts
+
+
+class ImdbDataset:
+    """已导入的IMDb数据集，线程安全的只读查询"""
+
+    def __init__(self, path=DEFAULT_IMDB_DATASET_PATH, max_year_diff=DEFAULT_MAX_YEAR_DIFF):
+        """
+        Args:
+            path (str): ingest_dumps 生成的数据库路径
+            max_year_diff (int): 与目标年份最多相差几年，超出时视为未找到（抓取器随后在线搜索）；
+                None表示不限，总是选年份最接近的版本。没有目标年份时不起作用
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"IMDb数据集不存在: {path}（请先运行 python imdb_dataset.py ingest）")
+        self.path = path
+        self.max_year_diff = max_year_diff
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+
+    def lookup(self, movie_title, target_year=None):
+        """
+        查找最匹配的电影：年份最接近的优先，年份相同时票数多的优先
+
+        Args:
+            movie_title (str): 电影名称
+            target_year (int): 目标年份
+
+        Returns:
+            tuple: (tconst, 评分字符串如 "7.6")，电影存在但没有评分时评分为None；未找到时返回None
+        """
+        key = normalize_title(movie_title)
+        if not key:
+            return None
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT titles.tconst, titles.year, ratings.rating, ratings.votes FROM titles '
+                'LEFT JOIN ratings ON ratings.tconst = titles.tconst WHERE titles.key = ?', (key,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        def rank(row):
+            tconst, year, rating, votes = row
+            if target_year is None:
+                year_diff = 0
+            else:
+                year_diff = abs(year - target_year) if year is not None else float('inf')
+            return (year_diff, rating is None, -(votes or 0))
+
+        tconst, year, rating, _ = min(rows, key=rank)
+        if target_year is not None and self.max_year_diff is not None:
+            if year is None or abs(year - target_year) > self.max_year_diff:
+                return None
+        return tconst, (f"{rating:.1f}" if rating is not None else None)
+
+    def stats(self):
+        """返回片名和评分的条数"""
+        with self.lock:
+            return {
+                'titles': self.conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0],
+                'ratings': self.conn.execute('SELECT COUNT(*) FROM ratings').fetchone()[0],
+            }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def parse_max_year_diff(text):
+    """解析 --max-year-diff：非负整数，或 any 表示不限"""
+    if text.strip().lower() == 'any':
+        return None
+    value = int(text)
+    if value < 0:
+        raise ValueError(f"年份差距不能为负数: {text}")
+    return value
+
+
+def main():
+    """命令行入口：导入数据集或查询评分"""
+    parser = argparse.ArgumentParser(description="IMDb数据集的导入和离线评分查询")
+    parser.add_argument('--db', default=DEFAULT_IMDB_DATASET_PATH, help="数据库路径")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="导入 title.basics 和 title.ratings 数据集")
+    ingest.add_argument('--basics', required=True, help="title.basics.tsv.gz 路径")
+    ingest.add_argument('--ratings', required=True, help="title.ratings.tsv.gz 路径")
+    ingest.add_argument('--types', default=','.join(DEFAULT_TITLE_TYPES),
+                        help="导入的 titleType，逗号分隔；all 表示全部导入")
+
+    lookup = commands.add_parser('lookup', help="查询一部电影的评分")
+    lookup.add_argument('title', help="电影名称")
+    lookup.add_argument('year', nargs='?', type=int, help="目标年份")
+    lookup.add_argument('--max-year-diff', type=parse_max_year_diff, default=DEFAULT_MAX_YEAR_DIFF,
+                        help=f"与目标年份最多相差几年，any 表示不限（默认 {DEFAULT_MAX_YEAR_DIFF}）")
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        title_types = None if args.types == 'all' else tuple(filter(None, args.types.split(',')))
+        print(f"正在导入 {args.basics} 和 {args.ratings} ...")
+        counts = ingest_dumps(args.basics, args.ratings, args.db, title_types)
+        print(f"✅ 导入完成: {counts['titles']} 条片名, {counts['ratings']} 条评分, 用时 {counts['seconds']:.1f}秒 -> {args.db}")
+        return
+
+    try:
+        dataset = ImdbDataset(args.db, args.max_year_diff)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    result = dataset.lookup(args.title, args.year)
+    dataset.close()
+    if result is None:
+        print("未找到")
+    else:
+        tconst, rating = result
+        print(f"{tconst}  评分: {rating or 'N/A'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内的抓取指标
+
+记录各阶段耗时（直方图）和计数器（请求数、下载字节数、HTTP状态、缓存命中、豆瓣查找路径等），
+抓取结束时可以导出为JSON或 Prometheus 文本格式，查看一个月份的时间都花在了哪里。
+
+    metrics = MetricsRegistry()
+    with metrics.timer('stage_seconds', stage='imdb_search'):
+        ...
+    metrics.inc('http_requests_total', site='imdb.com', status='200')
+    metrics.dump('data/metrics.prom')
+
+多进程抓取时各进程有各自的指标，由主进程通过 snapshot() / merge() 汇总。
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 耗时直方图的上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 导出时的指标名前缀
+METRICS_PREFIX = 'boxoffice_'
+
+
+def label_key(labels):
+    """标签字典 -> 可哈希的有序元组"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(key, extra=()):
+    """Prometheus 标签格式，如 {site="imdb.com",status="200"}"""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """线程安全的计数器和直方图集合"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets (tuple): 直方图的分桶上界（秒），按升序排列
+        """
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """计数器加上 value"""
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """记录一次观测值（秒）"""
+        key = (name, label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """记录 with 代码块的耗时，代码块抛出异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name, **labels):
+        """读取计数器当前值"""
+        with self.lock:
+            return self.counters.get((name, label_key(labels)), 0)
+
+    def histogram_stats(self, name, **labels):
+        """
+        读取直方图的次数和总和
+
+        Returns:
+            tuple: (次数, 总耗时秒数)
+        """
+        with self.lock:
+            histogram = self.histograms.get((name, label_key(labels)))
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def snapshot(self):
+        """
+        当前所有指标的可序列化副本
+
+        Returns:
+            dict: {'counters': [...], 'histograms': [...]}
+        """
+        with self.lock:
+            counters = [{'name': name, 'labels': dict(key), 'value': value}
+                        for (name, key), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(key), 'count': histogram.count, 'sum': histogram.sum,
+                           'buckets': list(self.buckets), 'bucket_counts': list(histogram.counts)}
+                          for (name, key), histogram in sorted(self.histograms.items())]
+        return {'counters': counters, 'histograms': histograms}
+
+    def merge(self, snapshot):
+        """合并另一个进程的 snapshot()（分桶须相同）"""
+        with self.lock:
+            for item in snapshot['counters']:
+                key = (item['name'], label_key(item['labels']))
+                self.counters[key] = self.counters.get(key, 0) + item['value']
+            for item in snapshot['histograms']:
+                key = (item['name'], label_key(item['labels']))
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = Histogram(self.buckets)
+                    self.histograms[key] = histogram
+                histogram.count += item['count']
+                histogram.sum += item['sum']
+                for i, count in enumerate(item['bucket_counts']):
+                    histogram.counts[i] += count
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 文本格式"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+        for item in snapshot['counters']:
+            name = METRICS_PREFIX + item['name']
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{format_labels(label_key(item['labels']))} {item['value']}")
+        for item in snapshot['histograms']:
+            name = METRICS_PREFIX + item['name']
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            key = label_key(item['labels'])
+            cumulative = 0
+            for upper, count in zip(item['buckets'], item['bucket_counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(key, [('le', repr(float(upper)))])} {cumulative}")
+            lines.append(f"{name}_bucket{format_labels(key, [('le', '+Inf')])} {item['count']}")
+            lines.append(f"{name}_sum{format_labels(key)} {item['sum']}")
+            lines.append(f"{name}_count{format_labels(key)} {item['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """
+        写入文件：.prom / .txt 为 Prometheus 文本格式，其他为JSON
+
+        Returns:
+            str: 写入的文件路径
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def print_summary(self):
+        """打印各阶段耗时、请求和豆瓣查找路径的摘要"""
+        snapshot = self.snapshot()
+        stages = [item for item in snapshot['histograms'] if item['name'] == 'stage_seconds']
+        if stages:
+            print(f"\n各阶段耗时:")
+            for item in sorted(stages, key=lambda item: -item['sum']):
+                average = item['sum'] / item['count'] * 1000 if item['count'] else 0
+                print(f"  {item['labels'].get('stage', ''):<16} {item['count']:>6} 次  总计 {item['sum']:>8.2f}秒  平均 {average:>8.1f}ms")
+
+        waits = [item for item in snapshot['histograms'] if item['name'] == 'rate_limit_wait_seconds']
+        if waits:
+            print(f"限速等待: " + ", ".join(f"{item['labels'].get('site', '')} {item['sum']:.2f}秒" for item in waits))
+
+        requests_by_site = {}
+        for item in snapshot['counters']:
+            if item['name'] == 'http_requests_total':
+                labels = item['labels']
+                requests_by_site.setdefault(labels.get('site', ''), []).append(
+                    f"{labels.get('status', '')}/{labels.get('cache', '')} {item['value']}")
+        for site, parts in requests_by_site.items():
+            downloaded = sum(entry['value'] for entry in snapshot['counters']
+                             if entry['name'] == 'http_response_bytes_total' and entry['labels'].get('site') == site)
+            print(f"请求 {site}: {', '.join(parts)}（共下载 {downloaded / 1024:.0f} KB）")
+
+        paths = [f"{item['labels'].get('path', '')} {item['value']}" for item in snapshot['counters']
+                 if item['name'] == 'douban_lookup_total']
+        if paths:
+            print(f"豆瓣查找路径: {', '.join(paths)}")
+
+        extract_paths = [f"{item['labels'].get('site', '')}/{item['labels'].get('path', '')} {item['value']}"
+                         for item in snapshot['counters'] if item['name'] == 'rating_extract_total']
+        if extract_paths:
+            print(f"详情页评分提取: {', '.join(extract_paths)}")
+
+        dataset = [f"{item['labels'].get('result', '')} {item['value']}" for item in snapshot['counters']
+                   if item['name'] == 'imdb_dataset_total']
+        if dataset:
+            print(f"IMDb数据集: {', '.join(dataset)}")
+
+        skipped = [f"{item['labels'].get('source', '')}/{item['labels'].get('reason', '')} {item['value']}"
+                   for item in snapshot['counters'] if item['name'] == 'negative_cache_hits_total']
+        if skipped:
+            print(f"近期查询失败而跳过: {', '.join(skipped)}")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+当月榜单监视
+
+当月的票房每天都在变化，反复调用 scrape_monthly_data 每次都要重新请求榜单并重新查询所有电影的评分。
+MonthWatcher 定时轮询月度榜单页面：
+
+- 带上次响应的 ETag / Last-Modified 发送条件请求，页面未变化时服务器返回304，不下载、不解析
+- 服务器不支持条件请求时比较页面内容的哈希，内容相同同样不解析
+- 页面变化时只为新上榜的电影查询评分，已上榜电影沿用之前的结果
+- 上次有"N/A"的电影（可能只是超时或被拦截）每次轮询都重新查询，确实查不到的由查询失败缓存按原因的有效期跳过
+- 与上次榜单比较，把新上榜、排名、票房或评分变化、跌出榜单的电影写入输出文件（CSV / JSON Lines）
+
+榜单稳定、评分都已查到时每次轮询只有一个条件请求。
+
+用法:
+    python month_watch.py 2025-06 --interval 900 --output data/watch_2025_06.jsonl
+"""
+
+import argparse
+import hashlib
+import time
+from datetime import datetime
+
+import requests
+
+from batch_scraper import DEFAULT_CACHE_PATH, parse_year_month
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from columnar_export import columnar_format, parse_gross
+from negative_cache import DEFAULT_NEGATIVE_CACHE_PATH
+from row_sinks import open_row_sink
+from scrape_log import VERBOSITY_DEBUG, VERBOSITY_NORMAL, VERBOSITY_QUIET, configure_logging, event, get_logger
+
+
+# 默认每15分钟轮询一次
+DEFAULT_WATCH_INTERVAL = 900
+
+# 变化类型
+CHANGE_NEW = '新上榜'
+CHANGE_UPDATED = '更新'
+CHANGE_DROPPED = '跌出榜单'
+
+# 变化输出文件的列
+WATCH_COLUMNS = ['时间', '变化', '排名', '上次排名', '英文片名', '中文片名', '累计票房', '票房增量', 'IMDb评分', '豆瓣评分']
+
+# 沿用已上榜电影查询结果的字段
+RATING_FIELDS = ('中文片名', 'IMDb评分', '豆瓣评分')
+
+log = get_logger('watch')
+summary_log = get_logger('summary')
+
+
+def gross_value(gross_text):
+    """累计票房文本（如 "$74,148,275"）转为整数美元，无法解析时为0"""
+    return parse_gross(gross_text) or 0
+
+
+def diff_charts(previous, current):
+    """
+    比较两次榜单
+
+    Args:
+        previous (list): 上次的电影数据列表
+        current (list): 本次的电影数据列表
+
+    Returns:
+        list: 变化记录，每条为包含 WATCH_COLUMNS 中各列（'时间' 除外）的字典，按本次排名顺序，跌出榜单的在最后
+    """
+    previous_by_title = {movie['英文片名']: movie for movie in previous}
+    current_titles = {movie['英文片名'] for movie in current}
+    changes = []
+
+    for movie in current:
+        before = previous_by_title.get(movie['英文片名'])
+        if before is None:
+            change, previous_rank, delta = CHANGE_NEW, None, gross_value(movie['累计票房'])
+        elif (before['排名'] != movie['排名'] or before['累计票房'] != movie['累计票房']
+              or any(before[field] != movie[field] for field in RATING_FIELDS)):
+            change, previous_rank = CHANGE_UPDATED, before['排名']
+            delta = gross_value(movie['累计票房']) - gross_value(before['累计票房'])
+        else:
+            continue
+        changes.append(dict(movie, 变化=change, 上次排名=previous_rank, 票房增量=delta))
+
+    for movie in previous:
+        if movie['英文片名'] not in current_titles:
+            changes.append(dict(movie, 变化=CHANGE_DROPPED, 排名=None, 上次排名=movie['排名'], 票房增量=0))
+    return changes
+
+
+class MonthWatcher:
+    """轮询一个月份的榜单，输出两次轮询之间的变化"""
+
+    def __init__(self, scraper, year, month, sink=None):
+        """
+        Args:
+            scraper (BoxOfficeScraper): 用于请求页面、解析榜单和查询评分的抓取器
+            year (int): 年份
+            month (int): 月份 (1-12)
+            sink (RowSink): 变化记录的输出（列为 WATCH_COLUMNS），None表示不输出
+        """
+        self.scraper = scraper
+        self.year = year
+        self.month = month
+        self.sink = sink
+        self.url = scraper.build_month_url(year, month)
+        self.etag = None
+        self.last_modified = None
+        self.content_hash = None
+        # 上次的榜单，以及上过榜的电影中已全部查到的评分（跌出后重新上榜也不再查询）；
+        # 有"N/A"的不保存，下次轮询重新查询
+        self.chart = []
+        self.ratings = {}
+
+    def conditional_headers(self):
+        """根据上次响应的验证器生成条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def poll(self):
+        """
+        轮询一次榜单
+
+        榜单页面未变化时只重新查询上次有"N/A"的电影，查到的评分作为更新记录输出。
+
+        Returns:
+            list: 本次的变化记录（见 diff_charts），榜单和评分都未变化时为空列表
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        metrics = self.scraper.metrics
+        response = self.scraper.fetch_page(self.url, headers=self.conditional_headers(), timeout=10, use_cache=False)
+        if response.status_code == 304:
+            metrics.inc('watch_polls_total', result='not_modified')
+            log.info("%s年%s月榜单未变化（304）", self.year, self.month)
+            return self.retry_missing()
+        response.raise_for_status()
+
+        self.etag = response.headers.get('ETag') or self.etag
+        self.last_modified = response.headers.get('Last-Modified') or self.last_modified
+        content_hash = hashlib.sha1(response.content).hexdigest()
+        if content_hash == self.content_hash:
+            metrics.inc('watch_polls_total', result='unchanged')
+            log.info("%s年%s月榜单内容未变化", self.year, self.month)
+            return self.retry_missing()
+        self.content_hash = content_hash
+
+        with metrics.timer('stage_seconds', stage='month_parse'):
+            movies_data = self.scraper.parse_monthly_table(response.content)
+        # 解析不到表格时可能是页面异常，保留上次的榜单，下次重新请求完整页面
+        if not movies_data:
+            self.etag = self.last_modified = self.content_hash = None
+            log.warning("%s年%s月榜单没有解析到电影", self.year, self.month)
+            return []
+        metrics.inc('watch_polls_total', result='changed')
+        return self.update_chart(movies_data)
+
+    def retry_missing(self):
+        """榜单未变化时重新查询上次有"N/A"的电影，返回变化记录"""
+        if all(movie['英文片名'] in self.ratings for movie in self.chart):
+            return []
+        return self.update_chart([dict(movie) for movie in self.chart])
+
+    def update_chart(self, movies_data):
+        """
+        为本次榜单填充评分，与上次榜单比较并输出变化
+
+        Args:
+            movies_data (list): 本次榜单的电影数据，原地更新
+
+        Returns:
+            list: 变化记录（见 diff_charts）
+        """
+        enriched = 0
+        for i, movie_data in enumerate(movies_data, 1):
+            known = self.ratings.get(movie_data['英文片名'])
+            if known is not None:
+                movie_data.update(zip(RATING_FIELDS, known))
+                continue
+            self.scraper.enrich_movie(movie_data, self.year, i)
+            ratings = tuple(movie_data[field] for field in RATING_FIELDS)
+            if "N/A" not in ratings:
+                self.ratings[movie_data['英文片名']] = ratings
+            enriched += 1
+
+        changes = diff_charts(self.chart, movies_data)
+        self.chart = movies_data
+        self.emit(changes)
+
+        counts = {change: sum(1 for item in changes if item['变化'] == change)
+                  for change in (CHANGE_NEW, CHANGE_UPDATED, CHANGE_DROPPED)}
+        summary_log.info("%s年%s月榜单更新: 新上榜 %s, 排名、票房或评分变化 %s, 跌出榜单 %s（查询评分 %s 部）",
+                         self.year, self.month, counts[CHANGE_NEW], counts[CHANGE_UPDATED], counts[CHANGE_DROPPED],
+                         enriched,
+                         extra=event('watch_diff', year=self.year, month=self.month, new=counts[CHANGE_NEW],
+                                     updated=counts[CHANGE_UPDATED], dropped=counts[CHANGE_DROPPED], enriched=enriched))
+        return changes
+
+    def emit(self, changes):
+        """把变化记录写入输出，带上轮询时间"""
+        if self.sink is None or not changes:
+            return
+        now = datetime.now().isoformat(timespec='seconds')
+        for change in changes:
+            self.sink.write(dict(change, 时间=now))
+        self.sink.flush()
+
+    def watch(self, interval=DEFAULT_WATCH_INTERVAL, max_polls=None, sleep=time.sleep):
+        """
+        按固定间隔轮询，直到达到轮询次数或被中断
+
+        Args:
+            interval (float): 轮询间隔（秒）
+            max_polls (int): 最多轮询次数，None表示不限
+            sleep: 等待函数，测试时可替换
+
+        Returns:
+            int: 完成的轮询次数
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            try:
+                self.poll()
+            except requests.RequestException as e:
+                log.error("轮询%s年%s月榜单失败: %s", self.year, self.month, e,
+                          extra=event('watch_failed', year=self.year, month=self.month, error=str(e)))
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                sleep(interval)
+        return polls
+
+
+def main():
+    """命令行入口：监视一个月份（默认当月）的榜单"""
+    parser = argparse.ArgumentParser(description="监视当月票房榜单的变化")
+    parser.add_argument('month', nargs='?', help="年月，如 2025-06；默认当月")
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL, help="轮询间隔（秒）")
+    parser.add_argument('--polls', type=int, help="轮询次数，默认一直运行")
+    parser.add_argument('--output', help="变化记录文件，.jsonl 为 JSON Lines，否则为CSV；默认 data/watch_YYYY_MM.csv")
+    parser.add_argument('--no-cache', action='store_true', help="评分查询不使用HTTP响应缓存和查询失败缓存")
+    parser.add_argument('--quiet', action='store_true', help="只输出每次榜单更新的摘要和错误")
+    parser.add_argument('--verbose', action='store_true', help="输出调试信息")
+    parser.add_argument('--events', help="把日志事件以 JSON Lines 追加写入该文件")
+    args = parser.parse_args()
+
+    verbosity = VERBOSITY_QUIET if args.quiet else VERBOSITY_DEBUG if args.verbose else VERBOSITY_NORMAL
+    configure_logging(verbosity, events_path=args.events)
+
+    if args.month:
+        try:
+            year, month = parse_year_month(args.month)
+        except ValueError as e:
+            print(f"输入错误: {e}")
+            return
+    else:
+        today = datetime.now()
+        year, month = today.year, today.month
+
+    output = args.output or f"data/watch_{year}_{month:02d}.csv"
+    if columnar_format(output) is not None:
+        print("输入错误: 变化记录只支持 CSV 或 JSON Lines 输出")
+        return
+
+    scraper = BoxOfficeScraper(
+        parse_mode=PARSE_PARTIAL,
+        cache=None if args.no_cache else DEFAULT_CACHE_PATH,
+        negative_cache=None if args.no_cache else DEFAULT_NEGATIVE_CACHE_PATH,
+    )
+    print(f"=== 监视 {year}年{month}月 的票房榜单（每 {args.interval:g} 秒） ===")
+    print(f"变化记录写入: {output}")
+    try:
+        with open_row_sink(output, WATCH_COLUMNS, append=True) as sink:
+            MonthWatcher(scraper, year, month, sink).watch(args.interval, max_polls=args.polls)
+    except KeyboardInterrupt:
+        print("\n用户取消操作")
+    finally:
+        scraper.close()
+        scraper.metrics.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询失败结果的持久化缓存
+
+有些电影每次抓取在IMDb或豆瓣上都查不到（搜索无结果、被拦截、尚无评分），
+每次都要付出搜索、详情页和静态映射查找的代价。这里按 (来源, 片名, 年份) 记录失败原因，
+每种原因有各自较短的有效期，过期后重新查询，新上映的电影有了评分后就能查到。
+
+绝大多数查询的电影不在失败记录中，先用内存中的布隆过滤器判断，
+过滤器判定不存在时无需访问数据库。
+
+多个进程可以共用一个数据库文件（写入时等待其他进程的写锁），但布隆过滤器是每个进程各自的：
+只包含打开（或上次 reload）时数据库中已有的记录和本进程写入的记录，
+其他进程之后写入的失败记录要在 reload() 之后才能查到。
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from rating_memo import memo_key
+from response_cache import SQLITE_BUSY_TIMEOUT
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+DEFAULT_NEGATIVE_CACHE_PATH = "data/cache/negative_cache.sqlite3"
+
+# 失败原因
+MISS_NO_RESULTS = 'no_results'  # 搜索没有任何结果或匹配
+MISS_NO_RATING = 'no_rating'    # 找到电影，但还没有评分
+MISS_BLOCKED = 'blocked'        # 被拦截或限流，没有真正查到
+
+# 确实查过、结论可信的失败原因（被拦截不算）
+CONFIRMED_MISSES = (MISS_NO_RESULTS, MISS_NO_RATING)
+
+# 各原因的有效期：被拦截只是暂时的，很快重试；新片的评分通常几天内出现
+DEFAULT_MISS_TTLS = {
+    MISS_NO_RESULTS: 7 * DAY,
+    MISS_NO_RATING: 2 * DAY,
+    MISS_BLOCKED: HOUR,
+}
+
+# 查询来源
+SOURCE_IMDB = 'imdb'
+SOURCE_DOUBAN = 'douban'
+
+
+def miss_key(source, movie_title, target_year):
+    """缓存键：来源 + 规范化片名 + 年份"""
+    title, year = memo_key(movie_title, target_year)
+    return f"{source}\t{title}\t{year or ''}"
+
+
+class BloomFilter:
+    """
+    布隆过滤器：判定不存在时一定不存在，判定存在时有 error_rate 的误判概率
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01):
+        """
+        Args:
+            capacity (int): 预计的元素数量
+            error_rate (float): 元素数量达到 capacity 时的误判率
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        """双重哈希生成 self.hashes 个比特位置"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class NegativeCache:
+    """SQLite实现的查询失败缓存，带内存布隆过滤器"""
+
+    def __init__(self, path=DEFAULT_NEGATIVE_CACHE_PATH, ttls=None, capacity=100000, error_rate=0.01):
+        """
+        Args:
+            path (str): SQLite数据库文件路径
+            ttls (dict): 失败原因 -> 有效期秒数，覆盖 DEFAULT_MISS_TTLS
+            capacity (int): 布隆过滤器的预计条目数
+            error_rate (float): 布隆过滤器的误判率
+        """
+        self.path = path
+        self.ttls = dict(DEFAULT_MISS_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.hits = 0
+        self.misses = 0
+        self.filtered = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS misses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute('DELETE FROM misses WHERE expires_at < ?', (time.time(),))
+        self.conn.commit()
+
+        # 未过期的记录全部放入布隆过滤器
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.loaded_at = 0.0
+        self.reload()
+
+    def reload(self):
+        """
+        把上次加载之后（其他进程）写入的失败记录加入布隆过滤器
+
+        Returns:
+            int: 新加入的记录数
+        """
+        with self.lock:
+            # 留出1秒余量：与加载同时提交的记录下次仍会读到，重复加入无妨
+            since = self.loaded_at - 1
+            self.loaded_at = time.time()
+            rows = self.conn.execute('SELECT key FROM misses WHERE created_at >= ?', (since,)).fetchall()
+            for (key,) in rows:
+                self.bloom.add(key)
+        return len(rows)
+
+    def get(self, source, movie_title, target_year):
+        """
+        查询未过期的失败记录
+
+        Returns:
+            str: 失败原因，没有记录时返回None
+        """
+        key = miss_key(source, movie_title, target_year)
+        with self.lock:
+            if key not in self.bloom:
+                self.filtered += 1
+                return None
+            row = self.conn.execute(
+                'SELECT reason FROM misses WHERE key = ? AND expires_at >= ?', (key, time.time())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, source, movie_title, target_year, reason):
+        """记录一次查询失败，有效期由失败原因决定"""
+        key = miss_key(source, movie_title, target_year)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO misses (key, source, reason, created_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (key, source, reason, now, now + self.ttls[reason])
+            )
+            self.conn.commit()
+            self.bloom.add(key)
+
+    def forget(self, source, movie_title, target_year):
+        """删除一条失败记录（布隆过滤器中的位保留，只会多一次数据库查询）"""
+        with self.lock:
+            self.conn.execute('DELETE FROM misses WHERE key = ?', (miss_key(source, movie_title, target_year),))
+            self.conn.commit()
+
+    def stats(self):
+        """返回各来源、各原因的条目数及本进程的命中统计"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT source, reason, COUNT(*) FROM misses WHERE expires_at >= ? GROUP BY source, reason',
+                (time.time(),)
+            ).fetchall()
+        return {
+            'entries': {f"{source}/{reason}": count for source, reason, count in rows},
+            'hits': self.hits,
+            'misses': self.misses,
+            'filtered': self.filtered,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
@@ -3,9 +3,11 @@
 
 import sys
 from boxoffice_scraper import BoxOfficeScraper
+from scrape_log import configure_logging
 
 def quick_test():
     """快速测试列索引修复"""
+    configure_logging()
     print("=== 快速测试 - 验证列索引修复 ===")
     
     scraper = BoxOfficeScraper(debug=True)
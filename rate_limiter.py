@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按站点限速工具
+
+为每个域名维护一个令牌桶，替代原先固定的 time.sleep 延时：
+并发抓取时各线程共享同一个令牌桶，既保证对每个网站的访问频率可控，
+又不会在站点空闲时白白等待。多进程抓取时使用 SharedHostRateLimiter，
+令牌桶状态放在共享内存中，所有进程合计不超过每个站点的限速。
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+import urllib.parse
+
+
+# 各站点默认限速（每秒请求数）
+DEFAULT_HOST_RATES = {
+    'boxofficemojo.com': 1.0,
+    'imdb.com': 2.0,
+    'douban.com': 0.5,
+}
+
+
+def host_key(url):
+    """
+    提取URL对应的站点域名，同一站点的不同子域名共用一个令牌桶
+
+    例如 movie.douban.com 与 www.douban.com 都归为 douban.com
+    """
+    hostname = urllib.parse.urlparse(url).hostname or url
+    parts = hostname.split('.')
+    if len(parts) >= 2 and not hostname.replace('.', '').isdigit():
+        return '.'.join(parts[-2:])
+    return hostname
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Args:
+            rate (float): 每秒补充的令牌数
+            capacity (int): 桶容量，即允许的突发请求数
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        预约一个令牌
+
+        Returns:
+            float: 调用方需要等待的秒数（0表示可立即发送）
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self):
+        """归还一个预约后未使用的令牌（请求在发出前被取消）"""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def acquire(self):
+        """获取一个令牌，必要时阻塞等待，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """按站点划分的限速器，每个站点一个令牌桶"""
+
+    def __init__(self, rates=None, default_rate=1.0, burst=1):
+        """
+        Args:
+            rates (dict): 站点域名 -> 每秒请求数，未提供时使用 DEFAULT_HOST_RATES
+            default_rate (float): 未配置站点的默认限速
+            burst (int): 每个站点允许的突发请求数
+        """
+        self.rates = dict(DEFAULT_HOST_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.default_rate = default_rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, host):
+        """获取（必要时创建）指定站点的令牌桶"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate = self.rates.get(host, self.default_rate)
+                bucket = TokenBucket(rate, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url, cancelled=None):
+        """
+        在访问URL前调用，按其所属站点限速
+
+        Args:
+            url (str): 请求地址
+            cancelled (threading.Event): 取消标记；已设置时不预约令牌，等待期间被设置时归还令牌并立即返回
+
+        Returns:
+            float: 等待的秒数；请求被取消时返回None
+        """
+        bucket = self.get_bucket(host_key(url))
+        if cancelled is None:
+            return bucket.acquire()
+        if cancelled.is_set():
+            return None
+        wait = bucket.reserve()
+        if cancelled.wait(wait) if wait > 0 else cancelled.is_set():
+            bucket.refund()
+            return None
+        return wait
+
+
+class AsyncHostRateLimiter(HostRateLimiter):
+    """asyncio版本的站点限速器：令牌桶相同，等待时让出事件循环而不阻塞线程"""
+
+    async def acquire(self, url):
+        """在访问URL前等待，按其所属站点限速，返回等待的秒数；等待期间任务被取消时归还令牌"""
+        bucket = self.get_bucket(host_key(url))
+        wait = bucket.reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.refund()
+                raise
+        return wait
+
+
+class SharedTokenBucket:
+    """状态保存在共享内存中的令牌桶，供多个进程共同使用"""
+
+    def __init__(self, rate, capacity, state, index, lock):
+        """
+        Args:
+            rate (float): 每秒补充的令牌数
+            capacity (int): 桶容量
+            state (multiprocessing.Array): 共享状态，每个桶占两个槽位（令牌数、上次更新时间）
+            index (int): 本桶在共享状态中的序号
+            lock (multiprocessing.Lock): 保护共享状态的进程锁
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.state = state
+        self.offset = index * 2
+        self.lock = lock
+
+    def reserve(self):
+        """
+        预约一个令牌
+
+        Returns:
+            float: 调用方需要等待的秒数（0表示可立即发送）
+        """
+        with self.lock:
+            # time.monotonic 在同一台机器的所有进程间是同一个时钟
+            now = time.monotonic()
+            tokens, updated = self.state[self.offset], self.state[self.offset + 1]
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate) - 1
+            self.state[self.offset] = tokens
+            self.state[self.offset + 1] = now
+            if tokens >= 0:
+                return 0.0
+            return -tokens / self.rate
+
+    def refund(self):
+        """归还一个预约后未使用的令牌（请求在发出前被取消）"""
+        with self.lock:
+            self.state[self.offset] = min(self.capacity, self.state[self.offset] + 1)
+
+    def acquire(self):
+        """获取一个令牌，必要时阻塞等待，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SharedHostRateLimiter(HostRateLimiter):
+    """
+    跨进程共享的站点限速器
+
+    在主进程中创建后作为进程池 initializer 的参数传给各工作进程，
+    已配置限速的站点在所有进程间共用一个令牌桶；未配置的站点退回到进程内的令牌桶。
+    """
+
+    def __init__(self, rates=None, default_rate=1.0, burst=1):
+        super().__init__(rates, default_rate, burst)
+        self.hosts = sorted(self.rates)
+        now = time.monotonic()
+        initial = []
+        for _ in self.hosts:
+            initial.extend([float(burst), now])
+        self.state = multiprocessing.Array('d', initial, lock=False)
+        self.state_lock = multiprocessing.Lock()
+
+    def __getstate__(self):
+        # 线程锁和进程内的令牌桶不随对象传给子进程，共享状态和进程锁会被继承
+        state = self.__dict__.copy()
+        del state['lock']
+        state['buckets'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get_bucket(self, host):
+        """获取指定站点的令牌桶：已配置站点使用共享令牌桶"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate = self.rates.get(host, self.default_rate)
+                if host in self.rates:
+                    bucket = SharedTokenBucket(rate, self.burst, self.state, self.hosts.index(host), self.state_lock)
+                else:
+                    bucket = TokenBucket(rate, self.burst)
+                self.buckets[host] = bucket
+            return bucket
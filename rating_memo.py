@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+评分查询结果的进程内缓存
+
+同一部电影往往连续几个月出现在票房榜上，批量抓取时用
+(片名, 年份) -> (IMDb评分, 中文片名, 豆瓣评分) 的LRU缓存
+避免对重复出现的电影再次进行IMDb和豆瓣搜索。
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def memo_key(movie_title, target_year):
+    """生成缓存键：忽略大小写和首尾空白"""
+    return (movie_title.strip().lower(), target_year)
+
+
+class RatingMemo:
+    """线程安全、容量有限的LRU评分缓存"""
+
+    def __init__(self, max_size=1024):
+        """
+        Args:
+            max_size (int): 最多保留的电影数量，超出时淘汰最久未使用的条目
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, movie_title, target_year):
+        """
+        查询缓存
+
+        Returns:
+            tuple: (IMDb评分, 中文片名, 豆瓣评分)，未命中时返回None
+        """
+        key = memo_key(movie_title, target_year)
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, movie_title, target_year, imdb_rating, chinese_title, douban_rating):
+        """写入一部电影的查询结果"""
+        key = memo_key(movie_title, target_year)
+        with self.lock:
+            self.entries[key] = (imdb_rating, chinese_title, douban_rating)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化HTTP响应缓存
+
+基于SQLite，按规范化URL缓存成功的响应：
+- 按站点和页面类型设置不同的有效期（详情页较长，当月票房榜较短）
+- 总大小超过上限时按最近访问时间（LRU）淘汰；命中时只在访问时间早于 touch_interval 时才更新，
+  避免每次命中都写库提交
+- 支持跳过缓存（bypass）和强制刷新（refresh）
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# 缓存模式
+CACHE_USE = 'use'          # 优先读缓存，未命中时请求并写入
+CACHE_REFRESH = 'refresh'  # 总是重新请求并覆盖缓存
+CACHE_BYPASS = 'bypass'    # 完全不读写缓存
+
+# 不影响页面内容的跟踪参数，规范化时去掉
+IGNORED_QUERY_PARAMS = {'ref_', 'ref'}
+
+# (域名后缀, 路径正则, 有效期秒数)，按顺序匹配第一条
+DEFAULT_TTL_RULES = [
+    ('imdb.com', r'^/title/tt\d+', 30 * DAY),
+    ('imdb.com', r'^/find', 7 * DAY),
+    ('douban.com', r'^/subject/\d+', 30 * DAY),
+    ('douban.com', r'^/search', 7 * DAY),
+]
+
+# 命中时更新访问时间的最小间隔：LRU淘汰只需要粗略的访问顺序
+DEFAULT_TOUCH_INTERVAL = 10 * 60
+
+# 超出容量时淘汰到上限的这个比例以下，留出余量，缓存写满后不必每次写入都淘汰
+EVICT_TARGET_RATIO = 0.9
+
+# 多个进程写同一个数据库文件时，等待其他进程的写锁最多多少秒（SQLite默认5秒）
+SQLITE_BUSY_TIMEOUT = 30.0
+
+MONTH_NAMES = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+
+def normalize_url(url):
+    """
+    规范化URL作为缓存键：域名小写、去掉片段和跟踪参数、查询参数排序
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = [
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key not in IGNORED_QUERY_PARAMS
+    ]
+    query.sort()
+    path = parts.path or '/'
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        path,
+        urllib.parse.urlencode(query),
+        ''
+    ))
+
+
+def boxoffice_month_ttl(path, now=None):
+    """
+    BoxOfficeMojo月度榜单的有效期：当月及上月的票房仍在变化，只缓存1小时；
+    更早的月份数据已固定，缓存30天
+
+    Returns:
+        int: 有效期秒数，路径不是月度榜单时返回None
+    """
+    match = re.match(r'^/month/([a-z]+)/(\d{4})', path)
+    if not match or match.group(1) not in MONTH_NAMES:
+        return None
+
+    now = now or datetime.now()
+    month = MONTH_NAMES.index(match.group(1)) + 1
+    year = int(match.group(2))
+    months_ago = (now.year - year) * 12 + (now.month - month)
+    return HOUR if months_ago <= 1 else 30 * DAY
+
+
+class ResponseCache:
+    """SQLite实现的HTTP响应缓存"""
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, default_ttl=DAY,
+                 ttl_rules=None, mode=CACHE_USE, touch_interval=DEFAULT_TOUCH_INTERVAL):
+        """
+        Args:
+            path (str): SQLite数据库文件路径
+            max_bytes (int): 缓存内容总大小上限（字节）
+            default_ttl (int): 未匹配任何规则时的有效期（秒）
+            ttl_rules (list): (域名后缀, 路径正则, 有效期秒数) 列表，默认 DEFAULT_TTL_RULES
+            mode (str): 缓存模式，CACHE_USE / CACHE_REFRESH / CACHE_BYPASS
+            touch_interval (float): 命中时访问时间早于多少秒才更新，0表示每次命中都更新
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_rules = [
+            (suffix, re.compile(pattern), ttl)
+            for suffix, pattern, ttl in (ttl_rules or DEFAULT_TTL_RULES)
+        ]
+        self.mode = mode
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下 NORMAL 不会损坏数据库，断电时最多丢失最近提交的几条缓存
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+        self.conn.commit()
+        # 缓存内容总大小：打开时统计一次，之后随写入和淘汰增减，写入时无需全表求和
+        self.total_bytes = self.stored_bytes()
+
+    def ttl_for(self, url):
+        """根据URL所属站点和页面类型确定有效期（秒）"""
+        parts = urllib.parse.urlsplit(url)
+        host = (parts.hostname or '').lower()
+        path = parts.path or '/'
+
+        if host.endswith('boxofficemojo.com'):
+            ttl = boxoffice_month_ttl(path)
+            if ttl is not None:
+                return ttl
+
+        for suffix, pattern, ttl in self.ttl_rules:
+            if host.endswith(suffix) and pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url):
+        """
+        读取未过期的缓存响应
+
+        Returns:
+            requests.Response: 缓存的响应，未命中、已过期或处于非CACHE_USE模式时返回None
+        """
+        if self.mode != CACHE_USE:
+            return None
+
+        key = normalize_url(url)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT url, status, headers, body, expires_at, accessed_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None or row[4] < now:
+                self.misses += 1
+                return None
+            if now - row[5] >= self.touch_interval:
+                self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                self.conn.commit()
+            self.hits += 1
+
+        cached_url, status, headers, body, _, _ = row
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = bytes(body)
+        response.url = cached_url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def set(self, url, response):
+        """写入成功（200）的响应，超出容量时淘汰最久未访问的条目"""
+        if self.mode == CACHE_BYPASS or response.status_code != 200:
+            return
+
+        key = normalize_url(url)
+        body = response.content
+        headers = json.dumps({
+            name: value for name, value in response.headers.items()
+            if name.lower() in ('content-type', 'etag', 'last-modified')
+        })
+        now = time.time()
+        with self.lock:
+            replaced = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, url, status, headers, body, size, created_at, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url or url, response.status_code, headers, body,
+                 len(body), now, now + self.ttl_for(url), now)
+            )
+            self.total_bytes += len(body) - (replaced[0] if replaced else 0)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+            self.conn.commit()
+
+    def stored_bytes(self):
+        """全表统计缓存内容的总大小"""
+        return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def evict(self):
+        """
+        按最近访问时间淘汰条目，直到总大小不超过上限的 EVICT_TARGET_RATIO（调用方持有锁）
+
+        其他进程也可能写入同一个数据库，淘汰前重新统计实际总大小。
+        """
+        total = self.stored_bytes()
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            rows = self.conn.execute('SELECT key, size FROM responses ORDER BY accessed_at ASC')
+            victims = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                victims.append((key,))
+                total -= size
+            self.conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.total_bytes = total
+
+    def purge_expired(self):
+        """删除所有已过期的条目，返回删除数量"""
+        with self.lock:
+            cursor = self.conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+            self.conn.commit()
+            self.total_bytes = self.stored_bytes()
+            return cursor.rowcount
+
+    def stats(self):
+        """返回缓存条目数、总大小及本进程的命中统计"""
+        with self.lock:
+            count, total = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        return {'entries': count, 'bytes': total, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
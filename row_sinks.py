@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式数据输出
+
+抓取结果逐行追加写入 CSV 或 JSON Lines 文件，而不是全部抓完后再一次性保存：
+- 内存占用与抓取的月份数无关
+- 每写入一定行数或经过一定时间就刷新到文件，抓取过程中可以用 tail -f 查看进度
+- 中断（包括 Ctrl+C）时已写入的行都会保留
+"""
+
+import csv
+import json
+import os
+import time
+
+from columnar_export import ColumnarRowSink, columnar_format
+
+
+# 默认每10行或每5秒刷新一次
+DEFAULT_FLUSH_ROWS = 10
+DEFAULT_FLUSH_SECONDS = 5.0
+
+
+class RowSink:
+    """逐行追加写入的输出文件，子类实现具体格式"""
+
+    def __init__(self, path, columns, append=False,
+                 flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        """
+        Args:
+            path (str): 输出文件路径
+            columns (list): 输出的列及顺序，数据中缺少的列写为空
+            append (bool): 是否追加到已有文件，否则覆盖
+            flush_rows (int): 每写入多少行刷新一次
+            flush_seconds (float): 距上次刷新超过多少秒时刷新
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        self.rows = 0
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        is_new = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = self.open_file('w' if is_new else 'a')
+        if is_new:
+            self.write_header()
+            self.flush()
+
+    def open_file(self, mode):
+        return open(self.path, mode, encoding='utf-8', newline='')
+
+    def write_header(self):
+        """新文件的表头，默认没有"""
+
+    def write_row(self, row):
+        raise NotImplementedError
+
+    def write(self, row):
+        """写入一行数据，达到刷新条件时刷新到文件"""
+        self.write_row(row)
+        self.rows += 1
+        self.pending += 1
+        if self.pending >= self.flush_rows or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def write_all(self, rows):
+        """写入多行数据，返回写入的行数"""
+        count = 0
+        for row in rows:
+            self.write(row)
+            count += 1
+        return count
+
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvRowSink(RowSink):
+    """CSV输出，与 save_to_csv 相同使用带BOM的UTF-8，方便Excel打开"""
+
+    def open_file(self, mode):
+        # 追加到已有文件时 utf-8-sig 不会重复写入BOM
+        file = open(self.path, mode, encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(file)
+        return file
+
+    def write_header(self):
+        self.writer.writerow(self.columns)
+
+    def write_row(self, row):
+        self.writer.writerow(['' if row.get(column) is None else row.get(column) for column in self.columns])
+
+
+class JsonlRowSink(RowSink):
+    """JSON Lines 输出，每行一个JSON对象"""
+
+    def write_row(self, row):
+        self.file.write(json.dumps({column: row.get(column) for column in self.columns}, ensure_ascii=False) + '\n')
+
+
+def open_row_sink(path, columns, append=False, **options):
+    """
+    按文件扩展名创建输出：.jsonl / .ndjson 为 JSON Lines，
+    .arrow / .parquet 为带类型的列式文件（见 columnar_export.py），其他为CSV
+
+    Returns:
+        RowSink: 可用作上下文管理器的输出对象
+    """
+    if columnar_format(path) is not None:
+        return ColumnarRowSink(path, columns, append, **options)
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        return JsonlRowSink(path, columns, append, **options)
+    return CsvRowSink(path, columns, append, **options)
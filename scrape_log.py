@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+抓取过程的日志和事件流
+
+抓取器的输出统一经由 logging 的 'boxoffice' 日志器，消息使用 % 格式的延迟格式化，
+被级别过滤掉的消息不会格式化。输出详细程度分三档：
+
+- quiet   只输出每个月份的摘要和错误
+- normal  另外输出每部电影的结果和各月份的进度（默认）
+- debug   另外输出每个搜索候选、每个表格行等调试信息
+
+导入本模块不会添加任何输出，由命令行入口调用 configure_logging() 设置；作为库使用时
+沿用调用方的 logging 配置。BoxOfficeScraper(debug=True) 只打开该实例的调试输出（见 get_instance_logger()）。
+
+每条日志可以附带事件名和字段（见 event()），configure_logging(events_path=...) 把所有日志
+以JSON Lines 写入文件，便于事后分析：
+
+    {"time": "2025-06-01T12:00:00.123", "level": "INFO", "event": "movie", "message": "已抓取: ...", "rank": 1, ...}
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+
+
+LOGGER_NAME = 'boxoffice'
+# 月份摘要使用的日志器，quiet 模式下仍然输出
+SUMMARY_LOGGER_NAME = 'boxoffice.summary'
+
+VERBOSITY_QUIET = 'quiet'
+VERBOSITY_NORMAL = 'normal'
+VERBOSITY_DEBUG = 'debug'
+VERBOSITY_LEVELS = (VERBOSITY_QUIET, VERBOSITY_NORMAL, VERBOSITY_DEBUG)
+
+# 最近一次 configure_logging 的参数，多进程抓取时传给工作进程使用相同的设置
+LOGGING_CONFIG = {}
+
+
+def event(name, **fields):
+    """
+    日志的事件名和字段，作为 extra 参数传入：
+
+        log.info("已抓取: %s", title, extra=event('movie', rank=1, imdb='7.5'))
+    """
+    return {'event': name, 'fields': fields}
+
+
+class ConsoleHandler(logging.Handler):
+    """输出到当前的 sys.stdout（每次输出时取，便于 contextlib.redirect_stdout 捕获）"""
+
+    def __init__(self, quiet=False):
+        super().__init__()
+        self.quiet = quiet
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def filter(self, record):
+        # quiet 模式只输出月份摘要和错误
+        if self.quiet and record.levelno < logging.ERROR and record.name != SUMMARY_LOGGER_NAME:
+            return False
+        return super().filter(record)
+
+    def emit(self, record):
+        try:
+            sys.stdout.write(self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+
+
+class JsonlEventHandler(logging.Handler):
+    """把日志逐行追加到JSON Lines文件，多个进程可以同时追加到同一个文件"""
+
+    def __init__(self, path):
+        super().__init__()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self.write_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            entry = {
+                'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'logger': record.name,
+                'event': getattr(record, 'event', None),
+                'message': record.getMessage().strip(),
+                'pid': record.process,
+            }
+            entry.update(getattr(record, 'fields', None) or {})
+            line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+            # 每条记录一次写入并立即刷新，追加模式下多进程的行不会交错
+            with self.write_lock:
+                self.file.write(line)
+                self.file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        with self.write_lock:
+            if not self.file.closed:
+                self.file.close()
+        super().close()
+
+
+def get_logger(name=None):
+    """
+    获取 'boxoffice' 或其下的子日志器
+
+    Args:
+        name (str): 子日志器名，如 'scraper' 得到 'boxoffice.scraper'
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def configure_logging(verbosity=VERBOSITY_NORMAL, events_path=None):
+    """
+    设置输出详细程度和事件流文件，替换之前设置的输出
+
+    Args:
+        verbosity (str): 'quiet' / 'normal' / 'debug'
+        events_path (str): JSON Lines 事件流文件（追加写入），None表示不记录
+
+    Returns:
+        logging.Logger: 'boxoffice' 日志器
+    """
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"无效的输出模式: {verbosity}（应为 {' / '.join(VERBOSITY_LEVELS)}）")
+
+    logger = get_logger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(logging.DEBUG if verbosity == VERBOSITY_DEBUG else logging.INFO)
+    logger.propagate = False
+    logger.addHandler(ConsoleHandler(quiet=verbosity == VERBOSITY_QUIET))
+    if events_path:
+        logger.addHandler(JsonlEventHandler(events_path))
+    LOGGING_CONFIG.clear()
+    LOGGING_CONFIG.update(verbosity=verbosity, events_path=events_path)
+    return logger
+
+
+def get_instance_logger(name, debug=False):
+    """
+    获取抓取器实例使用的日志器
+
+    debug=True 时返回级别为 DEBUG 的 '<name>.debug' 子日志器，只有该实例输出调试信息，
+    'boxoffice' 日志器的级别和同一进程中的其他抓取器不受影响
+
+    Args:
+        name (str): 子日志器名，如 'scraper'
+        debug (bool): 是否输出调试信息
+
+    Returns:
+        logging.Logger: 日志器
+    """
+    if not debug:
+        return get_logger(name)
+    logger = get_logger(f"{name}.debug")
+    logger.setLevel(logging.DEBUG)
+    return logger
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BoxOfficeMojo / IMDb / 豆瓣 的本地替身服务器与端到端压测
+
+替身服务器以 fixtures/ 下录制的页面为模板，按请求中的片名生成对应的页面：
+    /month/{month}/{year}/     BoxOfficeMojo 月度榜单
+    /find?q=...                IMDb搜索页
+    /title/tt.../              IMDb详情页
+    /search?q=...              豆瓣搜索页
+    /link2/?url=...            豆瓣搜索结果的跳转链接（302到 /subject/）
+    /subject/.../              豆瓣详情页
+同一片名每次得到相同的IMDb编号、豆瓣编号和评分；月度榜单支持 ETag / Last-Modified 条件请求，
+set_month() 可以替换榜单内容模拟票房更新。每个站点可以单独配置延迟、
+5xx错误率、403（反爬拦截）和429（限流，带 Retry-After）的比例。
+
+BoxOfficeScraper(base_urls=server.base_urls()) 把所有请求指向替身服务器，
+run_load_test 在不同并发数下跑完整的抓取流程，统计每秒完成的电影数和各阶段的 p50/p99 耗时。
+
+用法:
+    python standin_server.py serve --port 8765 --latency 0.05 --douban-forbidden 0.3
+    python standin_server.py load --concurrency 10 50 200 --lookups 400 --latency 0.05
+"""
+
+import argparse
+import contextlib
+import hashlib
+import html
+import io
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from async_scraper import AsyncBoxOfficeScraper
+from benchmark_suite import FIXTURES_DIR, load_fixture
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+
+
+SITES = ('boxoffice', 'imdb', 'douban')
+
+# 压测默认的并发数
+DEFAULT_CONCURRENCY_LEVELS = (10, 50, 200)
+
+
+class SiteBehavior:
+    """单个站点的响应行为：延迟和各类错误的比例"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, forbidden_rate=0.0,
+                 throttle_rate=0.0, retry_after=1):
+        """
+        Args:
+            latency (float): 每个响应的基础延迟（秒）
+            jitter (float): 在基础延迟上随机增加 0~jitter 秒
+            error_rate (float): 返回503的比例
+            forbidden_rate (float): 返回403的比例（模拟反爬拦截）
+            throttle_rate (float): 返回429的比例（模拟限流）
+            retry_after (int): 429响应的 Retry-After 秒数
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def pick_status(self, rng):
+        """按配置的比例随机决定本次响应的状态码"""
+        roll = rng.random()
+        for status, rate in ((503, self.error_rate), (403, self.forbidden_rate), (429, self.throttle_rate)):
+            if roll < rate:
+                return status
+            roll -= rate
+        return 200
+
+
+def title_identity(title):
+    """
+    片名对应的固定编号和评分，同一片名每次请求结果相同
+
+    Returns:
+        dict: imdb_id / douban_id / imdb_rating / douban_rating / chinese_title
+    """
+    checksum = zlib.crc32(title.strip().lower().encode('utf-8'))
+    return {
+        'imdb_id': f"tt{10_000_000 + checksum % 90_000_000}",
+        'douban_id': str(20_000_000 + checksum % 10_000_000),
+        'imdb_rating': f"{1 + checksum % 90 / 10:.1f}",
+        'douban_rating': f"{1 + checksum // 90 % 90 / 10:.1f}",
+        'chinese_title': f"替身影片{checksum % 10000:04d}",
+    }
+
+
+class StandinPages:
+    """以录制页面为模板，按片名生成替身页面"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.month = load_fixture('bom_month.html', fixtures_dir)
+        self.month_modified = time.time()
+        self.imdb_search = load_fixture('imdb_search.html', fixtures_dir).decode('utf-8')
+        self.imdb_title = load_fixture('imdb_title.html', fixtures_dir).decode('utf-8')
+        self.douban_search = load_fixture('douban_search.html', fixtures_dir).decode('utf-8')
+        self.douban_subject = load_fixture('douban_subject.html', fixtures_dir).decode('utf-8')
+        # 编号 -> 片名，详情页请求总在搜索之后
+        self.titles = {}
+        self.lock = threading.Lock()
+
+    def remember(self, title):
+        identity = title_identity(title)
+        with self.lock:
+            self.titles[identity['imdb_id']] = title
+            self.titles[identity['douban_id']] = title
+        return identity
+
+    def lookup(self, identifier):
+        with self.lock:
+            return self.titles.get(identifier, "Unknown Title")
+
+    def set_month(self, content):
+        """替换月度榜单页面（模拟票房更新），更新 Last-Modified"""
+        with self.lock:
+            self.month = content
+            self.month_modified = max(time.time(), self.month_modified + 1)
+
+    def month_snapshot(self):
+        """
+        月度榜单页面及其 ETag 和 Last-Modified
+
+        Returns:
+            tuple: (页面内容, ETag, Last-Modified 时间戳)
+        """
+        with self.lock:
+            etag = '"' + hashlib.sha1(self.month).hexdigest()[:16] + '"'
+            return self.month, etag, self.month_modified
+
+    def render_imdb_search(self, title):
+        identity = self.remember(title)
+        page = self.imdb_search.replace('tt31193180', identity['imdb_id'])
+        return page.replace('Sinners', html.escape(title)).encode('utf-8')
+
+    def render_imdb_title(self, imdb_id):
+        title = self.lookup(imdb_id)
+        rating = title_identity(title)['imdb_rating']
+        page = self.imdb_title.replace('tt31193180', imdb_id).replace('Sinners', html.escape(title))
+        page = page.replace('imUuxf">7.8<', f'imUuxf">{rating}<').replace('"ratingValue": 7.8', f'"ratingValue": {rating}')
+        return page.encode('utf-8')
+
+    def render_douban_search(self, title, root):
+        identity = self.remember(title)
+        page = self.douban_search.replace('https://www.douban.com/link2/', f'{root}/link2/')
+        page = page.replace('27071232', identity['douban_id'])
+        page = page.replace('罪人', identity['chinese_title'], 1).replace('Sinners', urllib.parse.quote(title))
+        return page.encode('utf-8')
+
+    def render_douban_subject(self, douban_id):
+        title = self.lookup(douban_id)
+        identity = title_identity(title)
+        page = self.douban_subject.replace('罪人 Sinners', f"{identity['chinese_title']} {html.escape(title)}")
+        page = page.replace('rating_num" property="v:average">7.8<', f'rating_num" property="v:average">{identity["douban_rating"]}<')
+        page = page.replace('"ratingValue": "7.8"', f'"ratingValue": "{identity["douban_rating"]}"')
+        return page.replace('36953457', douban_id).encode('utf-8')
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """替身服务器的请求处理：按路径判断站点，注入延迟和错误后返回页面"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        site = site_for_path(parsed.path)
+        behavior = server.behaviors.get(site) or SiteBehavior()
+
+        delay = behavior.latency
+        with server.lock:
+            if behavior.jitter:
+                delay += server.rng.random() * behavior.jitter
+            status = behavior.pick_status(server.rng) if site else 404
+        if delay > 0:
+            time.sleep(delay)
+
+        headers = {}
+        body = b''
+        if status == 200:
+            status, body, headers = self.render(parsed.path, query)
+        elif status == 429:
+            headers['Retry-After'] = str(behavior.retry_after)
+        server.record(site, status)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def render(self, path, query):
+        """
+        生成页面
+
+        Returns:
+            tuple: (状态码, 页面内容, 额外响应头)
+        """
+        pages = self.server.pages
+        if path.startswith('/month/'):
+            return self.render_conditional(*pages.month_snapshot())
+        if path == '/find':
+            return 200, pages.render_imdb_search(query.get('q', [''])[0]), {}
+        match = re.match(r'^/title/(tt\d+)', path)
+        if match:
+            return 200, pages.render_imdb_title(match.group(1)), {}
+        if path == '/search':
+            return 200, pages.render_douban_search(query.get('q', [''])[0], self.server.root), {}
+        if path.startswith('/link2/'):
+            match = re.search(r'subject/(\d+)', query.get('url', [''])[0])
+            if match:
+                return 302, b'', {'Location': f"{self.server.root}/subject/{match.group(1)}/"}
+        match = re.match(r'^/subject/(\d+)', path)
+        if match:
+            return 200, pages.render_douban_subject(match.group(1)), {}
+        return 404, b'not found', {}
+
+    def render_conditional(self, body, etag, modified):
+        """按 If-None-Match / If-Modified-Since 返回304或完整页面，带上验证器响应头"""
+        headers = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True)}
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            if etag in [tag.strip() for tag in if_none_match.split(',')]:
+                return 304, b'', headers
+        elif self.headers.get('If-Modified-Since'):
+            try:
+                since = parsedate_to_datetime(self.headers['If-Modified-Since']).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            # HTTP日期精确到秒
+            if since is not None and int(modified) <= since:
+                return 304, b'', headers
+        return 200, body, headers
+
+    def log_message(self, format, *args):
+        pass
+
+
+def site_for_path(path):
+    """请求路径所属的站点，未知路径返回None"""
+    if path.startswith('/month/'):
+        return 'boxoffice'
+    if path == '/find' or path.startswith('/title/'):
+        return 'imdb'
+    if path in ('/search',) or path.startswith(('/link2/', '/subject/')):
+        return 'douban'
+    return None
+
+
+class StandinServer(ThreadingHTTPServer):
+    """在后台线程中运行的替身服务器"""
+
+    daemon_threads = True
+    # 高并发压测时避免连接在监听队列中被拒绝
+    request_queue_size = 1024
+
+    def __init__(self, host='127.0.0.1', port=0, behaviors=None, seed=None, fixtures_dir=FIXTURES_DIR):
+        """
+        Args:
+            host (str): 监听地址
+            port (int): 监听端口，0表示自动分配
+            behaviors (dict): 站点 ('boxoffice' / 'imdb' / 'douban') -> SiteBehavior
+            seed (int): 随机数种子，固定后错误注入的顺序可重现
+            fixtures_dir (str): 页面模板目录
+        """
+        super().__init__((host, port), StandinHandler)
+        self.behaviors = dict(behaviors or {})
+        self.rng = random.Random(seed)
+        self.pages = StandinPages(fixtures_dir)
+        self.status_counts = Counter()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def root(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self):
+        """传给 BoxOfficeScraper(base_urls=...) 的站点地址"""
+        return {
+            'boxoffice': self.root + "/month/{month}/{year}/",
+            'imdb': self.root,
+            'douban': self.root,
+        }
+
+    def record(self, site, status):
+        with self.lock:
+            self.status_counts[(site, status)] += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def make_scraper(server, **options):
+    """
+    访问替身服务器的抓取器：不限速、局部解析、5xx不重试，options 可覆盖这些默认值
+
+    Args:
+        server (StandinServer|FixtureSite): 已启动的本地服务器
+        **options: 传给 BoxOfficeScraper 的其他参数
+    """
+    defaults = dict(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(), parse_mode=PARSE_PARTIAL,
+                    max_retries=0)
+    return BoxOfficeScraper(**{**defaults, **options})
+
+
+def make_async_scraper(server, **options):
+    """
+    访问替身服务器、不限速的异步抓取器，options 可覆盖默认值
+
+    Args:
+        server (StandinServer|FixtureSite): 已启动的本地服务器
+        **options: 传给 AsyncBoxOfficeScraper 的其他参数
+    """
+    defaults = dict(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls())
+    return AsyncBoxOfficeScraper(**{**defaults, **options})
+
+
+def stage_for_url(url):
+    """请求URL对应的抓取阶段"""
+    path = urllib.parse.urlparse(url).path
+    if path.startswith('/month/'):
+        return 'month_page'
+    if path == '/find':
+        return 'imdb_search'
+    if path.startswith('/title/'):
+        return 'imdb_title'
+    if path == '/search':
+        return 'douban_search'
+    return 'douban_subject'
+
+
+class TimedScraper(BoxOfficeScraper):
+    """记录每次页面请求和每部电影各项查询耗时的抓取器"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.timings = {}
+        self.timings_lock = threading.Lock()
+
+    def record_timing(self, stage, seconds):
+        with self.timings_lock:
+            self.timings.setdefault(stage, []).append(seconds)
+
+    def fetch_page(self, url, headers=None, timeout=10, use_cache=True, cancelled=None):
+        start = time.perf_counter()
+        try:
+            return super().fetch_page(url, headers, timeout, use_cache, cancelled)
+        finally:
+            self.record_timing(stage_for_url(url), time.perf_counter() - start)
+
+    def find_imdb_rating(self, movie_title, target_year=None):
+        start = time.perf_counter()
+        try:
+            return super().find_imdb_rating(movie_title, target_year)
+        finally:
+            self.record_timing('imdb_lookup', time.perf_counter() - start)
+
+    def find_douban_movie(self, movie_title, target_year=None):
+        start = time.perf_counter()
+        try:
+            return super().find_douban_movie(movie_title, target_year)
+        finally:
+            self.record_timing('douban_lookup', time.perf_counter() - start)
+
+
+def percentile(sorted_values, fraction):
+    """最近秩法的百分位数"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_timings(timings):
+    """
+    各阶段耗时统计
+
+    Returns:
+        dict: 阶段 -> {count, p50_ms, p99_ms, mean_ms}
+    """
+    summary = {}
+    for stage, values in sorted(timings.items()):
+        values = sorted(values)
+        summary[stage] = {
+            'count': len(values),
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'mean_ms': sum(values) / len(values) * 1000,
+        }
+    return summary
+
+
+def run_load_test(server, concurrency, lookups=200, year=2025, max_retries=0):
+    """
+    端到端压测：抓取月度榜单，再以指定并发数查询每部电影的IMDb和豆瓣信息
+
+    Args:
+        server (StandinServer): 已启动的替身服务器
+        concurrency (int): 同时进行的电影查询数
+        lookups (int): 查询的电影总数，按需抓取多个月份的榜单凑足
+        year (int): 榜单年份
+        max_retries (int): 5xx响应的重试次数
+
+    Returns:
+        dict: movies / elapsed_s / movies_per_sec / stages / status_counts / missing
+    """
+    scraper = TimedScraper(
+        max_workers=concurrency,
+        rate_limits={host: 1e6 for host in ('127.0.0.1', 'localhost')},
+        base_urls=server.base_urls(),
+        parse_mode=PARSE_PARTIAL,
+        max_retries=max_retries,
+    )
+    with server.lock:
+        server.status_counts.clear()
+
+    start = time.perf_counter()
+    movies = []
+    # 抓取过程中的逐行输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        month = 0
+        while len(movies) < lookups:
+            page_year, page_month = year - month // 12, 12 - month % 12
+            response = scraper.fetch_page(scraper.build_month_url(page_year, page_month))
+            rows = scraper.parse_monthly_table(response.content) if response.ok else []
+            if not rows and month >= 12:
+                break
+            movies.extend((page_year, movie) for movie in rows)
+            month += 1
+        movies = movies[:lookups]
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda item: scraper.enrich_movie(item[1], item[0], 0), movies))
+    elapsed = time.perf_counter() - start
+    scraper.close()
+
+    with server.lock:
+        status_counts = {f"{site}:{status}": count for (site, status), count in sorted(server.status_counts.items())}
+    return {
+        'concurrency': concurrency,
+        'movies': len(movies),
+        'elapsed_s': elapsed,
+        'movies_per_sec': len(movies) / elapsed if elapsed else None,
+        'stages': summarize_timings(scraper.timings),
+        'status_counts': status_counts,
+        'missing': {
+            'IMDb评分': sum(1 for _, movie in movies if movie['IMDb评分'] == "N/A"),
+            '豆瓣评分': sum(1 for _, movie in movies if movie['豆瓣评分'] == "N/A"),
+        },
+    }
+
+
+def print_report(report):
+    print(f"\n=== 并发 {report['concurrency']}: {report['movies']} 部电影, 用时 {report['elapsed_s']:.2f}秒, "
+          f"{report['movies_per_sec']:.1f} 部/秒 ===")
+    print(f"{'阶段':<16} {'次数':>6} {'p50 ms':>9} {'p99 ms':>9} {'平均 ms':>9}")
+    for stage, stat in report['stages'].items():
+        print(f"{stage:<16} {stat['count']:>6} {stat['p50_ms']:>9.1f} {stat['p99_ms']:>9.1f} {stat['mean_ms']:>9.1f}")
+    print(f"响应状态: {report['status_counts']}")
+    print(f"缺失评分: {report['missing']}")
+
+
+def behaviors_from_args(args):
+    """命令行参数 -> 各站点的响应行为；--{站点}-xxx 覆盖全局设置"""
+    behaviors = {}
+    for site in SITES:
+        def option(name):
+            value = getattr(args, f"{site}_{name}")
+            return getattr(args, name) if value is None else value
+        behaviors[site] = SiteBehavior(
+            latency=option('latency'),
+            jitter=option('jitter'),
+            error_rate=option('error_rate'),
+            forbidden_rate=option('forbidden_rate'),
+            throttle_rate=option('throttle_rate'),
+            retry_after=args.retry_after,
+        )
+    return behaviors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BoxOfficeMojo / IMDb / 豆瓣 本地替身服务器与压测")
+    parser.add_argument('command', choices=['serve', 'load'], help="serve 只启动服务器，load 启动服务器并压测")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help="监听端口，0表示自动分配")
+    parser.add_argument('--seed', type=int, help="错误注入的随机数种子")
+    parser.add_argument('--retry-after', type=int, default=1, help="429响应的 Retry-After 秒数")
+    for name, help_text in (('latency', "响应延迟（秒）"), ('jitter', "随机附加延迟上限（秒）"),
+                            ('error-rate', "503比例"), ('forbidden-rate', "403比例"), ('throttle-rate', "429比例")):
+        parser.add_argument(f'--{name}', type=float, default=0.0, help=f"所有站点的{help_text}")
+        for site in SITES:
+            parser.add_argument(f'--{site}-{name}', type=float, help=f"{site} 的{help_text}")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=list(DEFAULT_CONCURRENCY_LEVELS),
+                        help="压测的并发数，可指定多个")
+    parser.add_argument('--lookups', type=int, default=200, help="每轮压测查询的电影数")
+    parser.add_argument('--max-retries', type=int, default=0, help="5xx响应的重试次数")
+    parser.add_argument('--output', help="压测结果JSON文件")
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, behaviors_from_args(args), args.seed)
+    with server:
+        print(f"替身服务器已启动: {server.root}")
+        if args.command == 'serve':
+            print(f"BoxOfficeScraper(base_urls={server.base_urls()!r})")
+            try:
+                server.thread.join()
+            except KeyboardInterrupt:
+                print("\n已停止")
+            return
+
+        reports = []
+        for concurrency in args.concurrency:
+            report = run_load_test(server, concurrency, args.lookups, max_retries=args.max_retries)
+            print_report(report)
+            reports.append(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
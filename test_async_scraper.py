@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import tempfile
+import time
+
+from async_scraper import AsyncBoxOfficeScraper
+from fixture_site import MOVIES, start_fixture_site
+from negative_cache import MISS_NO_RESULTS, SOURCE_IMDB, NegativeCache
+from rating_memo import RatingMemo
+from standin_server import make_async_scraper, make_scraper
+
+
+def test_async_scrape_months():
+    """测试在一个事件循环中并发抓取多个月份"""
+    print("=== 测试异步抓取 ===")
+
+    # 每个请求延时0.2秒
+    server = start_fixture_site(delay=0.2)
+
+    async def run():
+        memo = RatingMemo()
+        async with make_async_scraper(server, rating_memo=memo) as scraper:
+            results = await scraper.scrape_months([(2025, 4), (2025, 5), (2025, 6)])
+            return results, memo
+
+    try:
+        start = time.monotonic()
+        results, memo = asyncio.run(run())
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # 串行需要 3个月 * (1 + 3部 * 3个请求) * 0.2秒 ≈ 6秒
+    print(f"3个月耗时: {elapsed:.2f}秒")
+    assert elapsed < 3
+
+    for key, rows in results.items():
+        assert len(rows) == len(MOVIES), key
+        sinners = rows[0]
+        assert sinners['英文片名'] == "Sinners"
+        assert sinners['IMDb评分'] == "7.8"
+        assert sinners['中文片名'] == "罪人"  # 豆瓣403后使用静态映射
+        assert sinners['首映日期'] == "4月18日"
+        assert rows[1]['IMDb评分'] == "5.7"
+    print("✅ 各月份数据正确")
+
+
+def test_lookups_off_event_loop():
+    """测试同步的SQLite查询在线程中执行，慢查询不会阻塞事件循环中的其他电影"""
+    print("\n=== 测试SQLite查询不阻塞事件循环 ===")
+
+    titles = ["Lost Film 1", "Lost Film 2", "Lost Film 3", "Lost Film 4"]
+    with tempfile.TemporaryDirectory() as tmp:
+        negative_cache = NegativeCache(os.path.join(tmp, 'negative.sqlite3'))
+        for title in titles:
+            negative_cache.put(SOURCE_IMDB, title, 2025, MISS_NO_RESULTS)
+        lookup = negative_cache.get
+
+        def slow_get(source, movie_title, target_year):
+            time.sleep(0.2)  # 模拟磁盘繁忙时的慢查询
+            return lookup(source, movie_title, target_year)
+
+        negative_cache.get = slow_get
+
+        async def run():
+            async with AsyncBoxOfficeScraper(negative_cache=negative_cache) as scraper:
+                return await asyncio.gather(*(scraper.search_imdb_rating(title, 2025) for title in titles))
+
+        start = time.monotonic()
+        assert asyncio.run(run()) == ["N/A"] * len(titles)
+        elapsed = time.monotonic() - start
+
+    # 在事件循环中直接查询需要 4 * 0.2秒
+    print(f"4次慢查询耗时: {elapsed:.2f}秒")
+    assert elapsed < 0.6
+    print("✅ 慢查询并行执行，事件循环没有被阻塞")
+
+
+def test_same_bookkeeping_as_sync():
+    """测试异步引擎与同步抓取器走相同的匹配和失败原因判定，记录相同的指标"""
+    print("\n=== 测试异步与同步结果一致 ===")
+
+    counters = [('imdb_result_total', {'result': 'found'}), ('imdb_candidates_tried_total', {}),
+                ('douban_online_failures_total', {'reason': 'forbidden'}), ('douban_lookup_total', {'path': 'static'})]
+    server = start_fixture_site()
+    try:
+        scraper = make_scraper(server)
+        sync_rows = scraper.scrape_monthly_data(2025, 4)
+        sync_counts = [scraper.metrics.counter_value(name, **labels) for name, labels in counters]
+        scraper.close()
+
+        async def run():
+            async with make_async_scraper(server) as async_scraper:
+                assert async_scraper.parser.sessions is None and async_scraper.parser.rate_limiter is None
+                rows = await async_scraper.scrape_monthly_data(2025, 4)
+                metrics = async_scraper.parser.metrics
+                return rows, [metrics.counter_value(name, **labels) for name, labels in counters]
+
+        async_rows, async_counts = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert async_rows == sync_rows
+    assert async_counts == sync_counts and sync_counts[0] == len(MOVIES)
+    print(f"✅ 结果和指标一致: {dict(zip((name for name, _ in counters), sync_counts))}")
+
+
+if __name__ == "__main__":
+    test_async_scrape_months()
+    test_lookups_off_event_loop()
+    test_same_bookkeeping_as_sync()
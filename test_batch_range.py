@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_scraper import parse_month_span, split_work_units
+from rate_limiter import SharedHostRateLimiter
+
+
+WORKER_LIMITER = None
+
+
+def init_limiter(rate_limiter):
+    global WORKER_LIMITER
+    WORKER_LIMITER = rate_limiter
+
+
+def acquire_tokens(count):
+    for _ in range(count):
+        WORKER_LIMITER.acquire("https://www.example.com/page")
+    return count
+
+
+def test_month_span():
+    """测试年月范围解析和工作单元切分"""
+    print("=== 测试年月范围 ===")
+
+    months = parse_month_span("1990-01..2025-06")
+    assert len(months) == 35 * 12 + 6
+    assert months[0] == (1990, 1) and months[-1] == (2025, 6)
+    assert (1990, 12) in months and (1991, 1) in months
+    assert parse_month_span("2024-11..2025-02") == [(2024, 11), (2024, 12), (2025, 1), (2025, 2)]
+    assert parse_month_span("2025-05") == [(2025, 5)]
+
+    units = split_work_units(months, 12)
+    assert len(units) == 36
+    assert sum(len(unit) for unit in units) == len(months)
+    assert units[-1] == [(2025, m) for m in range(1, 7)]
+    print(f"✅ {len(months)} 个月切分为 {len(units)} 个工作单元")
+
+    for bad in ("2025-13", "2025/05", "2025-06..2025-01"):
+        try:
+            parse_month_span(bad)
+            assert False, bad
+        except ValueError as e:
+            print(f"✅ 拒绝无效范围: {e}")
+
+
+def test_shared_rate_limit():
+    """测试多个进程共享同一个站点限速"""
+    print("\n=== 测试跨进程共享限速 ===")
+
+    rate = 20.0
+    limiter = SharedHostRateLimiter({'example.com': rate})
+    processes, per_process = 4, 10
+
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_limiter, initargs=(limiter,)) as executor:
+        total = sum(executor.map(acquire_tokens, [per_process] * processes))
+    elapsed = time.monotonic() - start
+
+    # 各进程独立限速只需约 0.5秒；共享限速时合计40个请求至少需要约 (40-1)/20 秒
+    print(f"{processes} 个进程共 {total} 个请求耗时: {elapsed:.2f}秒")
+    assert elapsed >= (total - 1) / rate * 0.9
+
+
+if __name__ == "__main__":
+    test_month_span()
+    test_shared_rate_limit()
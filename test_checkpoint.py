@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from batch_scraper import scrape_month_checkpointed
+from checkpoint import MonthCheckpoint
+from fixture_site import MOVIES, start_fixture_site
+from standin_server import make_scraper
+
+
+def test_resume_after_interrupt():
+    """测试中断后从上次停下的电影继续，已完成的月份直接跳过"""
+    print("=== 测试检查点续抓 ===")
+
+    server = start_fixture_site()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            checkpoint_dir = os.path.join(tmp, 'checkpoints')
+
+            # 第一次运行：抓到第3部电影时中断
+            scraper = make_scraper(server)
+            search = scraper.find_imdb_rating
+
+            def interrupted_search(title, year):
+                if title == 'Warfare':
+                    raise KeyboardInterrupt
+                return search(title, year)
+
+            scraper.find_imdb_rating = interrupted_search
+            try:
+                scrape_month_checkpointed(scraper, 2025, 4, checkpoint_dir, resume=False)
+                assert False, "应当被中断"
+            except KeyboardInterrupt:
+                pass
+
+            checkpoint = MonthCheckpoint(checkpoint_dir, 2025, 4)
+            assert sorted(checkpoint.movies) == [1, 2] and not checkpoint.done
+            assert not os.path.exists('data/boxoffice_2025_04.csv')
+            print("✅ 中断前完成的2部电影已写入检查点")
+
+            # 第二次运行：只查询第3部电影
+            server.requests.clear()
+            data, skipped = scrape_month_checkpointed(make_scraper(server), 2025, 4, checkpoint_dir, resume=True)
+            assert not skipped
+            assert dict(server.requests) == {'Warfare': 1}
+            assert [movie['IMDb评分'] for movie in data] == ['7.8', '5.7', '7.3']
+            assert data[0]['中文片名'] == '罪人'
+            assert os.path.exists('data/boxoffice_2025_04.csv')
+            assert MonthCheckpoint(checkpoint_dir, 2025, 4).done
+            print("✅ 续抓时只查询了未完成的电影")
+
+            # 第三次运行：整月已完成，直接读取CSV
+            server.requests.clear()
+            data, skipped = scrape_month_checkpointed(make_scraper(server), 2025, 4, checkpoint_dir, resume=True)
+            assert skipped and not server.requests
+            assert [movie['英文片名'] for movie in data] == [movie[0] for movie in MOVIES]
+            assert data[2]['IMDb评分'] == '7.3'
+            print("✅ 已完成的月份直接跳过")
+
+            # 不带 resume 时重新抓取
+            data, skipped = scrape_month_checkpointed(make_scraper(server), 2025, 4, checkpoint_dir, resume=False)
+            assert not skipped and sum(server.requests.values()) == 3
+            print("✅ 不续抓时重新抓取整月")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+
+def test_resume_replays_enriched_only():
+    """测试跳过已完成月份时，只把查询过评分的电影放入评分缓存，长尾电影不放入"""
+    print("\n=== 测试续抓时复用评分 ===")
+
+    server = start_fixture_site()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            checkpoint_dir = os.path.join(tmp, 'checkpoints')
+            scraper = make_scraper(server, enrich_limit=2)
+            scrape_month_checkpointed(scraper, 2025, 4, checkpoint_dir, resume=False)
+
+            scraper = make_scraper(server)
+            remembered = []
+            scraper.remember_ratings = lambda movie_data, year, *reasons: remembered.append(movie_data['英文片名'])
+            data, skipped = scrape_month_checkpointed(scraper, 2025, 4, checkpoint_dir, resume=True)
+            assert skipped and len(data) == 3
+            assert remembered == ['Sinners', 'A Minecraft Movie']
+            print("✅ 只复用查询过评分的2部电影")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+
+def test_truncated_checkpoint():
+    """测试检查点最后一行写了一半时忽略该行"""
+    print("\n=== 测试不完整的检查点 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = MonthCheckpoint(tmp, 2025, 5)
+        checkpoint.record_movie(1, {'英文片名': 'Sinners', 'IMDb评分': '7.8'})
+        with open(checkpoint.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "movie", "index": 2, "da')
+
+        reloaded = MonthCheckpoint(tmp, 2025, 5)
+        assert list(reloaded.movies) == [1]
+        movie = {'英文片名': 'Sinners', 'IMDb评分': 'N/A'}
+        assert reloaded.restore(1, movie) and movie['IMDb评分'] == '7.8'
+        assert not reloaded.restore(1, {'英文片名': 'Warfare'})
+        print("✅ 忽略不完整的记录，片名不一致时不恢复")
+
+
+if __name__ == "__main__":
+    test_resume_after_interrupt()
+    test_resume_replays_enriched_only()
+    test_truncated_checkpoint()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import contextlib
+import io
+import random
+import socket
+import time
+
+import aiohttp
+import requests
+
+from async_scraper import AsyncBoxOfficeScraper
+from circuit_breaker import (CircuitBreaker, CircuitOpenError, HostCircuitBreakers, STATE_CLOSED, STATE_HALF_OPEN,
+                             STATE_OPEN, backoff_delay, parse_retry_after)
+from standin_server import SiteBehavior, StandinServer, make_scraper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_states():
+    """测试熔断器的关闭、打开、半开转换"""
+    print("=== 测试熔断器状态 ===")
+
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60, clock=clock)
+    assert not breaker.record_failure() and not breaker.record_failure()
+    breaker.record_success()  # 成功后连续失败次数清零
+    assert not breaker.record_failure() and not breaker.record_failure()
+    assert breaker.allow() and breaker.state == STATE_CLOSED
+    assert breaker.record_failure() and breaker.state == STATE_OPEN
+    assert not breaker.allow() and breaker.retry_in() == 60
+    print("✅ 连续3次失败后打开")
+
+    clock.now = 60
+    assert breaker.allow() and breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()  # 半开时只放行一个探测请求
+    assert breaker.record_failure() and breaker.state == STATE_OPEN
+    clock.now = 120
+    assert breaker.allow()
+    assert breaker.record_success() and breaker.state == STATE_CLOSED and breaker.allow()
+    print("✅ 冷却期后半开探测：失败重新打开，成功关闭")
+
+    # Retry-After 超过冷却时间时延长冷却期
+    for _ in range(3):
+        breaker.record_failure(retry_after=300)
+    assert breaker.retry_in() == 300
+
+    breakers = HostCircuitBreakers(failure_threshold=1, clock=clock)
+    breakers.record_failure("https://www.douban.com/search?q=a")
+    try:
+        breakers.check("https://movie.douban.com/subject/1/")
+        assert False, "应当熔断"
+    except CircuitOpenError as e:
+        assert e.host == 'douban.com'
+    breakers.check("https://www.imdb.com/find?q=a")
+    assert breakers.states() == {'douban.com': STATE_OPEN, 'imdb.com': STATE_CLOSED}
+    print("✅ 按站点熔断，子域名共用")
+
+
+def test_backoff():
+    """测试退避时间和 Retry-After 解析"""
+    print("\n=== 测试退避 ===")
+
+    rng = random.Random(1)
+    for attempt in range(8):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt, base=0.5, cap=4, rng=rng) <= min(4, 0.5 * 2 ** attempt)
+    assert backoff_delay(0, retry_after=7, rng=rng) >= 7
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470) == 10
+    assert parse_retry_after("soon") is None and parse_retry_after(None) is None
+    print("✅ 全抖动指数退避，Retry-After 支持秒数和HTTP日期")
+
+
+def test_douban_fallback():
+    """测试豆瓣被拦截后熔断，后续电影直接使用静态映射"""
+    print("\n=== 测试豆瓣熔断 ===")
+
+    clock = FakeClock()
+    with StandinServer(behaviors={'douban': SiteBehavior(forbidden_rate=1.0)}) as server:
+        scraper = make_scraper(server, circuit_breakers=HostCircuitBreakers(failure_threshold=3, cooldown=60, clock=clock))
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        assert server.status_counts[('douban', 403)] == 3
+        metrics = scraper.metrics
+        assert metrics.counter_value('douban_online_failures_total', reason='circuit_open') == len(movies) - 3
+        assert metrics.counter_value('douban_lookup_total', path='static') == len(movies)
+        assert metrics.counter_value('circuit_breaker_transitions_total', site='127.0.0.1', state='open') == 1
+        print(f"✅ {len(movies)} 部电影只发出 3 次豆瓣请求，其余直接使用静态映射")
+
+        # 豆瓣恢复后，冷却期结束的探测请求成功即关闭熔断器
+        server.behaviors['douban'] = SiteBehavior()
+        clock.now = 61
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.search_douban_movie("Sinners", 2025) != ("N/A", "N/A")
+        assert scraper.circuit_breakers.states() == {'127.0.0.1': STATE_CLOSED}
+        scraper.close()
+    print("✅ 恢复后探测成功，熔断器关闭")
+
+
+def test_retry_after():
+    """测试429按退避重试，Retry-After 过长时不等待"""
+    print("\n=== 测试429重试 ===")
+
+    with StandinServer(behaviors={'douban': SiteBehavior(throttle_rate=1.0, retry_after=0)}) as server:
+        scraper = make_scraper(server, backoff_retries=2)
+        url = server.root + "/search?q=Sinners"
+        response = scraper.fetch_with_breaker(url)
+        assert response.status_code == 429 and server.status_counts[('douban', 429)] == 3
+        assert scraper.metrics.histogram_stats('backoff_wait_seconds', site='127.0.0.1')[0] == 2
+        scraper.close()
+    print("✅ 429重试2次后放弃，计一次熔断失败")
+
+    with StandinServer(behaviors={'douban': SiteBehavior(throttle_rate=1.0, retry_after=30)}) as server:
+        scraper = make_scraper(server, backoff_retries=2, max_backoff=10)
+        url = server.root + "/search?q=Sinners"
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(3):
+                scraper.fetch_with_breaker(url)
+        assert time.monotonic() - start < 5
+        assert server.status_counts[('douban', 429)] == 3
+        assert scraper.circuit_breakers.get_breaker(url).retry_in() > 55
+        scraper.close()
+    print("✅ Retry-After 30秒超过退避上限：不等待，3次后熔断")
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_connection_error():
+    """测试半开探测请求连接失败时重新打开熔断器，而不是一直停在半开状态"""
+    print("\n=== 测试探测请求连接失败 ===")
+
+    refused_url = f"http://127.0.0.1:{unused_port()}/search?q=Sinners"
+    clock = FakeClock()
+    with StandinServer() as server:
+        breakers = HostCircuitBreakers(failure_threshold=1, cooldown=60, clock=clock)
+        scraper = make_scraper(server, circuit_breakers=breakers)
+        breakers.record_failure(refused_url)
+
+        clock.now = 61
+        try:
+            scraper.fetch_with_breaker(refused_url)
+            assert False, "应当连接失败"
+        except requests.ConnectionError:
+            pass
+        assert breakers.states() == {'127.0.0.1': STATE_OPEN}
+
+        # 下一个冷却期结束后仍能探测，成功即关闭
+        clock.now = 122
+        assert scraper.fetch_with_breaker(server.root + "/search?q=Sinners").status_code == 200
+        assert breakers.states() == {'127.0.0.1': STATE_CLOSED}
+        scraper.close()
+    print("✅ 同步引擎：连接错误计为失败，释放探测请求")
+
+    async def probe():
+        async with AsyncBoxOfficeScraper(rate_limits={'127.0.0.1': 1000}) as scraper:
+            scraper.parser.circuit_breakers = breakers
+            try:
+                await scraper.fetch_with_breaker(refused_url)
+                assert False, "应当连接失败"
+            except aiohttp.ClientError:
+                pass
+
+    breakers = HostCircuitBreakers(failure_threshold=1, cooldown=60, clock=clock)
+    breakers.record_failure(refused_url)
+    clock.now = 183
+    asyncio.run(probe())
+    assert breakers.states() == {'127.0.0.1': STATE_OPEN}
+    clock.now = 244
+    assert breakers.get_breaker(refused_url).allow()
+    print("✅ 异步引擎：连接错误计为失败，释放探测请求")
+
+
+if __name__ == "__main__":
+    test_breaker_states()
+    test_backoff()
+    test_douban_fallback()
+    test_retry_after()
+    test_probe_connection_error()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+import columnar_export
+from columnar_export import (export_csv_files, export_rows, parse_gross, parse_rating,
+                             parse_release_date, read_columnar)
+from row_sinks import open_row_sink
+
+
+ROWS = [
+    {'排名': '1', '英文片名': 'Mufasa: The Lion King', '中文片名': '狮子王：木法沙传奇', '累计票房': '$254,567,693',
+     '首映日期': '12月20日', 'IMDb评分': '6.6', '豆瓣评分': '7.0'},
+    {'排名': '2', '英文片名': 'Den of Thieves 2: Pantera', '中文片名': 'N/A', '累计票房': '$36,458,621',
+     '首映日期': '1月10日', 'IMDb评分': '6.4', '豆瓣评分': 'N/A'},
+    {'排名': '3', '英文片名': 'One of Them Days', '中文片名': 'N/A', '累计票房': 'N/A',
+     '首映日期': 'N/A', 'IMDb评分': 'N/A', '豆瓣评分': 'N/A'},
+]
+
+
+def pyarrow_available():
+    if columnar_export.pa is None:
+        print("pyarrow 未安装，跳过列式导出测试")
+        return False
+    return True
+
+
+def test_parse_values():
+    """测试文本字段的类型转换"""
+    print("=== 测试字段解析 ===")
+
+    assert parse_gross("$344,684,243") == 344684243
+    assert parse_gross("N/A") is None and parse_gross("-") is None
+    assert parse_rating("7.0") == 7.0 and parse_rating("N/A") is None
+    # 1月榜单中12月上映的电影是上一年上映的
+    assert parse_release_date("12月20日", 2025, 1) == date(2024, 12, 20)
+    assert parse_release_date("5月23日", 2025, 5) == date(2025, 5, 23)
+    assert parse_release_date("Dec 20, 2024", 2025, 1) == date(2024, 12, 20)
+    assert parse_release_date("2月30日", 2025, 3) is None
+    assert parse_release_date("N/A", 2025, 3) is None
+    print("✅ 票房、评分、日期解析正确")
+
+
+def test_arrow_export():
+    """测试导出Arrow文件并内存映射读取"""
+    print("\n=== 测试Arrow导出 ===")
+    if not pyarrow_available():
+        return
+    pa = columnar_export.pa
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'boxoffice.arrow')
+        assert export_rows(ROWS, path, 2025, 1) == 3
+
+        table = read_columnar(path)
+        assert str(table.schema.field('累计票房').type) == 'int64'
+        assert str(table.schema.field('首映日期').type) == 'date32[day]'
+        assert table.column('累计票房').to_pylist() == [254567693, 36458621, None]
+        assert table.column('首映日期').to_pylist() == [date(2024, 12, 20), date(2025, 1, 10), None]
+        assert table.column('豆瓣评分').to_pylist() == [7.0, None, None]
+        assert table.column('中文片名').null_count == 2
+        assert table.column('年份').to_pylist() == [2025] * 3
+        print("✅ 列类型和缺失值正确")
+
+        # 内存映射读取不在进程内分配新的内存
+        before = pa.total_allocated_bytes()
+        pruned = read_columnar(path, columns=['年份', '月份', 'IMDb评分'])
+        assert pa.total_allocated_bytes() == before
+        assert pruned.column_names == ['年份', '月份', 'IMDb评分']
+        print("✅ 内存映射读取并只取需要的列")
+
+
+def test_parquet_and_csv():
+    """测试从已保存的CSV转换为Parquet，以及流式输出写入列式文件"""
+    print("\n=== 测试Parquet导出 ===")
+    if not pyarrow_available():
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        january = os.path.join(tmp, 'boxoffice_2025_01.csv')
+        pd.DataFrame(ROWS).to_csv(january, index=False, encoding='utf-8-sig')
+        ranged = os.path.join(tmp, 'batch.csv')
+        pd.DataFrame([{'年份': 2024, '月份': 5, **ROWS[1]}]).to_csv(ranged, index=False, encoding='utf-8-sig')
+
+        path = os.path.join(tmp, 'boxoffice.parquet')
+        assert export_csv_files([january, ranged], path) == 4
+        table = read_columnar(path, columns=['年份', '月份', '排名', '首映日期'])
+        assert table.column('月份').to_pylist() == [1, 1, 1, 5]
+        assert table.column('排名').to_pylist() == [1, 2, 3, 2]
+        assert table.column('首映日期').to_pylist()[0] == date(2024, 12, 20)
+        assert table.column('首映日期').to_pylist()[3] == date(2024, 1, 10)
+        print("✅ 单月CSV从文件名取年月，范围CSV使用年份月份列")
+
+        path = os.path.join(tmp, 'stream.arrow')
+        with open_row_sink(path, None, flush_rows=2) as sink:
+            sink.write_all({'年份': 2025, '月份': 1, **row} for row in ROWS)
+        table = read_columnar(path)
+        assert table.num_rows == 3 and len(table.column('排名').chunks) == 2
+        print("✅ 流式输出按批次写入列式文件")
+
+
+if __name__ == "__main__":
+    test_parse_values()
+    test_arrow_export()
+    test_parquet_and_csv()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from boxoffice_scraper import BoxOfficeScraper
+from rate_limiter import TokenBucket, HostRateLimiter, host_key
+
+
+class SlowLookupScraper(BoxOfficeScraper):
+    """用固定延时模拟网络查询的抓取器，不发起真实请求"""
+
+    def find_imdb_rating(self, movie_title, target_year=None):
+        time.sleep(0.2)
+        return f"imdb-{movie_title}", None
+
+    def find_douban_movie(self, movie_title, target_year=None):
+        time.sleep(0.2)
+        return f"中文-{movie_title}", f"douban-{movie_title}", None
+
+
+def test_host_key():
+    """测试站点域名归并"""
+    print("=== 测试站点域名归并 ===")
+
+    cases = [
+        ('https://movie.douban.com/subject/1/', 'douban.com'),
+        ('https://www.douban.com/search?q=x', 'douban.com'),
+        ('https://www.imdb.com/title/tt1/', 'imdb.com'),
+        ('http://127.0.0.1:8000/find?q=x', '127.0.0.1'),
+    ]
+
+    for url, expected in cases:
+        result = host_key(url)
+        status = "✅" if result == expected else "❌"
+        print(f"{status} {url} -> {result}")
+        assert result == expected
+
+
+def test_token_bucket():
+    """测试令牌桶限速"""
+    print("\n=== 测试令牌桶限速 ===")
+
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # 第一个令牌立即可用，其余4个各需等待 1/20 秒
+    print(f"5次请求耗时: {elapsed:.3f}秒 (期望约0.2秒)")
+    assert 0.15 <= elapsed < 0.5
+
+    limiter = HostRateLimiter({'imdb.com': 20, 'douban.com': 20})
+    assert limiter.get_bucket('imdb.com') is limiter.get_bucket('imdb.com')
+    assert limiter.get_bucket('imdb.com') is not limiter.get_bucket('douban.com')
+
+
+def test_concurrent_enrichment():
+    """测试并发补充评分信息"""
+    print("\n=== 测试并发补充评分信息 ===")
+
+    movies = [
+        {'排名': str(i + 1), '英文片名': f"Movie {i + 1}", '中文片名': "N/A",
+         '累计票房': "$1", '首映日期': "N/A", 'IMDb评分': "N/A", '豆瓣评分': "N/A"}
+        for i in range(10)
+    ]
+
+    scraper = SlowLookupScraper(concurrent=True, max_workers=20)
+    start = time.monotonic()
+    scraper.enrich_movies_concurrently(movies, 2025)
+    elapsed = time.monotonic() - start
+
+    # 串行需要 10 * 0.4 = 4秒，并发应接近单条查询的耗时
+    print(f"并发耗时: {elapsed:.2f}秒 (串行约4秒)")
+    assert elapsed < 1.5
+
+    for i, movie in enumerate(movies):
+        assert movie['排名'] == str(i + 1)
+        assert movie['IMDb评分'] == f"imdb-Movie {i + 1}"
+        assert movie['中文片名'] == f"中文-Movie {i + 1}"
+        assert movie['豆瓣评分'] == f"douban-Movie {i + 1}"
+    print("✅ 结果顺序与原始排名一致")
+
+
+if __name__ == "__main__":
+    test_host_key()
+    test_token_bucket()
+    test_concurrent_enrichment()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import string
+import time
+
+from boxoffice_scraper import BoxOfficeScraper
+from douban_matcher import DoubanTitleMatcher, extra_words, normalize_title, sequel_number
+
+
+def synthetic_titles(count, seed=0):
+    """生成由随机单词组成的不重复片名，模拟大规模映射表"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))).capitalize()
+                  for _ in range(5000)]
+    titles = {}
+    while len(titles) < count:
+        title = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+        titles[title.lower()] = title
+    return list(titles.values())
+
+
+def test_static_mapping_matches():
+    """测试静态映射表的精确匹配、部分匹配和年份选择"""
+    print("=== 测试静态映射匹配 ===")
+
+    scraper = BoxOfficeScraper()
+    cases = [
+        ('The Lion King', 1994, ('狮子王', '9.1')),
+        ('The Lion King', 2019, ('狮子王', '7.4')),
+        ('Batman', 2008, ('蝙蝠侠：黑暗骑士', '9.3')),
+        ('Lilo & Stitch', 2025, ('星际宝贝史迪奇', '7.2')),
+        ('Thunderbolts*', 2025, ('雷霆特攻队', '6.8')),
+        ('Furiosa: A Mad Max Saga', 2024, ('芙莉欧萨：疯狂的麦克斯传奇', '8.6')),
+        ('Mad Max', None, ('疯狂的麦克斯', '7.0')),
+        ('Friendship', 2025, ('N/A', 'N/A')),
+        # 模糊匹配：副标题、续集编号和年份差距
+        ('Mad Max: Fury Road', 2015, ('疯狂的麦克斯：狂暴之路', '8.6')),
+        ('Godzilla x Kong: The New Empire', 2024, ('哥斯拉大战金刚：新帝国', '6.3')),
+        ('Spiderman', 2002, ('蜘蛛侠', '7.4')),
+        ('The Accountant 2', 2025, ('N/A', 'N/A')),
+        ('Mission: Impossible - The Final Reckoning', 2025, ('N/A', 'N/A')),
+        ('Final Destination: Bloodlines', 2025, ('N/A', 'N/A')),
+        ('Superman Returns', 2006, ('N/A', 'N/A')),
+        # 多出副标题且年份对不上：同系列的其他作品
+        ('Mufasa: The Lion King', 2024, ('N/A', 'N/A')),
+        ('Spider-Man: No Way Home', 2021, ('N/A', 'N/A')),
+        ('Lion King', 2019, ('狮子王', '7.4')),
+    ]
+
+    for title, year, expected in cases:
+        result = scraper.search_douban_static_mapping(title, year)
+        status = "✅" if result == expected else "❌"
+        print(f"{status} {title} ({year}) -> {result}")
+        assert result == expected
+
+    # 匹配器在进程内只构建一次
+    assert scraper.get_douban_matcher() is BoxOfficeScraper().get_douban_matcher()
+
+
+def test_matcher_scales():
+    """测试映射表增长到数万条时查询仍在1毫秒以内"""
+    print("\n=== 测试大规模映射表查询 ===")
+
+    titles = synthetic_titles(50000)
+    mapping = {title: [(f"电影{i}", '7.0', 1950 + i % 75)] for i, title in enumerate(titles)}
+    mapping['The Lion King'] = [('狮子王', '9.1', 1994), ('狮子王', '7.4', 2019)]
+
+    start = time.perf_counter()
+    matcher = DoubanTitleMatcher(mapping)
+    print(f"构建 {len(matcher)} 条索引耗时: {time.perf_counter() - start:.2f}秒")
+
+    queries = ['The Lion King', titles[123] + ' 2', titles[4567] + ': The Return', 'Unknown Movie Title', 'Lion King']
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            if not matcher.exact(query):
+                matcher.search(query, 2000)
+    per_lookup_ms = (time.perf_counter() - start) / (rounds * len(queries)) * 1000
+    print(f"平均每次查询: {per_lookup_ms:.3f}毫秒")
+    assert per_lookup_ms < 2.0
+
+    assert matcher.exact('the lion king').nearest_version(2020)[1] == '7.4'
+    assert [entry.key for _, entry, _ in matcher.search('Lion King')] == ['The Lion King']
+    assert matcher.search(titles[4567] + ': The Return')[0][1].key == titles[4567]
+    assert normalize_title('Lilo & Stitch') == normalize_title('lilo stitch')
+
+    assert extra_words(normalize_title('Mufasa: The Lion King'), normalize_title('The Lion King')) == {'mufasa'}
+    assert not extra_words(normalize_title('Lion King'), normalize_title('The Lion King'))
+    assert not matcher.search('Mufasa: The Lion King', 2024)
+
+
+def test_sequel_numbers():
+    """测试续集编号识别"""
+    print("\n=== 测试续集编号 ===")
+
+    cases = {
+        'The Accountant 2': 2,
+        'Frozen II': 2,
+        'John Wick: Chapter 4': 4,
+        'Dune: Part Two': 2,
+        'Blade Runner 2049': 1,
+        'Big Hero 6': 6,
+        'Mission: Impossible - The Final Reckoning': 1,
+        'Up': 1,
+    }
+    for title, expected in cases.items():
+        result = sequel_number(normalize_title(title))
+        status = "✅" if result == expected else "❌"
+        print(f"{status} {title} -> {result}")
+        assert result == expected
+
+
+if __name__ == "__main__":
+    test_static_mapping_matches()
+    test_matcher_scales()
+    test_sequel_numbers()
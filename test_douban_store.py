@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import time
+
+from douban_store import DoubanMappingStore, read_mapping_csv, write_mapping_csv
+
+
+def synthetic_titles(count, seed=0):
+    """生成由随机单词组成的不重复片名，模拟大规模映射表"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))).capitalize()
+                  for _ in range(5000)]
+    titles = {}
+    while len(titles) < count:
+        title = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+        titles[title.lower()] = title
+    return list(titles.values())
+
+
+def test_import_and_lookup():
+    """测试从CSV导入映射行后按需查询"""
+    print("=== 测试映射数据文件 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'rows.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("英文片名,中文片名,豆瓣评分,年份\n")
+            f.write("The Lion King,狮子王,9.1,1994\n")
+            f.write("The Lion King,狮子王,7.4,2019\n")
+            f.write("Mad Max,疯狂的麦克斯,7.0,1979\n")
+            f.write("Up,飞屋环游记,9.0,2009\n")
+
+        store_path = os.path.join(tmp, 'mapping.sqlite3')
+        writer = DoubanMappingStore(store_path, writable=True)
+        assert writer.merge_rows(read_mapping_csv(csv_path)) == (3, 4)
+        # 重复导入不产生新版本，评分变化时更新
+        assert writer.merge_rows([('the lion king', '狮子王', '7.5', 2019), ('Up', '飞屋环游记', '9.0', 2009)]) == (0, 1)
+        writer.close()
+
+        store = DoubanMappingStore(store_path)
+        assert store.conn is None  # 首次查询时才打开
+        entry = store.exact('THE LION KING')
+        assert entry.key == 'The Lion King'
+        assert entry.nearest_version(2024) == ('狮子王', '7.5', 2019)
+        assert [e.key for _, e, _ in store.search('Mad Max: Fury Road')] == ['Mad Max']
+        assert store.search('Mad Max 2') == []  # 续集编号不同
+        assert store.search('Superman') == []
+        assert store.stats() == {'entries': 3, 'versions': 4, 'schema_version': 2}
+
+        export_path = os.path.join(tmp, 'export.csv')
+        write_mapping_csv(store.to_mapping(), export_path)
+        assert len(read_mapping_csv(export_path)) == 4
+        store.close()
+        print("✅ 导入、合并、查询和导出正确")
+
+        # 数据格式版本不符时拒绝读取
+        conn = sqlite3.connect(store_path)
+        conn.execute("PRAGMA user_version = 99")
+        conn.close()
+        try:
+            DoubanMappingStore(store_path).exact('Up')
+            assert False, "应当拒绝未知版本"
+        except ValueError as e:
+            print(f"✅ 拒绝未知版本: {e}")
+
+
+def test_large_catalog():
+    """测试十万条映射时的查询耗时"""
+    print("\n=== 测试大规模映射数据文件 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'mapping.sqlite3')
+        titles = synthetic_titles(100000)
+        rows = [(title, f"电影{i}", '7.0', 1950 + i % 75) for i, title in enumerate(titles)]
+        start = time.perf_counter()
+        writer = DoubanMappingStore(store_path, writable=True)
+        writer.merge_rows(rows)
+        writer.close()
+        print(f"导入 {len(rows)} 行耗时: {time.perf_counter() - start:.2f}秒")
+
+        store = DoubanMappingStore(store_path)
+        queries = [titles[123], titles[123] + ' 2', titles[4567] + ': The Return', 'Unknown Movie Title']
+        rounds = 100
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for query in queries:
+                if not store.exact(query):
+                    store.search(query, 2000)
+        per_lookup_ms = (time.perf_counter() - start) / (rounds * len(queries)) * 1000
+        print(f"平均每次查询: {per_lookup_ms:.3f}毫秒")
+        assert per_lookup_ms < 5.0
+        assert store.search(titles[4567] + ': The Return')[0][1].key == titles[4567]
+        store.close()
+
+
+if __name__ == "__main__":
+    test_import_and_lookup()
+    test_large_catalog()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试不构建soup的快速提取：详情页结构化数据（JSON-LD）和月度榜单表格
+"""
+
+import contextlib
+import io
+import time
+from datetime import date
+
+from benchmark_suite import extraction_savings, load_fixture, run_suite
+from boxoffice_scraper import BoxOfficeScraper, EXTRACT_JSONLD, EXTRACT_SELECTOR, PARSE_FULL, PARSE_PARTIAL
+from fast_extract import extract_jsonld_movie, extract_jsonld_rating, extract_month_table
+from standin_server import StandinServer
+
+
+def test_extract_jsonld():
+    """测试定位和解码页面中的JSON-LD"""
+    print("=== 测试JSON-LD提取 ===")
+    assert extract_jsonld_movie(load_fixture('imdb_title.html')) == ("Sinners", "7.8")
+    assert extract_jsonld_movie(load_fixture('douban_subject.html')) == ("罪人 Sinners", "7.8")
+
+    # 整数评分、@graph 和多段脚本
+    page = (b'<script type="application/ld+json">{"@type": "BreadcrumbList"}</script>'
+            b'<script type=\'application/ld+json\'>{"@graph": [{"@type": "Movie", "name": "A &amp; B",'
+            b' "aggregateRating": {"ratingValue": 8}}]}</script>')
+    assert extract_jsonld_movie(page) == ("A & B", "8.0")
+
+    # 描述中的换行不影响解码；JSON不合法时仍能找到评分
+    assert extract_jsonld_rating('<script type="application/ld+json">{"description": "a\nb", '
+                                 '"aggregateRating": {"ratingValue": "6.5"}}</script>') == "6.5"
+    assert extract_jsonld_rating(b'<script type="application/ld+json">{"name": "a "b"", '
+                                 b'"aggregateRating": {"ratingValue": "5.9"}}</script>') == "5.9"
+
+    # 尚无评分或没有结构化数据
+    assert extract_jsonld_rating(b'<script type="application/ld+json">{"aggregateRating": '
+                                 b'{"ratingValue": ""}}</script>') is None
+    assert extract_jsonld_movie(b'<html><body>none</body></html>') == (None, None)
+    print("✅ 各种结构化数据格式提取正确")
+
+
+def test_fallback_to_selectors():
+    """测试没有结构化数据时回退到CSS选择器，并记录提取路径"""
+    print("\n=== 测试提取路径 ===")
+    for mode in (PARSE_FULL, PARSE_PARTIAL):
+        scraper = BoxOfficeScraper(parse_mode=mode)
+        assert scraper.resolve_imdb_rating_page(load_fixture('imdb_title.html')) == ("7.8", EXTRACT_JSONLD)
+        assert scraper.resolve_douban_movie_details(load_fixture('douban_subject.html')) == (
+            "罪人 Sinners", "7.8", EXTRACT_JSONLD)
+
+        legacy = b'<html><body><div class="ratingValue"><strong title="8.5"><span>8.5</span></strong></div></body></html>'
+        assert scraper.resolve_imdb_rating_page(legacy) == ("8.5", EXTRACT_SELECTOR)
+        # 结构化数据中没有评分时，按CSS选择器查找
+        page = ('<html><head><script type="application/ld+json">{"name": "如果", "aggregateRating": '
+                '{"ratingValue": ""}}</script></head><body><h1><span>如果</span></h1>'
+                '<strong class="ll rating_num">6.7</strong></body></html>').encode('utf-8')
+        assert scraper.resolve_douban_movie_details(page) == ("如果", "6.7", EXTRACT_SELECTOR)
+
+        metrics = scraper.metrics
+        assert metrics.counter_value('rating_extract_total', site='imdb', path=EXTRACT_JSONLD) == 1
+        assert metrics.counter_value('rating_extract_total', site='douban', path=EXTRACT_SELECTOR) == 1
+    print("✅ 两种解析模式下都优先使用结构化数据")
+
+
+def test_standin_end_to_end():
+    """测试替身服务器上的完整查询全部走JSON-LD路径"""
+    print("\n=== 测试端到端提取 ===")
+    with StandinServer() as server:
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                   parse_mode=PARSE_PARTIAL, max_retries=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        assert all(movie['IMDb评分'] != "N/A" and movie['豆瓣评分'] != "N/A" for movie in movies)
+        metrics = scraper.metrics
+        assert metrics.counter_value('rating_extract_total', site='imdb', path=EXTRACT_JSONLD) == len(movies)
+        assert metrics.counter_value('rating_extract_total', site='douban', path=EXTRACT_JSONLD) == len(movies)
+        assert metrics.counter_value('rating_extract_total', site='imdb', path=EXTRACT_SELECTOR) == 0
+        scraper.close()
+    print(f"✅ {len(movies)} 部电影的详情页都未构建soup")
+
+
+def test_benchmark_savings():
+    """测试基准测试中JSON-LD路径每页节省的CPU时间"""
+    print("\n=== 测试CPU节省 ===")
+    results = run_suite(iterations=3, cases=['imdb_title', 'imdb_title_css', 'douban_detail', 'douban_detail_css'])
+    savings = extraction_savings(results)
+    assert len(savings) == 4
+    for case, mode, selector_us, fast_us, saved in savings:
+        assert saved > 0.5, (case, mode, selector_us, fast_us)
+        print(f"  {case:<14} {mode:<8} {selector_us:>9.1f} -> {fast_us:>6.1f} 微秒/页")
+    print("✅ JSON-LD路径每页CPU时间远低于CSS选择器")
+
+
+def test_month_table():
+    """测试月度榜单表格的带类型行"""
+    print("\n=== 测试月度榜单表格 ===")
+    html = load_fixture('bom_month.html')
+    rows = extract_month_table(html, 2025, 5)
+    assert len(rows) == 120
+    assert rows[0] == {'排名': 1, '英文片名': "Lilo & Stitch",
+                       '链接': "https://www.boxofficemojo.com/release/rl6820221993/",
+                       '累计票房': 207499545, '首映日期': date(2025, 5, 23)}
+    assert rows[-1]['排名'] == 120 and rows[-1]['英文片名'] == "Paper Iron"
+    assert len(extract_month_table(html, limit=5)) == 5
+    assert extract_month_table(html)[0]['首映日期'] is None
+
+    # 没有类名和链接、带tbody的表格；1月榜单中12月上映的电影属于上一年
+    page = ('<html><body><table><tbody><tr><th>Rank</th></tr>'
+            '<tr><td>1</td><td> Old  Film </td><td></td><td></td><td></td><td></td><td></td>'
+            '<td>$1,234</td><td>Dec 20</td></tr><tr><td>2</td><td>short row</td></tr></tbody></table></body></html>')
+    assert extract_month_table(page, 2025, 1) == [
+        {'排名': 1, '英文片名': "Old  Film", '链接': None, '累计票房': 1234, '首映日期': date(2024, 12, 20)}]
+    assert extract_month_table(b'') == [] and extract_month_table(b'<html><body>none</body></html>') == []
+    print("✅ 排名、链接、票房和首映日期均为对应类型")
+
+
+def test_month_table_matches_soup():
+    """测试局部模式的榜单解析与完整解析结果一致，并且更快"""
+    print("\n=== 测试榜单解析 ===")
+    html = load_fixture('bom_month.html')
+    elapsed = {}
+    for mode in (PARSE_FULL, PARSE_PARTIAL):
+        scraper = BoxOfficeScraper(parse_mode=mode, top_n=None)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.parse_monthly_table(html)
+        elapsed[mode] = time.perf_counter() - start
+        if mode == PARSE_FULL:
+            expected = movies
+    assert movies == expected and len(movies) == 120
+    assert elapsed[PARSE_PARTIAL] < elapsed[PARSE_FULL] / 2, elapsed
+    print(f"✅ 整张榜单: 完整解析 {elapsed[PARSE_FULL] * 1000:.1f}ms，lxml {elapsed[PARSE_PARTIAL] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_extract_jsonld()
+    test_fallback_to_selectors()
+    test_standin_end_to_end()
+    test_benchmark_savings()
+    test_month_table()
+    test_month_table_matches_soup()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试整张榜单抓取：top_n、只抓取票房表格和长尾电影的延后补充
+"""
+
+import contextlib
+import io
+
+from batch_scraper import parse_top_n
+from benchmark_suite import load_fixture
+from boxoffice_scraper import BoxOfficeScraper
+from standin_server import StandinServer, make_scraper
+
+
+def test_top_n():
+    """测试按 top_n 截取榜单"""
+    print("=== 测试榜单行数 ===")
+    html = load_fixture('bom_month.html')
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert len(BoxOfficeScraper().parse_monthly_table(html)) == 10
+        assert len(BoxOfficeScraper(top_n=25).parse_monthly_table(html)) == 25
+        movies = BoxOfficeScraper(top_n=None).parse_monthly_table(html)
+    assert len(movies) == 120
+    assert movies[-1]['排名'] == '120' and movies[-1]['英文片名'] == 'Paper Iron'
+    assert parse_top_n('all') is None and parse_top_n('50') == 50
+    print("✅ 默认前10名，top_n=None 时取整张榜单（120部）")
+
+
+def test_table_only():
+    """测试只抓取票房表格：整张榜单只有一次请求"""
+    print("\n=== 测试只抓取票房表格 ===")
+    with StandinServer() as server:
+        scraper = make_scraper(server, top_n=None, enrich_limit=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        assert len(movies) == 120
+        assert sum(server.status_counts.values()) == 1
+        assert all(movie['IMDb评分'] == "N/A" for movie in movies)
+        scraper.close()
+    print("✅ 120部电影只请求一次月度榜单")
+
+
+def test_deferred_enrichment():
+    """测试只为前几名查询评分，长尾电影稍后补充"""
+    print("\n=== 测试长尾电影延后补充 ===")
+    with StandinServer() as server:
+        scraper = make_scraper(server, top_n=None, enrich_limit=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        assert len(movies) == 120
+        assert [movie['排名'] for movie in movies[:5]] == ['1', '2', '3', '4', '5']
+        assert all(movie['IMDb评分'] != "N/A" for movie in movies[:3])
+        assert all(movie['IMDb评分'] == "N/A" and movie['中文片名'] == "N/A" for movie in movies[3:])
+        # 每部电影一次IMDb搜索和一次详情页
+        assert server.status_counts[('imdb', 200)] == 6
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.enrich_movies(movies[:8], 2025) == 5
+        assert all(movie['IMDb评分'] != "N/A" for movie in movies[:8])
+        assert server.status_counts[('imdb', 200)] == 16
+        scraper.close()
+    print("✅ 前3名立即查询评分，之后补充的5部不重复查询已有结果")
+
+
+if __name__ == "__main__":
+    test_top_n()
+    test_table_only()
+    test_deferred_enrichment()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from boxoffice_scraper import BoxOfficeScraper
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """返回固定内容并保持连接的本地测试服务"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = f"<html><body>{self.path}</body></html>".encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_connection_reuse():
+    """测试同一主机的请求复用keep-alive连接"""
+    print("=== 测试连接复用 ===")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000})
+
+        for i in range(20):
+            response = scraper.fetch_page(f"{base}/page/{i}")
+            assert response.status_code == 200
+            assert f"/page/{i}" in response.text
+
+        stats = scraper.connection_stats()
+        print(f"连接统计: {stats}")
+        host_stats = stats[f"127.0.0.1:{server.server_address[1]}"]
+        assert host_stats['requests'] == 20
+        assert host_stats['new'] == 1
+        assert host_stats['reused'] == 19
+        print("✅ 20次请求只建立了1个连接")
+
+        scraper.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_connection_reuse()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试离线IMDb数据集
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmark_suite import FIXTURES_DIR
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from imdb_dataset import ImdbDataset, ingest_dumps, normalize_title, parse_max_year_diff
+from standin_server import SiteBehavior, StandinServer
+
+
+BASICS_SAMPLE = os.path.join(FIXTURES_DIR, 'imdb_title.basics.sample.tsv.gz')
+RATINGS_SAMPLE = os.path.join(FIXTURES_DIR, 'imdb_title.ratings.sample.tsv.gz')
+
+
+def ingest_sample(directory):
+    path = os.path.join(directory, 'imdb.sqlite3')
+    counts = ingest_dumps(BASICS_SAMPLE, RATINGS_SAMPLE, path)
+    return path, counts
+
+
+def test_normalize_title():
+    """测试片名规范化"""
+    print("=== 测试片名规范化 ===")
+    assert normalize_title("Mission: Impossible - The Final Reckoning") == "mission impossible the final reckoning"
+    assert normalize_title("Thunderbolts*") == "thunderbolts"
+    assert normalize_title("Lilo & Stitch") == normalize_title("lilo and stitch")
+    assert normalize_title("Amélie") == "amelie"
+    assert normalize_title("  ***  ") == ""
+    print("✅ 标点、大小写、重音符号和 & 统一处理")
+
+
+def test_lookup():
+    """测试导入和按年份查询"""
+    print("\n=== 测试数据集查询 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path, counts = ingest_sample(tmp)
+        # 剧集不导入；原名与主片名不同时各一条
+        assert counts['titles'] == 12 and counts['ratings'] == 11
+        dataset = ImdbDataset(path)
+
+        assert dataset.lookup("Sinners", 2025) == ('tt31193180', "7.6")
+        assert dataset.lookup("Sinners", 1991) == ('tt0107562', "5.2")
+        assert dataset.lookup("Lilo & Stitch", 2025) == ('tt11655566', "7.0")
+        # 没有目标年份时取票数最多的版本
+        assert dataset.lookup("lilo and stitch") == ('tt0275847', "7.3")
+        assert dataset.lookup("Le Fabuleux Destin d'Amelie Poulain", 2001) == ('tt0211915', "8.3")
+        assert dataset.lookup("Untitled Sequel", 2026) == ('tt33071426', None)
+        assert dataset.lookup("Breaking Bad", 2008) is None
+        assert dataset.lookup("Not A Real Film", 2025) is None
+        print("✅ 年份最接近的版本优先，尚无评分和不存在的电影分别返回")
+
+        # 默认只接受与目标年份相差1年以内的版本，更远的交给在线搜索
+        assert dataset.lookup("Sinners", 2010) is None
+        loose = ImdbDataset(path, max_year_diff=None)
+        assert loose.lookup("Sinners", 2010) == ('tt31193180', "7.6")
+        loose.close()
+        assert parse_max_year_diff('any') is None and parse_max_year_diff('2') == 2
+        print("✅ 超出年份范围的版本视为未找到")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            dataset.lookup("Mission: Impossible - The Final Reckoning", 2025)
+        per_lookup = (time.perf_counter() - start) / 1000
+        assert per_lookup < 0.005
+        dataset.close()
+    print(f"✅ 每次查询 {per_lookup * 1e6:.0f} 微秒")
+
+
+def test_scraper_backend():
+    """测试抓取器优先使用数据集，数据集中没有评分时在线搜索"""
+    print("\n=== 测试评分后端 ===")
+    with tempfile.TemporaryDirectory() as tmp, StandinServer() as server:
+        path, _ = ingest_sample(tmp)
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                   parse_mode=PARSE_PARTIAL, max_retries=0, imdb_dataset=path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.search_imdb_rating("Sinners", 2025) == "7.6"
+            assert scraper.search_imdb_rating("Thunderbolts*", 2025) == "7.3"
+            assert sum(count for (site, _), count in server.status_counts.items() if site == 'imdb') == 0
+
+            # 数据集中没有的电影回退到在线搜索
+            assert scraper.search_imdb_rating("Friendship", 2025) != "N/A"
+            assert server.status_counts[('imdb', 200)] == 2
+
+            # 数据集中只有年份相差太远的同名电影时同样在线搜索
+            scraper.search_imdb_rating("Sinners", 2012)
+            assert server.status_counts[('imdb', 200)] > 2
+        metrics = scraper.metrics
+        assert metrics.counter_value('imdb_dataset_total', result='hit') == 2
+        assert metrics.counter_value('imdb_dataset_total', result='miss') == 2
+        scraper.close()
+    print("✅ 数据集命中时不发送请求，未命中或年份不符时在线搜索")
+
+
+if __name__ == "__main__":
+    test_normalize_title()
+    test_lookup()
+    test_scraper_backend()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from circuit_breaker import HostCircuitBreakers
+from metrics import MetricsRegistry
+from standin_server import SiteBehavior, StandinServer
+
+
+def test_registry():
+    """测试计数器、直方图、快照合并和两种导出格式"""
+    print("=== 测试指标集合 ===")
+
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.inc('http_requests_total', site='imdb.com', status=200, cache='miss')
+    metrics.inc('http_requests_total', 2, site='imdb.com', status=200, cache='miss')
+    metrics.observe('stage_seconds', 0.05, stage='imdb_search')
+    metrics.observe('stage_seconds', 0.5, stage='imdb_search')
+    metrics.observe('stage_seconds', 3.0, stage='imdb_search')
+    assert metrics.counter_value('http_requests_total', site='imdb.com', status='200', cache='miss') == 3
+    count, total = metrics.histogram_stats('stage_seconds', stage='imdb_search')
+    assert count == 3 and abs(total - 3.55) < 1e-9
+
+    other = MetricsRegistry(buckets=(0.1, 1.0))
+    other.inc('http_requests_total', site='imdb.com', status=200, cache='miss')
+    other.observe('stage_seconds', 0.2, stage='douban_static')
+    metrics.merge(json.loads(json.dumps(other.snapshot())))
+    assert metrics.counter_value('http_requests_total', site='imdb.com', status=200, cache='miss') == 4
+    assert metrics.histogram_stats('stage_seconds', stage='douban_static')[0] == 1
+    print("✅ 计数、直方图和跨进程合并正确")
+
+    text = metrics.to_prometheus()
+    assert '# TYPE boxoffice_http_requests_total counter' in text
+    assert 'boxoffice_http_requests_total{cache="miss",site="imdb.com",status="200"} 4' in text
+    assert 'boxoffice_stage_seconds_bucket{stage="imdb_search",le="0.1"} 1' in text
+    assert 'boxoffice_stage_seconds_bucket{stage="imdb_search",le="1.0"} 2' in text
+    assert 'boxoffice_stage_seconds_bucket{stage="imdb_search",le="+Inf"} 3' in text
+    assert 'boxoffice_stage_seconds_count{stage="imdb_search"} 3' in text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics.dump(os.path.join(tmp, 'run.prom'))
+        metrics.dump(os.path.join(tmp, 'run.json'))
+        with open(os.path.join(tmp, 'run.json'), encoding='utf-8') as f:
+            assert len(json.load(f)['histograms']) == 2
+    print("✅ Prometheus文本和JSON导出正确")
+
+
+def test_scraper_instrumentation():
+    """测试抓取一个月份后各阶段、请求和豆瓣回退路径的指标"""
+    print("\n=== 测试抓取指标 ===")
+
+    # 豆瓣全部返回403，所有电影都回退到静态映射（不熔断，每部电影都发出请求）
+    with StandinServer(behaviors={'douban': SiteBehavior(forbidden_rate=1.0)}) as server:
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                   parse_mode=PARSE_PARTIAL, max_retries=0,
+                                   circuit_breakers=HostCircuitBreakers(failure_threshold=1000))
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        scraper.close()
+
+    metrics = scraper.metrics
+    total = len(movies)
+    assert metrics.counter_value('movies_total') == total
+    for stage in ('month', 'month_page', 'month_parse'):
+        assert metrics.histogram_stats('stage_seconds', stage=stage)[0] == 1
+    for stage in ('imdb_search', 'imdb_select', 'douban_online', 'douban_static'):
+        assert metrics.histogram_stats('stage_seconds', stage=stage)[0] == total
+    assert metrics.counter_value('imdb_result_total', result='found') == total
+    assert metrics.counter_value('douban_lookup_total', path='static') == total
+    assert metrics.counter_value('douban_online_failures_total', reason='forbidden') == total
+    assert metrics.counter_value('http_requests_total', site='127.0.0.1', status=403, cache='off') == total
+    assert metrics.counter_value('http_response_bytes_total', site='127.0.0.1') > 0
+    static = sum(metrics.counter_value('douban_static_total', result=result) for result in ('exact', 'fuzzy', 'miss'))
+    assert static == total
+    print(f"✅ {total} 部电影: 各阶段计时 {total} 次，豆瓣全部走静态映射")
+
+
+if __name__ == "__main__":
+    test_registry()
+    test_scraper_instrumentation()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试当月榜单监视
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from month_watch import (CHANGE_DROPPED, CHANGE_NEW, CHANGE_UPDATED, WATCH_COLUMNS, MonthWatcher, diff_charts)
+from negative_cache import MISS_BLOCKED
+from row_sinks import open_row_sink
+from standin_server import StandinServer, make_scraper
+
+
+def movie(rank, title, gross):
+    return {'排名': rank, '英文片名': title, '中文片名': "N/A", '累计票房': gross,
+            '首映日期': "5月2日", 'IMDb评分': "N/A", '豆瓣评分': "N/A"}
+
+
+def test_diff_charts():
+    """测试榜单比较：新上榜、排名和票房变化、跌出榜单"""
+    print("=== 测试榜单比较 ===")
+    previous = [movie('1', "A", "$1,000"), movie('2', "B", "$900"), movie('3', "C", "$800")]
+    current = [movie('1', "B", "$1,500"), movie('2', "A", "$1,100"), movie('3', "D", "$700")]
+    changes = diff_charts(previous, current)
+    summary = [(item['变化'], item['英文片名'], item['排名'], item['上次排名'], item['票房增量']) for item in changes]
+    assert summary == [
+        (CHANGE_UPDATED, "B", '1', '2', 600),
+        (CHANGE_UPDATED, "A", '2', '1', 100),
+        (CHANGE_NEW, "D", '3', None, 700),
+        (CHANGE_DROPPED, "C", None, '3', 0),
+    ]
+    assert diff_charts(current, current) == []
+    print("✅ 变化按本次排名输出，跌出榜单的在最后")
+
+
+def test_watch_polls():
+    """测试条件请求轮询：未变化时只有一个304，变化时只为新上榜电影查询评分"""
+    print("\n=== 测试榜单监视 ===")
+    with tempfile.TemporaryDirectory() as tmp, StandinServer() as server:
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                   parse_mode=PARSE_PARTIAL, max_retries=0)
+        output = os.path.join(tmp, 'watch.jsonl')
+        with open_row_sink(output, WATCH_COLUMNS) as sink, contextlib.redirect_stdout(io.StringIO()):
+            watcher = MonthWatcher(scraper, 2025, 5, sink)
+            first = watcher.poll()
+            imdb_requests = server.status_counts[('imdb', 200)]
+            assert len(first) == 10 and all(item['变化'] == CHANGE_NEW for item in first)
+
+            assert watcher.watch(interval=0, max_polls=3, sleep=lambda seconds: None) == 3
+            assert server.status_counts[('boxoffice', 304)] == 3
+            assert server.status_counts[('imdb', 200)] == imdb_requests
+            print("✅ 榜单未变化时每次轮询只有一个304请求")
+
+            # 票房更新，一部新片替换第10名
+            page = server.pages.month_snapshot()[0]
+            page = page.replace(b'$74,148,275', b'$75,000,000').replace(b'Karate Kid: Legends', b'Ballerina')
+            server.pages.set_month(page)
+            changes = watcher.poll()
+
+        summary = {(item['变化'], item['英文片名']): item for item in changes}
+        assert set(summary) == {(CHANGE_UPDATED, 'Sinners'), (CHANGE_NEW, 'Ballerina'),
+                                (CHANGE_DROPPED, 'Karate Kid: Legends')}
+        assert summary[(CHANGE_UPDATED, 'Sinners')]['票房增量'] == 75000000 - 74148275
+        assert summary[(CHANGE_NEW, 'Ballerina')]['IMDb评分'] != "N/A"
+        # 只为新上榜的一部电影查询评分（IMDb搜索页 + 详情页）
+        assert server.status_counts[('imdb', 200)] == imdb_requests + 2
+        assert scraper.metrics.counter_value('watch_polls_total', result='not_modified') == 3
+        assert scraper.metrics.counter_value('watch_polls_total', result='changed') == 2
+        scraper.close()
+        print("✅ 票房更新后只为新上榜电影查询评分")
+
+        with open(output, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        assert len(rows) == 13
+        assert [row['变化'] for row in rows[-3:]] == [CHANGE_UPDATED, CHANGE_NEW, CHANGE_DROPPED]
+        assert all(row['时间'] for row in rows)
+    print("✅ 变化记录写入输出文件")
+
+
+def test_retry_transient_miss():
+    """测试暂时失败的"N/A"不沿用：榜单未变化时重新查询，查到后作为更新输出"""
+    print("\n=== 测试重新查询暂时失败的评分 ===")
+    with StandinServer() as server, contextlib.redirect_stdout(io.StringIO()):
+        scraper = make_scraper(server)
+        lookup = scraper.find_imdb_rating
+        blocked = ['Sinners']
+
+        def flaky_lookup(title, year):
+            if title in blocked:
+                blocked.remove(title)
+                return "N/A", MISS_BLOCKED
+            return lookup(title, year)
+
+        scraper.find_imdb_rating = flaky_lookup
+        watcher = MonthWatcher(scraper, 2025, 5)
+        first = {item['英文片名']: item for item in watcher.poll()}
+        assert first['Sinners']['IMDb评分'] == "N/A"
+
+        # 榜单未变化（304），只重新查询 Sinners
+        changes = watcher.poll()
+        assert [(item['变化'], item['英文片名']) for item in changes] == [(CHANGE_UPDATED, 'Sinners')]
+        assert changes[0]['IMDb评分'] != "N/A" and changes[0]['票房增量'] == 0
+        imdb_requests = server.status_counts[('imdb', 200)]
+
+        # 评分都已查到后，轮询不再查询
+        assert watcher.poll() == []
+        assert server.status_counts[('imdb', 200)] == imdb_requests
+        scraper.close()
+    print("✅ 下次轮询重新查到评分，之后不再查询")
+
+
+if __name__ == "__main__":
+    test_diff_charts()
+    test_watch_polls()
+    test_retry_transient_miss()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试查询失败缓存
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from async_scraper import AsyncBoxOfficeScraper
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from circuit_breaker import HostCircuitBreakers
+from negative_cache import (MISS_BLOCKED, MISS_NO_RATING, MISS_NO_RESULTS, SOURCE_DOUBAN, SOURCE_IMDB,
+                            BloomFilter, NegativeCache)
+from standin_server import SiteBehavior, StandinServer
+
+
+def test_bloom_filter():
+    """测试布隆过滤器没有漏判，误判率接近设定值"""
+    print("=== 测试布隆过滤器 ===")
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"title-{i}")
+    assert all(f"title-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300, false_positives
+    print(f"✅ 1000个元素全部命中，10000次不存在的查询误判 {false_positives} 次")
+
+
+def test_reasons_and_ttl():
+    """测试按原因的有效期、片名规范化和持久化"""
+    print("\n=== 测试失败原因和有效期 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'negative.sqlite3')
+        cache = NegativeCache(path, ttls={MISS_BLOCKED: 0.2})
+        cache.put(SOURCE_IMDB, "Obscure Film", 2025, MISS_NO_RESULTS)
+        cache.put(SOURCE_IMDB, "New Release", 2025, MISS_NO_RATING)
+        cache.put(SOURCE_DOUBAN, "New Release", 2025, MISS_BLOCKED)
+
+        assert cache.get(SOURCE_IMDB, "  obscure film ", 2025) == MISS_NO_RESULTS
+        assert cache.get(SOURCE_IMDB, "Obscure Film", 2024) is None
+        assert cache.get(SOURCE_DOUBAN, "Obscure Film", 2025) is None
+        assert cache.get(SOURCE_IMDB, "New Release", 2025) == MISS_NO_RATING
+        assert cache.get(SOURCE_DOUBAN, "New Release", 2025) == MISS_BLOCKED
+        print("✅ 按来源、规范化片名和年份记录失败原因")
+
+        time.sleep(0.3)
+        assert cache.get(SOURCE_DOUBAN, "New Release", 2025) is None
+        assert cache.get(SOURCE_IMDB, "New Release", 2025) == MISS_NO_RATING
+        print("✅ 被拦截的记录先过期，其他原因的记录仍有效")
+
+        stats = cache.stats()
+        assert stats['entries'] == {'imdb/no_results': 1, 'imdb/no_rating': 1}
+        assert stats['filtered'] >= 1
+        cache.close()
+
+        # 重新打开时清除过期记录，未过期的记录重新载入布隆过滤器
+        cache = NegativeCache(path)
+        assert cache.get(SOURCE_IMDB, "Obscure Film", 2025) == MISS_NO_RESULTS
+        cache.forget(SOURCE_IMDB, "Obscure Film", 2025)
+        assert cache.get(SOURCE_IMDB, "Obscure Film", 2025) is None
+        cache.close()
+    print("✅ 重新打开后记录仍在，可以手动删除")
+
+
+def test_repeat_scrape():
+    """测试重复抓取时跳过近期查询失败的电影"""
+    print("\n=== 测试重复抓取 ===")
+    behaviors = {'imdb': SiteBehavior(forbidden_rate=1.0), 'douban': SiteBehavior(forbidden_rate=1.0)}
+    with tempfile.TemporaryDirectory() as tmp, StandinServer(behaviors=behaviors) as server:
+        path = os.path.join(tmp, 'negative.sqlite3')
+
+        def scrape():
+            scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                       parse_mode=PARSE_PARTIAL, max_retries=0, negative_cache=path,
+                                       circuit_breakers=HostCircuitBreakers(failure_threshold=1000))
+            with contextlib.redirect_stdout(io.StringIO()):
+                movies = scraper.scrape_monthly_data(2025, 5)
+            return scraper, movies
+
+        scraper, movies = scrape()
+        imdb_blocked = server.status_counts[('imdb', 403)]
+        douban_blocked = server.status_counts[('douban', 403)]
+        assert imdb_blocked == len(movies)
+        writes = scraper.metrics.counter_value('negative_cache_writes_total', source='douban', reason='blocked')
+        assert 0 < writes < len(movies)  # 静态映射能查到的电影不记为失败
+        scraper.close()
+        print(f"✅ 第一次抓取: {len(movies)} 部电影全部被拦截，记录 IMDb {len(movies)} 条、豆瓣 {writes} 条")
+
+        scraper, repeat = scrape()
+        assert server.status_counts[('imdb', 403)] == imdb_blocked
+        assert server.status_counts[('douban', 403)] == douban_blocked + len(movies) - writes
+        assert scraper.metrics.counter_value('negative_cache_hits_total', source='imdb', reason='blocked') == len(movies)
+        assert [movie['豆瓣评分'] for movie in repeat] == [movie['豆瓣评分'] for movie in movies]
+        scraper.close()
+    print("✅ 第二次抓取不再请求IMDb，豆瓣只查询静态映射能查到的电影")
+
+
+def test_douban_static_after_miss():
+    """测试豆瓣失败记录只跳过在线搜索，静态映射中的电影仍能查到"""
+    print("\n=== 测试失败记录与静态映射 ===")
+    with tempfile.TemporaryDirectory() as tmp, StandinServer() as server:
+        path = os.path.join(tmp, 'negative.sqlite3')
+        negative_cache = NegativeCache(path)
+        negative_cache.put(SOURCE_DOUBAN, "Sinners", 2025, MISS_NO_RESULTS)
+        scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                   parse_mode=PARSE_PARTIAL, max_retries=0, negative_cache=negative_cache)
+        expected = scraper.search_douban_static_mapping("Sinners", 2025)
+        assert expected != ("N/A", "N/A")
+
+        assert scraper.search_douban_movie("Sinners", 2025) == expected
+        assert server.status_counts[('douban', 200)] == 0
+        assert scraper.metrics.counter_value('negative_cache_hits_total', source='douban',
+                                             reason=MISS_NO_RESULTS) == 1
+        scraper.close()  # 同时关闭查询失败缓存
+
+        async def search():
+            async with AsyncBoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                             negative_cache=path) as async_scraper:
+                return await async_scraper.search_douban_movie("Sinners", 2025)
+
+        assert asyncio.run(search()) == expected
+        assert server.status_counts[('douban', 200)] == 0
+    print("✅ 有失败记录时不在线搜索，直接使用静态映射（同步和异步引擎）")
+
+
+def test_shared_file_reload():
+    """测试多个进程共用数据库时，其他进程写入的失败记录在 reload 之后可见"""
+    print("\n=== 测试共用数据库与重新加载 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'negative.sqlite3')
+        first, second = NegativeCache(path), NegativeCache(path)
+        assert first.conn.execute('PRAGMA busy_timeout').fetchone()[0] == 30000
+
+        first.put(SOURCE_IMDB, "Lost Film", 2025, MISS_NO_RESULTS)
+        # 另一个连接的布隆过滤器里还没有这条记录
+        assert second.get(SOURCE_IMDB, "Lost Film", 2025) is None and second.filtered == 1
+        assert second.reload() == 1
+        assert second.get(SOURCE_IMDB, "Lost Film", 2025) == MISS_NO_RESULTS
+        print("✅ reload 后读到其他连接写入的失败记录")
+        first.close()
+        second.close()
+
+
+if __name__ == "__main__":
+    test_bloom_filter()
+    test_reasons_and_ttl()
+    test_repeat_scrape()
+    test_douban_static_after_miss()
+    test_shared_file_reload()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import json
+import os
+
+from benchmark_suite import build_report, compare_reports, run_suite
+from boxoffice_scraper import BoxOfficeScraper, PARSE_FULL, PARSE_PARTIAL
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(filename):
+    with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+        return f.read()
+
+
+def test_partial_parsing_matches_full():
+    """测试局部解析与完整解析的结果一致"""
+    print("=== 测试局部解析 ===")
+
+    full = BoxOfficeScraper(parse_mode=PARSE_FULL)
+    partial = BoxOfficeScraper(parse_mode=PARSE_PARTIAL)
+
+    search_html = load_fixture('imdb_search.html')
+    full_candidates = full.extract_imdb_candidates(search_html, 2025)
+    partial_candidates = partial.extract_imdb_candidates(search_html, 2025)
+    assert full_candidates == partial_candidates
+    assert partial_candidates[0]['title'] == "Sinners"
+    assert partial_candidates[0]['year'] == 2025
+    assert partial_candidates[0]['url'].startswith("https://www.imdb.com/title/tt31193180/")
+    print(f"✅ IMDb搜索页: {len(partial_candidates)} 个候选")
+
+    title_html = load_fixture('imdb_title.html')
+    assert full.parse_imdb_rating_page(title_html) == "7.8"
+    assert partial.parse_imdb_rating_page(title_html) == "7.8"
+    print("✅ IMDb详情页评分: 7.8")
+
+    douban_html = load_fixture('douban_subject.html')
+    assert full.parse_douban_movie_details(douban_html) == ("罪人 Sinners", "7.8")
+    assert partial.parse_douban_movie_details(douban_html) == ("罪人 Sinners", "7.8")
+    print("✅ 豆瓣详情页: 罪人 Sinners 7.8")
+
+
+def test_partial_parsing_legacy_layout():
+    """测试局部解析兼容旧版IMDb评分节点"""
+    print("\n=== 测试旧版页面结构 ===")
+
+    html = b'<html><body><div class="ratingValue"><strong title="8.5"><span>8.5</span></strong></div></body></html>'
+    partial = BoxOfficeScraper(parse_mode=PARSE_PARTIAL)
+    assert partial.parse_imdb_rating_page(html) == "8.5"
+
+    html = '<html><body><div class="movie-title"><h1>如果</h1></div><strong class="ll rating_num">6.7</strong></body></html>'.encode('utf-8')
+    assert partial.parse_douban_movie_details(html) == ("如果", "6.7")
+    print("✅ 旧版结构解析正确")
+
+
+def test_recorded_layouts():
+    """测试月度榜单、IMDb三种搜索页结构和豆瓣搜索页的夹具"""
+    print("\n=== 测试录制页面 ===")
+
+    for mode in (PARSE_FULL, PARSE_PARTIAL):
+        scraper = BoxOfficeScraper(parse_mode=mode)
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.parse_monthly_table(load_fixture('bom_month.html'))
+            layouts = [scraper.extract_imdb_candidates(load_fixture(filename), 2025)
+                       for filename in ('imdb_search_legacy.html', 'imdb_search.html', 'imdb_search_findresult.html')]
+            douban = scraper.extract_douban_candidates(load_fixture('douban_search.html'), 2025)
+
+        assert movies[0]['英文片名'] == 'Lilo & Stitch' and movies[0]['首映日期'] == '5月23日'
+        for candidates in layouts:
+            assert candidates[0]['title'] == 'Sinners' and candidates[0]['year'] == 2025
+            assert '/title/tt31193180/' in candidates[0]['url']
+        assert douban[0]['year'] == 2025 and '27071232' in douban[0]['url']
+    print("✅ 各页面结构解析正确")
+
+
+def test_benchmark_suite():
+    """测试基准测试的结果格式和对比"""
+    print("\n=== 测试基准测试 ===")
+
+    results = run_suite(iterations=1, cases=['bom_month_table', 'imdb_search_method1', 'douban_subject'])
+    assert len(results) == 6
+    by_case = {(row['case'], row['mode']): row for row in results}
+    assert by_case[('imdb_search_method1', PARSE_PARTIAL)]['result'] == "7.8"
+    assert by_case[('douban_subject', PARSE_FULL)]['result'] == ["罪人 Sinners", "7.8"]
+    for row in results:
+        assert row['pages_per_sec'] > 0 and row['us_per_row'] > 0 and row['peak_kb'] > 0
+
+    report = json.loads(json.dumps(build_report(results, 1)))
+    assert report['iterations'] == 1 and len(report['results']) == 6
+    assert len(compare_reports(report, report)) == 6
+    print("✅ 基准结果可序列化为JSON并与之前的结果对比")
+
+
+if __name__ == "__main__":
+    test_partial_parsing_matches_full()
+    test_partial_parsing_legacy_layout()
+    test_recorded_layouts()
+    test_benchmark_suite()
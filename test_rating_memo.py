@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from boxoffice_scraper import BoxOfficeScraper
+from negative_cache import MISS_BLOCKED, MISS_NO_RESULTS, SOURCE_DOUBAN, SOURCE_IMDB, NegativeCache
+from rating_memo import RatingMemo
+
+
+class CountingScraper(BoxOfficeScraper):
+    """记录查询次数、不发起真实请求的抓取器"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lookups = []
+
+    def find_imdb_rating(self, movie_title, target_year=None):
+        self.lookups.append(('imdb', movie_title))
+        return "7.8", None
+
+    def find_douban_movie(self, movie_title, target_year=None):
+        self.lookups.append(('douban', movie_title))
+        return "罪人", "7.8", None
+
+
+class MissingScraper(CountingScraper):
+    """每次都查不到，按 reasons 给出失败原因（None 表示网络错误等原因不确定的失败）"""
+
+    def __init__(self, reasons, **kwargs):
+        super().__init__(**kwargs)
+        self.reasons = reasons
+
+    def find_imdb_rating(self, movie_title, target_year=None):
+        self.lookups.append(('imdb', movie_title))
+        return "N/A", self.reasons[movie_title]
+
+    def find_douban_movie(self, movie_title, target_year=None):
+        self.lookups.append(('douban', movie_title))
+        return "N/A", "N/A", self.reasons[movie_title]
+
+
+def make_rows(titles):
+    return [
+        {'排名': str(i + 1), '英文片名': title, '中文片名': "N/A", '累计票房': "$1",
+         '首映日期': "N/A", 'IMDb评分': "N/A", '豆瓣评分': "N/A"}
+        for i, title in enumerate(titles)
+    ]
+
+
+def test_lru_eviction():
+    """测试LRU淘汰"""
+    print("=== 测试评分缓存LRU淘汰 ===")
+
+    memo = RatingMemo(max_size=2)
+    memo.put("Sinners", 2025, "7.8", "罪人", "7.8")
+    memo.put("A Minecraft Movie", 2025, "5.7", "我的世界", "5.5")
+    assert memo.get("sinners ", 2025) == ("7.8", "罪人", "7.8")  # Sinners 变为最近使用
+    memo.put("The Amateur", 2025, "6.6", "业余爱好者", "6.5")
+
+    assert memo.get("A Minecraft Movie", 2025) is None
+    assert memo.get("Sinners", 2025) is not None
+    assert memo.get("Sinners", 2024) is None  # 年份不同视为不同查询
+    assert len(memo) == 2
+    print("✅ 淘汰最久未使用的条目")
+
+
+def test_cross_month_reuse():
+    """测试跨月份重复上榜的电影只查询一次"""
+    print("\n=== 测试跨月份复用评分 ===")
+
+    for concurrent in (False, True):
+        memo = RatingMemo()
+        scraper = CountingScraper(concurrent=concurrent, rating_memo=memo)
+
+        april = make_rows(["A Minecraft Movie", "Sinners", "The Amateur"])
+        may = make_rows(["Lilo & Stitch", "Sinners", "A Minecraft Movie"])
+        for rows in (april, may):
+            if concurrent:
+                scraper.enrich_movies_concurrently(rows, 2025)
+            else:
+                for i, row in enumerate(rows):
+                    scraper.enrich_movie(row, 2025, i + 1)
+
+        queried = sorted({title for _, title in scraper.lookups})
+        print(f"并发={concurrent}: 实际查询 {queried}")
+        assert len(scraper.lookups) == 2 * 4
+        assert memo.hits == 2
+        assert may[1]['中文片名'] == "罪人" and may[1]['IMDb评分'] == "7.8"
+
+
+def test_transient_miss_not_memoized():
+    """测试只缓存确认查不到的结果，网络错误或被拦截导致的"N/A"在后续月份重新查询"""
+    print("\n=== 测试不缓存临时失败 ===")
+
+    reasons = {"Lost Film": MISS_NO_RESULTS, "Blocked Film": MISS_BLOCKED, "Timeout Film": None}
+    for concurrent in (False, True):
+        # 不使用查询失败缓存（如 --refresh / --no-cache）时同样按查询给出的原因判断
+        memo = RatingMemo()
+        scraper = MissingScraper(reasons, concurrent=concurrent, rating_memo=memo)
+        scraper.enrich_movies(make_rows(list(reasons)), 2025)
+
+        assert memo.get("Lost Film", 2025) == ("N/A", "N/A", "N/A")
+        assert memo.get("Blocked Film", 2025) is None
+        assert memo.get("Timeout Film", 2025) is None
+        print(f"并发={concurrent}: 缓存 {len(memo)} 部电影")
+    print("✅ 只缓存确认查不到的电影")
+
+
+def test_skipped_miss_memoized():
+    """测试因失败记录跳过在线搜索时，按记录中的原因决定是否缓存"""
+    print("\n=== 测试跳过在线搜索的电影 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        negative_cache = NegativeCache(os.path.join(tmp, "misses.sqlite3"))
+        for title, reason in (("Lost Film", MISS_NO_RESULTS), ("Blocked Film", MISS_BLOCKED)):
+            negative_cache.put(SOURCE_IMDB, title, 2025, reason)
+            negative_cache.put(SOURCE_DOUBAN, title, 2025, reason)
+
+        memo = RatingMemo()
+        scraper = BoxOfficeScraper(rating_memo=memo, negative_cache=negative_cache)
+        scraper.enrich_movies(make_rows(["Lost Film", "Blocked Film"]), 2025)
+        assert memo.get("Lost Film", 2025) == ("N/A", "N/A", "N/A")
+        assert memo.get("Blocked Film", 2025) is None
+        print("✅ 确认查不到的缓存，被拦截的不缓存")
+        scraper.close()
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_cross_month_reuse()
+    test_transient_miss_not_memoized()
+    test_skipped_miss_memoized()
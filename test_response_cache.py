@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import requests
+
+from response_cache import (
+    ResponseCache, normalize_url, boxoffice_month_ttl,
+    CACHE_REFRESH, CACHE_BYPASS, HOUR, DAY
+)
+
+
+def make_response(url, body, status=200):
+    """构造一个不经过网络的响应对象"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response._content = body
+    return response
+
+
+def test_normalize_url():
+    """测试URL规范化"""
+    print("=== 测试URL规范化 ===")
+
+    a = normalize_url("https://WWW.BoxOfficeMojo.com/month/may/2025/?ref_=bo_ml_table_1")
+    b = normalize_url("https://www.boxofficemojo.com/month/may/2025/")
+    print(f"{a}\n{b}")
+    assert a == b
+
+    c = normalize_url("https://www.imdb.com/find?s=tt&q=Sinners#top")
+    d = normalize_url("https://www.imdb.com/find?q=Sinners&s=tt")
+    assert c == d
+
+
+def test_ttl_rules():
+    """测试按站点和页面类型的有效期"""
+    print("\n=== 测试缓存有效期规则 ===")
+
+    now = datetime(2025, 6, 15)
+    assert boxoffice_month_ttl('/month/june/2025/', now) == HOUR
+    assert boxoffice_month_ttl('/month/may/2025/', now) == HOUR
+    assert boxoffice_month_ttl('/month/january/2024/', now) == 30 * DAY
+    assert boxoffice_month_ttl('/title/tt123/', now) is None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite3'))
+        assert cache.ttl_for("https://www.imdb.com/title/tt0110357/") == 30 * DAY
+        assert cache.ttl_for("https://movie.douban.com/subject/1301753/") == 30 * DAY
+        assert cache.ttl_for("https://www.imdb.com/find?q=x") == 7 * DAY
+        assert cache.ttl_for("https://www.boxofficemojo.com/month/may/1999/") == 30 * DAY
+        cache.close()
+    print("✅ 有效期规则正确")
+
+
+def test_cache_roundtrip_and_eviction():
+    """测试缓存读写、过期和LRU淘汰"""
+    print("\n=== 测试缓存读写与淘汰 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        cache = ResponseCache(path, max_bytes=2500, touch_interval=0)
+
+        url = "https://www.imdb.com/title/tt1/"
+        assert cache.get(url) is None
+        cache.set(url, make_response(url, b'a' * 1000))
+
+        cached = cache.get(url + "?ref_=fn")
+        assert cached is not None
+        assert cached.content == b'a' * 1000
+        assert cached.status_code == 200
+        assert 'text/html' in cached.headers['content-type']
+
+        # 非200响应不缓存
+        cache.set("https://www.imdb.com/title/tt404/", make_response(url, b'x', status=404))
+        assert cache.get("https://www.imdb.com/title/tt404/") is None
+
+        # 超过容量时淘汰最久未访问的条目
+        time.sleep(0.01)
+        cache.set("https://www.imdb.com/title/tt2/", make_response(url, b'b' * 1000))
+        time.sleep(0.01)
+        cache.get(url)  # tt1 变为最近访问
+        time.sleep(0.01)
+        cache.set("https://www.imdb.com/title/tt3/", make_response(url, b'c' * 1000))
+        assert cache.get(url) is not None
+        assert cache.get("https://www.imdb.com/title/tt2/") is None
+        assert cache.get("https://www.imdb.com/title/tt3/") is not None
+        assert cache.stats()['bytes'] <= 2500
+        print(f"缓存统计: {cache.stats()}")
+        cache.close()
+
+        # 重新打开后缓存仍然有效（持久化）
+        cache = ResponseCache(path, max_bytes=2500)
+        assert cache.get(url) is not None
+
+        # 过期条目不返回
+        cache.default_ttl = -1
+        cache.set("https://example.com/page", make_response(url, b'old'))
+        assert cache.get("https://example.com/page") is None
+        cache.close()
+
+        # 刷新和跳过模式都不读取缓存
+        for mode in (CACHE_REFRESH, CACHE_BYPASS):
+            cache = ResponseCache(path, mode=mode)
+            assert cache.get(url) is None
+            cache.close()
+    print("✅ 缓存读写、过期和淘汰正确")
+
+
+def test_running_total():
+    """测试写入时按累计的总大小判断是否淘汰，不做全表求和"""
+    print("\n=== 测试缓存总大小累计 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        cache = ResponseCache(path, max_bytes=10000)
+        statements = []
+        cache.conn.set_trace_callback(statements.append)
+        for i in range(5):
+            url = f"https://www.imdb.com/title/tt{i}/"
+            cache.set(url, make_response(url, b'a' * 1000))
+        # 覆盖已有条目时减去旧的大小
+        cache.set("https://www.imdb.com/title/tt0/", make_response(url, b'b' * 500))
+        assert not any('SUM(size)' in statement for statement in statements)
+        assert cache.total_bytes == cache.stats()['bytes'] == 4500
+        print("✅ 6次写入没有全表求和，累计大小与实际一致")
+
+        # 写到10500字节时淘汰最久未访问的2个条目，降到上限的90%以下，再写入一个后为9500字节
+        for i in range(5, 12):
+            url = f"https://www.imdb.com/title/tt{i}/"
+            cache.set(url, make_response(url, b'a' * 1000))
+        assert cache.get("https://www.imdb.com/title/tt1/") is None and cache.get("https://www.imdb.com/title/tt2/") is None
+        assert cache.total_bytes == cache.stats()['bytes'] == 9500
+        cache.close()
+
+        # 重新打开时统计已有条目
+        cache = ResponseCache(path, max_bytes=10000)
+        assert cache.total_bytes == cache.stats()['bytes']
+        cache.close()
+    print("✅ 淘汰后和重新打开时累计大小正确")
+
+
+def test_touch_interval():
+    """测试命中时只在访问时间足够旧时才写库"""
+    print("\n=== 测试访问时间更新间隔 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite3'))
+        url = "https://www.imdb.com/title/tt1/"
+        cache.set(url, make_response(url, b'a'))
+
+        def accessed_at():
+            return cache.conn.execute('SELECT accessed_at FROM responses').fetchone()[0]
+
+        written = accessed_at()
+        for _ in range(20):
+            assert cache.get(url) is not None
+        assert accessed_at() == written and cache.conn.total_changes == 1
+        print("✅ 间隔内的20次命中没有写库")
+
+        cache.conn.execute('UPDATE responses SET accessed_at = ?', (written - cache.touch_interval,))
+        assert cache.get(url) is not None
+        assert accessed_at() >= written
+        cache.close()
+    print("✅ 访问时间超过间隔后命中时更新")
+
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_ttl_rules()
+    test_cache_roundtrip_and_eviction()
+    test_running_total()
+    test_touch_interval()
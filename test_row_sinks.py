@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+import batch_scraper
+from batch_scraper import RANGE_COLUMNS, append_to_output, init_range_worker, scrape_month_checkpointed, scrape_work_unit, written_months
+from boxoffice_scraper import MONTHLY_COLUMNS
+from fixture_site import start_fixture_site
+from row_sinks import CsvRowSink, JsonlRowSink, open_row_sink
+from standin_server import make_scraper
+
+
+ROW = {'排名': '1', '英文片名': 'Sinners', '中文片名': '罪人', '累计票房': '$1,000,000',
+       '首映日期': '4月18日', 'IMDb评分': '7.8', '豆瓣评分': '7.4'}
+
+
+def test_csv_sink():
+    """测试CSV输出按行数刷新，追加时不重复写表头和BOM"""
+    print("=== 测试CSV流式输出 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out', 'rows.csv')
+        with open_row_sink(path, MONTHLY_COLUMNS, flush_rows=2, flush_seconds=3600) as sink:
+            assert isinstance(sink, CsvRowSink)
+            sink.write(ROW)
+            sink.write({**ROW, '排名': '2'})
+            # 达到刷新行数后，其他程序可以立即读到已写入的行
+            assert len(pd.read_csv(path, encoding='utf-8-sig')) == 2
+            sink.write({**ROW, '排名': '3', '豆瓣评分': None})
+        print("✅ 每2行刷新一次，抓取过程中即可读取")
+
+        with open_row_sink(path, MONTHLY_COLUMNS, append=True) as sink:
+            sink.write({**ROW, '排名': '4'})
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        assert content.count(b'\xef\xbb\xbf') == 1
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        assert list(df.columns) == MONTHLY_COLUMNS
+        assert list(df['排名']) == ['1', '2', '3', '4']
+        assert df['豆瓣评分'][2] == ''
+        print("✅ 追加写入不重复表头")
+
+
+def test_jsonl_sink():
+    """测试JSON Lines输出"""
+    print("\n=== 测试JSON Lines流式输出 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rows.jsonl')
+        with open_row_sink(path, RANGE_COLUMNS) as sink:
+            assert isinstance(sink, JsonlRowSink)
+            sink.write_all({'年份': 2025, '月份': 5, **ROW, '排名': str(i)} for i in range(1, 4))
+
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        assert len(rows) == 3
+        assert list(rows[0]) == RANGE_COLUMNS
+        assert rows[2]['排名'] == '3' and rows[2]['中文片名'] == '罪人'
+        print("✅ 每行一个JSON对象，列顺序固定")
+
+
+def test_stream_month():
+    """测试按月抓取时每部电影完成后立即产出并写入"""
+    print("\n=== 测试逐部产出 ===")
+
+    server = start_fixture_site()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # 生成器在产出第一部电影时，后面的电影还没有查询
+            server.requests.clear()
+            movies = make_scraper(server).iter_monthly_data(2025, 4)
+            first = next(movies)
+            assert first['IMDb评分'] == '7.8' and dict(server.requests) == {'Sinners': 1}
+            assert len(list(movies)) == 2 and sum(server.requests.values()) == 3
+            print("✅ 生成器按需查询评分")
+
+            path = os.path.join(tmp, 'stream.jsonl')
+            with open_row_sink(path, MONTHLY_COLUMNS, flush_rows=1) as sink:
+                data, skipped = scrape_month_checkpointed(make_scraper(server), 2025, 4, 'checkpoints', sink=sink)
+                assert not skipped and sink.rows == 3
+            with open(path, encoding='utf-8') as f:
+                assert [json.loads(line)['英文片名'] for line in f] == [movie['英文片名'] for movie in data]
+            assert os.path.exists('data/boxoffice_2025_04.csv')
+            print("✅ 每部电影完成后写入流式输出，当月CSV照常保存")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+
+def test_resume_appends():
+    """测试续抓时追加到上次的输出，已写入的电影和月份不重复写入"""
+    print("\n=== 测试续抓追加输出 ===")
+
+    server = start_fixture_site()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            path = os.path.join(tmp, 'range.jsonl')
+            assert not append_to_output(path, resume=True)
+
+            # 第一次运行：抓到第3部电影时中断，前2部已写入输出
+            scraper = make_scraper(server)
+            search = scraper.find_imdb_rating
+
+            def interrupted_search(title, year):
+                if title == 'Warfare':
+                    raise KeyboardInterrupt
+                return search(title, year)
+
+            scraper.find_imdb_rating = interrupted_search
+            try:
+                with open_row_sink(path, RANGE_COLUMNS) as sink:
+                    scrape_month_checkpointed(scraper, 2025, 4, 'checkpoints', sink=sink)
+                assert False, "应当被中断"
+            except KeyboardInterrupt:
+                pass
+
+            # 续抓两次：第一次只追加第3部电影，第二次整月已完成，不再写入
+            for expected_rows in (1, 0):
+                assert append_to_output(path, resume=True)
+                with open_row_sink(path, RANGE_COLUMNS, append=True) as sink:
+                    data, _ = scrape_month_checkpointed(make_scraper(server), 2025, 4, 'checkpoints', resume=True,
+                                                        sink=sink, replay=False)
+                    assert len(data) == 3 and sink.rows == expected_rows
+
+            with open(path, encoding='utf-8') as f:
+                assert [json.loads(line)['英文片名'] for line in f] == ['Sinners', 'A Minecraft Movie', 'Warfare']
+            assert written_months(path) == {(2025, 4)}
+            assert not append_to_output('range.parquet', resume=True)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+    print("✅ 上次已写入的电影不重复写入，输出文件保留")
+
+
+def test_work_unit_streams_months():
+    """测试工作单元每抓完一个月份就送回结果，不等整个单元完成"""
+    print("\n=== 测试工作单元逐月送回 ===")
+
+    class RecordingQueue:
+        def __init__(self, events):
+            self.events = events
+            self.items = []
+
+        def put(self, item):
+            self.events.append(('put', item[1]))
+            self.items.append(item)
+
+    server = start_fixture_site()
+    cwd = os.getcwd()
+    events = []
+    results = RecordingQueue(events)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            init_range_worker({'127.0.0.1': 1000}, {'base_urls': server.base_urls()}, results=results)
+            scraper = batch_scraper.WORKER_SCRAPER
+            scrape_table = scraper.scrape_month_table
+
+            def recording_table(year, month):
+                events.append(('table', month))
+                return scrape_table(year, month)
+
+            scraper.scrape_month_table = recording_table
+            snapshot = scrape_work_unit([(2025, 4), (2025, 5)], 'checkpoints')
+
+            # 第4月的结果在开始抓取第5月之前已经送回
+            assert events == [('table', 4), ('put', 4), ('table', 5), ('put', 5)]
+            assert [(year, month, len(data)) for year, month, data in results.items] == [(2025, 4, 3), (2025, 5, 3)]
+            assert snapshot and not scraper.metrics.snapshot()['counters']
+            print("✅ 每个月份完成后立即送回，指标随单元结束返回")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+            batch_scraper.WORKER_SCRAPER.close()
+            batch_scraper.WORKER_SCRAPER = batch_scraper.WORKER_RESULTS = None
+
+
+if __name__ == "__main__":
+    test_csv_sink()
+    test_jsonl_sink()
+    test_stream_month()
+    test_resume_appends()
+    test_work_unit_streams_months()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+from boxoffice_scraper import BoxOfficeScraper, PARSE_PARTIAL
+from scrape_log import VERBOSITY_DEBUG, VERBOSITY_QUIET, configure_logging
+from standin_server import StandinServer
+
+
+def scrape_month(server, debug=False):
+    """抓取替身服务器的2025年5月榜单，返回 (电影数据, 控制台输出)"""
+    scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                               parse_mode=PARSE_PARTIAL, debug=debug)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        movies = scraper.scrape_monthly_data(2025, 5)
+    scraper.close()
+    return movies, output.getvalue()
+
+
+def test_verbosity():
+    """测试 normal / quiet / debug 三档输出"""
+    print("=== 测试输出模式 ===")
+
+    try:
+        with StandinServer() as server:
+            configure_logging()
+            movies, normal = scrape_month(server)
+            assert normal.count("已抓取:") == len(movies)
+            assert "候选:" not in normal and "第1行包含" not in normal
+            assert "2025年5月: " in normal
+            print(f"✅ normal: {len(normal.splitlines())} 行，每部电影一行")
+
+            configure_logging(VERBOSITY_QUIET)
+            _, quiet = scrape_month(server)
+            assert len(quiet.splitlines()) == 1
+            assert quiet.startswith(f"2025年5月: {len(movies)} 部电影, IMDb评分 {len(movies)}, ")
+            print(f"✅ quiet: 只有月份摘要 {quiet.strip()}")
+
+            configure_logging()
+            _, debug = scrape_month(server, debug=True)
+            assert "候选:" in debug and "第1行包含" in debug
+            print(f"✅ debug=True: {len(debug.splitlines())} 行，包含候选和表格行")
+
+            # 调试输出只属于 debug=True 的实例，之后创建的普通抓取器不受影响
+            _, after = scrape_month(server)
+            assert "候选:" not in after and "第1行包含" not in after
+            assert len(after.splitlines()) == len(normal.splitlines())
+            print("✅ 之后的 debug=False 抓取器不输出调试信息")
+    finally:
+        configure_logging()
+
+
+def test_import_configures_nothing():
+    """测试导入抓取器不会设置 logging 输出"""
+    print("\n=== 测试导入时不设置日志输出 ===")
+
+    code = ("import logging, boxoffice_scraper, async_scraper; "
+            "logger = logging.getLogger('boxoffice'); "
+            "print(len(logger.handlers), logger.level, logger.propagate)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    assert result.stdout.split() == ['0', str(logging.NOTSET), 'True']
+    print("✅ 'boxoffice' 日志器没有处理器、级别未设置、向上传递")
+
+
+def test_event_stream():
+    """测试JSON Lines事件流"""
+    print("\n=== 测试事件流 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events.jsonl')
+        try:
+            configure_logging(VERBOSITY_QUIET, events_path=path)
+            with StandinServer() as server:
+                movies, _ = scrape_month(server)
+        finally:
+            configure_logging()
+
+        with open(path, encoding='utf-8') as f:
+            events = [json.loads(line) for line in f]
+
+    by_name = {}
+    for entry in events:
+        by_name.setdefault(entry['event'], []).append(entry)
+    assert [(entry['year'], entry['month']) for entry in by_name['month_start']] == [(2025, 5)]
+    assert by_name['month_start'][0]['url'].endswith('/month/may/2025/')
+    assert len(by_name['movie']) == len(movies)
+    first = by_name['movie'][0]
+    assert first['rank'] == movies[0]['排名'] and first['imdb'] == movies[0]['IMDb评分']
+    assert first['message'].startswith("已抓取: 1. ")
+    summary = by_name['month_summary'][0]
+    assert summary['movies'] == len(movies) and summary['level'] == 'INFO'
+    # quiet 模式下控制台不输出的调试信息也不写入事件流
+    assert all(entry['level'] != 'DEBUG' for entry in events)
+    print(f"✅ {len(events)} 条事件, 包含 {len(by_name['movie'])} 部电影和月份摘要")
+
+
+if __name__ == "__main__":
+    test_verbosity()
+    test_import_configures_nothing()
+    test_event_stream()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试IMDb候选详情页的推测并发请求
+"""
+
+import asyncio
+import contextlib
+import io
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from async_scraper import AsyncBoxOfficeScraper
+from boxoffice_scraper import BoxOfficeScraper, RequestCancelled
+from standin_server import StandinServer, make_scraper
+
+
+def rating_page(rating):
+    score = f'<div data-testid="hero-rating-bar__aggregate-rating__score"><span>{rating}</span><span>/10</span></div>'
+    return f'<html><body>{score if rating else ""}</body></html>'.encode('utf-8')
+
+
+def control_title_pages(server, ratings, delays=None, default_delay=0.0):
+    """
+    替换替身服务器的IMDb详情页：按排名顺序为候选电影指定评分（None表示没有评分）和响应延迟
+
+    Returns:
+        list: 按年份差距排序后的候选电影编号
+    """
+    page = requests.get(server.root + "/find", params={'q': "Sinners"}).content
+    candidates = BoxOfficeScraper().extract_imdb_candidates(page, 2025)
+    candidates.sort(key=lambda x: x['year_diff'])
+    ids = [re.search(r'tt\d+', candidate['url']).group(0) for candidate in candidates]
+    by_id = dict(zip(ids, ratings))
+    delay_by_id = dict(zip(ids, delays or []))
+
+    def render_imdb_title(imdb_id):
+        time.sleep(delay_by_id.get(imdb_id, default_delay))
+        return rating_page(by_id.get(imdb_id, "5.0"))
+
+    server.pages.render_imdb_title = render_imdb_title
+    return ids
+
+
+def test_best_ranked_wins():
+    """测试排名最靠前的有效评分胜出，而不是最先返回的"""
+    print("=== 测试候选排名 ===")
+    with StandinServer() as server:
+        # 最佳候选没有评分；第二名响应慢，第三名响应快
+        control_title_pages(server, [None, "6.4", "8.8"], delays=[0, 0.3, 0])
+        scraper = make_scraper(server, speculative_candidates=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.search_imdb_rating("Sinners", 2025) == "6.4"
+        assert scraper.metrics.counter_value('imdb_candidates_tried_total') == 2
+        scraper.close()
+    print("✅ 第二名评分胜出，不取先返回的第三名")
+
+
+def test_latency():
+    """测试最佳候选没有评分时，推测请求只需约一次往返"""
+    print("\n=== 测试候选请求耗时 ===")
+    elapsed = {}
+    for k in (1, 3):
+        with StandinServer() as server:
+            control_title_pages(server, [None, None, "7.1"], default_delay=0.2)
+            scraper = make_scraper(server, speculative_candidates=k)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert scraper.search_imdb_rating("Sinners", 2025) == "7.1"
+            elapsed[k] = time.perf_counter() - start
+            scraper.close()
+    assert elapsed[3] < elapsed[1] - 0.25, elapsed
+    print(f"✅ 逐个请求 {elapsed[1]:.2f}秒，同时请求3个 {elapsed[3]:.2f}秒")
+
+
+def test_cancel_pending():
+    """测试找到评分后，还在限速等待中的候选请求不再发出"""
+    print("\n=== 测试取消未发出的请求 ===")
+    with StandinServer() as server:
+        control_title_pages(server, ["7.6", "6.0", "5.0", "4.0", "3.0"])
+        # 每0.2秒一个请求：第一个候选返回时其余候选还在等待令牌
+        scraper = make_scraper(server, rate_limits={'127.0.0.1': 5}, speculative_candidates=5)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.search_imdb_rating("Sinners", 2025) == "7.6"
+        time.sleep(1.2)
+        assert server.status_counts[('imdb', 200)] == 3  # 测试准备的搜索页 + 搜索页 + 第一个候选
+        assert scraper.metrics.counter_value('http_requests_cancelled_total', site='127.0.0.1') == 4
+        scraper.close()
+    print("✅ 其余4个候选请求在发出前取消")
+
+
+def test_cancelled_requests_take_no_tokens():
+    """测试已取消的请求不占用限速令牌，限速等待中被取消时立即返回并归还令牌"""
+    print("\n=== 测试取消请求的限速令牌 ===")
+    with StandinServer() as server:
+        scraper = make_scraper(server, rate_limits={'127.0.0.1': 1})
+        url = server.root + "/title/tt0000001/"
+
+        cancelled = threading.Event()
+        cancelled.set()
+        start = time.perf_counter()
+        for _ in range(3):
+            try:
+                scraper.fetch_page(url, cancelled=cancelled)
+                assert False, "应当取消"
+            except RequestCancelled:
+                pass
+        # 桶中唯一的令牌仍在，下一个请求立即发出
+        scraper.fetch_page(url)
+        assert time.perf_counter() - start < 0.3
+        print("✅ 3个已取消的请求没有占用令牌")
+
+        # 等待令牌时被取消：不等满1秒，归还的令牌留给下一个请求
+        cancelled = threading.Event()
+        threading.Timer(0.2, cancelled.set).start()
+        start = time.perf_counter()
+        try:
+            scraper.fetch_page(url, cancelled=cancelled)
+            assert False, "应当取消"
+        except RequestCancelled:
+            pass
+        assert time.perf_counter() - start < 0.5
+        scraper.fetch_page(url)
+        assert time.perf_counter() - start < 1.3
+        assert server.status_counts[('imdb', 200)] == 2
+        assert scraper.metrics.counter_value('http_requests_cancelled_total', site='127.0.0.1') == 4
+        scraper.close()
+    print("✅ 限速等待中被取消时立即返回，令牌归还")
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    """立即返回响应头，正文分20块、每块间隔0.05秒发送"""
+
+    def do_GET(self):
+        chunk = b'x' * 32 * 1024
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(chunk) * 20))
+        self.end_headers()
+        try:
+            for _ in range(20):
+                self.wfile.write(chunk)
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_abort_in_flight():
+    """测试已发出的请求被取消时不再读取正文，关闭连接"""
+    print("\n=== 测试中断已发出的请求 ===")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowBodyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/title/tt0000001/"
+    scraper = BoxOfficeScraper(rate_limits={'127.0.0.1': 1000})
+    try:
+        # 不取消时读完全部正文
+        assert len(scraper.fetch_page(url, cancelled=threading.Event()).content) == 20 * 32 * 1024
+
+        cancelled = threading.Event()
+        threading.Timer(0.2, cancelled.set).start()
+        start = time.perf_counter()
+        try:
+            scraper.fetch_page(url, cancelled=cancelled)
+            assert False, "应当取消"
+        except RequestCancelled:
+            pass
+        assert time.perf_counter() - start < 0.6
+        # 请求已到达服务器，仍计入请求数
+        assert scraper.metrics.counter_value('http_requests_total', site='127.0.0.1', status=200, cache='off') == 2
+        assert scraper.metrics.counter_value('http_requests_aborted_total', site='127.0.0.1') == 1
+        assert scraper.metrics.counter_value('http_requests_cancelled_total', site='127.0.0.1') == 0
+    finally:
+        scraper.close()
+        server.shutdown()
+        server.server_close()
+    print("✅ 正文读取中途放弃，请求仍计入访问量")
+
+
+def test_async_speculative():
+    """测试异步引擎的推测请求"""
+    print("\n=== 测试异步推测请求 ===")
+
+    async def search(server):
+        async with AsyncBoxOfficeScraper(rate_limits={'127.0.0.1': 1000}, base_urls=server.base_urls(),
+                                         speculative_candidates=3) as scraper:
+            return await scraper.search_imdb_rating("Sinners", 2025)
+
+    with StandinServer() as server:
+        control_title_pages(server, [None, "6.4", "8.8"], delays=[0, 0.3, 0])
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert asyncio.run(search(server)) == "6.4"
+    print("✅ 异步引擎同样取排名最靠前的有效评分")
+
+
+if __name__ == "__main__":
+    test_best_ranked_wins()
+    test_latency()
+    test_cancel_pending()
+    test_cancelled_requests_take_no_tokens()
+    test_abort_in_flight()
+    test_async_speculative()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+
+from standin_server import SiteBehavior, StandinServer, make_scraper, run_load_test, title_identity
+
+
+def test_standin_pages():
+    """测试替身服务器按片名生成的页面能被抓取器完整解析"""
+    print("=== 测试替身服务器页面 ===")
+
+    with StandinServer() as server:
+        scraper = make_scraper(server)
+        with contextlib.redirect_stdout(io.StringIO()):
+            movies = scraper.scrape_monthly_data(2025, 5)
+        scraper.close()
+
+    assert movies[0]['英文片名'] == 'Lilo & Stitch'
+    for movie in movies:
+        identity = title_identity(scraper.clean_search_title(movie['英文片名']))
+        assert movie['IMDb评分'] == identity['imdb_rating']
+        assert movie['中文片名'].startswith(identity['chinese_title'])
+        assert movie['豆瓣评分'] == identity['douban_rating']
+    print(f"✅ {len(movies)} 部电影的IMDb和豆瓣信息全部来自替身服务器")
+
+
+def test_fault_injection():
+    """测试403、429和5xx注入"""
+    print("\n=== 测试错误注入 ===")
+
+    behaviors = {
+        'imdb': SiteBehavior(throttle_rate=1.0, retry_after=7),
+        'douban': SiteBehavior(forbidden_rate=1.0),
+    }
+    with StandinServer(behaviors=behaviors, seed=1) as server:
+        scraper = make_scraper(server, max_retries=0)
+        response = scraper.fetch_page(server.root + "/find?q=Sinners")
+        assert response.status_code == 429 and response.headers['Retry-After'] == '7'
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert scraper.search_imdb_rating("Sinners", 2025) == "N/A"
+            # 豆瓣被拦截时回退到静态映射
+            assert scraper.search_douban_movie("Sinners", 2025) == ("罪人", "7.8")
+        scraper.close()
+        assert server.status_counts[('douban', 403)] >= 1
+    print("✅ 429带 Retry-After，403时回退到静态映射")
+
+    with StandinServer(behaviors={'boxoffice': SiteBehavior(error_rate=0.5)}, seed=3) as server:
+        scraper = make_scraper(server, max_retries=0)
+        statuses = [scraper.fetch_page(server.base_urls()['boxoffice'].format(month='may', year=2025)).status_code
+                    for _ in range(40)]
+        scraper.close()
+    assert set(statuses) == {200, 503} and 8 <= statuses.count(503) <= 32
+    print(f"✅ 503比例: {statuses.count(503)}/40")
+
+
+def test_load_harness():
+    """测试端到端压测的统计结果"""
+    print("\n=== 测试压测 ===")
+
+    with StandinServer(behaviors={site: SiteBehavior(latency=0.005) for site in ('boxoffice', 'imdb', 'douban')}) as server:
+        report = run_load_test(server, concurrency=5, lookups=25)
+
+    assert report['movies'] == 25 and report['movies_per_sec'] > 0
+    assert report['stages']['month_page']['count'] == 3
+    for stage in ('imdb_search', 'imdb_title', 'douban_search', 'douban_subject', 'imdb_lookup', 'douban_lookup'):
+        stat = report['stages'][stage]
+        assert stat['count'] == 25
+        assert 5 <= stat['p50_ms'] <= stat['p99_ms']
+    assert report['missing'] == {'IMDb评分': 0, '豆瓣评分': 0}
+    print(f"✅ {report['movies_per_sec']:.1f} 部/秒, IMDb查询 p50 {report['stages']['imdb_lookup']['p50_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_standin_pages()
+    test_fault_injection()
+    test_load_harness()